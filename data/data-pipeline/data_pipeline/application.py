@@ -1,40 +1,11 @@
 import sys
 import os
-import pandas as pd
+import typing
 from pathlib import Path
 from subprocess import call
 
 import click
 from data_pipeline.config import settings
-from data_pipeline.etl.runner import etl_runner
-from data_pipeline.etl.runner import score_generate
-from data_pipeline.etl.runner import score_geo
-from data_pipeline.etl.runner import score_geo_gistar_burd
-from data_pipeline.etl.runner import score_geo_gistar_ind
-from data_pipeline.etl.runner import score_geo_custom_burd
-from data_pipeline.etl.runner import score_geo_custom_ind
-from data_pipeline.etl.runner import score_geo_add_burd
-from data_pipeline.etl.runner import score_geo_add_ind
-from data_pipeline.etl.runner import score_post
-from data_pipeline.etl.runner import get_data_sources
-from data_pipeline.etl.runner import extract_data_sources as extract_ds
-from data_pipeline.etl.runner import clear_data_source_cache as clear_ds_cache
-from data_pipeline.etl.sources.census.etl_utils import check_census_data_source
-from data_pipeline.etl.sources.census.etl_utils import (
-    reset_data_directories as census_reset,
-)
-from data_pipeline.etl.sources.census.etl_utils import zip_census_data
-from data_pipeline.etl.sources.tribal.etl_utils import (
-    reset_data_directories as tribal_reset,
-)
-from data_pipeline.tile.generate import generate_tiles
-from data_pipeline.tile.generate_gistar_burd import generate_tiles_gistar_burd
-from data_pipeline.tile.generate_gistar_ind import generate_tiles_gistar_ind
-from data_pipeline.tile.generate_add_burd import generate_tiles_add_burd
-from data_pipeline.tile.generate_add_ind import generate_tiles_add_ind
-from data_pipeline.tile.generate_custom_burd import generate_tiles_custom_burd
-from data_pipeline.tile.generate_custom_ind import generate_tiles_custom_ind
-
 from data_pipeline.etl.score import constants
 from data_pipeline.utils import check_first_run
 from data_pipeline.utils import data_folder_cleanup
@@ -44,10 +15,28 @@ from data_pipeline.utils import score_folder_cleanup
 from data_pipeline.utils import temp_folder_cleanup
 from data_pipeline.utils import geo_score_folder_cleanup
 
+# The commands import their implementation when they run, so that the CLI
+# starts (e.g. for `--help`) without loading pandas, geopandas and every ETL.
+if typing.TYPE_CHECKING:
+    from data_pipeline.etl.metrics import RunProfiler
+
 logger = get_module_logger(__name__)
 
 LOG_LINE_WIDTH = 60
 
+# The layers of `GEO_SCORE_LAYERS` in etl_score_geo (and `SCORE_TILE_LAYERS`
+# in tile/generate), listed here so that the CLI doesn't import geopandas to
+# build its options
+GEO_SCORE_LAYER_NAMES = [
+    "default",
+    "gistar_burd",
+    "gistar_ind",
+    "add_burd",
+    "add_ind",
+    "custom_burd",
+    "custom_ind",
+]
+
 use_cache_option = click.option(
     "-u",
     "--use-cache",
@@ -64,6 +53,66 @@ dataset_option = click.option(
     help="Name of dataset to run. If not provided, all datasets will be run.",
 )
 
+executor_option = click.option(
+    "-e",
+    "--executor",
+    default="thread",
+    required=False,
+    type=click.Choice(["thread", "process"]),
+    help=(
+        "Run concurrent ETLs on 'thread' workers (default, easier to debug) "
+        "or on 'process' workers, which use all cores for pandas-heavy transforms."
+    ),
+)
+
+
+def _parse_memory_budget(ctx, param, value):
+    """Converts the --memory-budget option into bytes"""
+    from data_pipeline.etl.metrics import parse_memory_size
+
+    if value is None:
+        return None
+    try:
+        return parse_memory_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+memory_budget_option = click.option(
+    "-m",
+    "--memory-budget",
+    default=None,
+    required=False,
+    type=str,
+    callback=_parse_memory_budget,
+    help=(
+        "Memory available to the ETLs, e.g. '24G'. When set, ETLs are started "
+        "largest first as long as the peak memory recorded for them on previous "
+        "runs fits in the budget. Peak memory is measured exactly on 'process' "
+        "workers, and only approximately on 'thread' workers, which share one "
+        "process."
+    ),
+)
+
+keep_going_option = click.option(
+    "-k",
+    "--keep-going",
+    is_flag=True,
+    default=False,
+    help="Run every ETL that doesn't depend on a failed one and report all failures at the end, instead of stopping at the first failure.",
+)
+
+profile_option = click.option(
+    "-p",
+    "--profile",
+    is_flag=True,
+    default=False,
+    help=(
+        "Profile the wall time, CPU time, peak memory and output size of each "
+        "phase of each stage, save the report to data/profiles and print a summary."
+    ),
+)
+
 data_source_option = click.option(
     "-s",
     "--data-source",
@@ -82,6 +131,10 @@ def cli():
 @cli.command(help="Clean up all census data folders")
 def census_cleanup():
     """CLI command to clean up the census data folder"""
+    from data_pipeline.etl.sources.census.etl_utils import (
+        reset_data_directories as census_reset,
+    )
+
     log_title("Clean Up Census Data")
 
     data_path = settings.APP_ROOT / "data"
@@ -96,6 +149,13 @@ def census_cleanup():
 @cli.command(help="Clean up all data folders")
 def data_cleanup():
     """CLI command to clean up the all the data folders"""
+    from data_pipeline.etl.sources.census.etl_utils import (
+        reset_data_directories as census_reset,
+    )
+    from data_pipeline.etl.sources.tribal.etl_utils import (
+        reset_data_directories as tribal_reset,
+    )
+
     log_title("Clean Up Data ")
 
     data_path = settings.APP_ROOT / "data"
@@ -125,6 +185,12 @@ def data_cleanup():
 def census_data_download(zip_compress, use_cache):
     """CLI command to download all census shape files from the Census FTP and extract the geojson
     to generate national and by state Census Block Group CSVs"""
+    from data_pipeline.etl.runner import etl_runner
+    from data_pipeline.etl.sources.census.etl_utils import (
+        reset_data_directories as census_reset,
+    )
+    from data_pipeline.etl.sources.census.etl_utils import zip_census_data
+
     log_title("Download Census Data ")
 
     data_path = settings.APP_ROOT / "data"
@@ -143,6 +209,9 @@ def census_data_download(zip_compress, use_cache):
 @cli.command(help="Retrieve census data from source")
 @data_source_option
 def pull_census_data(data_source: str):
+    from data_pipeline.etl.sources.census.etl_utils import (
+        check_census_data_source,
+    )
 
     log_title("Pull Census Data")
 
@@ -163,19 +232,51 @@ def pull_census_data(data_source: str):
 )
 @dataset_option
 @use_cache_option
-def etl_run(dataset: str, use_cache: bool, no_concurrency: bool):
+@executor_option
+@memory_budget_option
+@keep_going_option
+@profile_option
+def etl_run(
+    dataset: str,
+    use_cache: bool,
+    no_concurrency: bool,
+    executor: str,
+    memory_budget: int,
+    keep_going: bool,
+    profile: bool,
+):
     """Run a specific or all ETL processes
 
     Args:
         dataset (str): Name of the ETL module to be run (optional)
+        executor (str): Run the ETLs on "thread" or "process" workers (optional)
+        memory_budget (int): Memory available to the ETLs in bytes (optional)
+        keep_going (bool): Run all the ETLs that can run and report every failure at the end (optional)
+        profile (bool): Save and print a profile of each phase of each ETL (optional)
 
     Returns:
         None
     """
+    from data_pipeline.etl.metrics import RunProfiler
+    from data_pipeline.etl.runner import etl_runner
+
     log_title("Run ETL")
 
-    log_info("Running dataset(s)")
-    etl_runner(dataset, use_cache, no_concurrency)
+    profiler = RunProfiler() if profile else None
+    try:
+        log_info("Running dataset(s)")
+        etl_runner(
+            dataset,
+            use_cache,
+            no_concurrency,
+            executor,
+            memory_budget,
+            profiler=profiler,
+            keep_going=keep_going,
+        )
+    finally:
+        if profiler is not None:
+            log_profile(profiler)
 
     log_goodbye()
 
@@ -183,15 +284,24 @@ def etl_run(dataset: str, use_cache: bool, no_concurrency: bool):
 @cli.command(
     help="Generate Score",
 )
-def score_run():
+@profile_option
+def score_run(profile: bool):
     """CLI command to generate the score"""
+    from data_pipeline.etl.metrics import RunProfiler
+    from data_pipeline.etl.runner import score_generate
+
     log_title("Score", "Generate Score")
 
     log_info("Cleaning up data folders")
     score_folder_cleanup()
 
-    log_info("Generating score")
-    score_generate()
+    profiler = RunProfiler() if profile else None
+    try:
+        log_info("Generating score")
+        score_generate(profiler)
+    finally:
+        if profiler is not None:
+            log_profile(profiler)
 
     log_goodbye()
 
@@ -202,6 +312,9 @@ def score_run():
 @use_cache_option
 def score_full_run(use_cache: bool):
     """CLI command to run ETL and generate the score in one command"""
+    from data_pipeline.etl.runner import etl_runner
+    from data_pipeline.etl.runner import score_generate
+
     log_title("Score Full Run", "Run ETL and Generate Score (no tiles)")
 
     log_info("Cleaning up data folders")
@@ -234,6 +347,8 @@ def generate_score_post(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_post
+
     log_title(
         "Generate Score Post ", "Create Score CSV, Tile CSV, Downloadable ZIP"
     )
@@ -249,7 +364,17 @@ def generate_score_post(data_source: str):
 
 @cli.command(help="Generate GeoJSON files with scores baked in")
 @data_source_option
-def geo_score(data_source: str):
+@click.option(
+    "-l",
+    "--layer",
+    "layers",
+    type=click.Choice(GEO_SCORE_LAYER_NAMES),
+    multiple=True,
+    default=["default"],
+    show_default=True,
+    help="Layer to generate. Repeat to generate several layers in a single pass.",
+)
+def geo_score(data_source: str, layers: typing.Tuple[str, ...]):
     """CLI command to combine score with GeoJSON data and generate low and high files
 
     Args:
@@ -257,10 +382,13 @@ def geo_score(data_source: str):
                            Options:
                            - local: fetch census and score data from the local data directory
                            - aws: fetch census and score from AWS S3 J40 data repository
+        layers (tuple): The GeoJSON layers to generate
 
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -270,7 +398,7 @@ def geo_score(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo(data_source=data_source)
+    score_geo(data_source=data_source, layer_names=list(layers))
 
     log_goodbye()
 
@@ -288,6 +416,8 @@ def geo_score_gistar_burd(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -297,7 +427,7 @@ def geo_score_gistar_burd(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_gistar_burd(data_source=data_source) 
+    score_geo(data_source=data_source, layer_names=["gistar_burd"])
 
     log_goodbye()
 
@@ -315,6 +445,8 @@ def geo_score_gistar_ind(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -324,7 +456,7 @@ def geo_score_gistar_ind(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_gistar_ind(data_source=data_source) 
+    score_geo(data_source=data_source, layer_names=["gistar_ind"])
 
     log_goodbye()
 
@@ -343,6 +475,8 @@ def geo_score_custom_burd(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -352,7 +486,7 @@ def geo_score_custom_burd(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_custom_burd(data_source=data_source) 
+    score_geo(data_source=data_source, layer_names=["custom_burd"])
 
     log_goodbye()
 
@@ -370,6 +504,8 @@ def geo_score_custom_ind(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -379,7 +515,7 @@ def geo_score_custom_ind(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_custom_ind(data_source=data_source) 
+    score_geo(data_source=data_source, layer_names=["custom_ind"])
 
     log_goodbye()
 
@@ -398,6 +534,8 @@ def geo_score_add_burd(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -407,7 +545,7 @@ def geo_score_add_burd(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_add_burd(data_source=data_source)
+    score_geo(data_source=data_source, layer_names=["add_burd"])
 
     log_goodbye()
 
@@ -425,6 +563,8 @@ def geo_score_add_ind(data_source: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import score_geo
+
     log_title(
         "Generate GeoJSON",
         "Combine Score and GeoJSON, Add Shapefile Data to Codebook",
@@ -434,7 +574,7 @@ def geo_score_add_ind(data_source: str):
     geo_score_folder_cleanup()
 
     log_info("Combining score with GeoJSON")
-    score_geo_add_ind(data_source=data_source)
+    score_geo(data_source=data_source, layer_names=["add_ind"])
 
     log_goodbye()
 
@@ -450,14 +590,39 @@ def geo_score_add_ind(data_source: str):
     is_flag=True,
     type=bool,
 )
-def generate_map_tiles(generate_tribal_layer):
+@click.option(
+    "-l",
+    "--layer",
+    "layers",
+    type=click.Choice(GEO_SCORE_LAYER_NAMES),
+    multiple=True,
+    default=["default"],
+    show_default=True,
+    help="Score layer to tile. Repeat to tile several layers concurrently.",
+)
+@click.option(
+    "-c",
+    "--cpu-budget",
+    default=None,
+    required=False,
+    type=click.IntRange(min=1),
+    help="Number of CPUs shared by the tippecanoe jobs. Defaults to all CPUs.",
+)
+def generate_map_tiles(generate_tribal_layer, layers, cpu_budget):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating tiles")
-    generate_tiles(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path,
+        generate_tribal_layer,
+        layer_names=list(layers),
+        cpu_budget=cpu_budget,
+    )
 
     log_goodbye()
 
@@ -474,12 +639,16 @@ def generate_map_tiles(generate_tribal_layer):
 )
 def generate_map_tiles_gistar_burd(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate GI Star Burden Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Gi Star tiles")
-    generate_tiles_gistar_burd(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["gistar_burd"]
+    )
 
     log_goodbye()
 
@@ -496,12 +665,16 @@ def generate_map_tiles_gistar_burd(generate_tribal_layer):
 )
 def generate_map_tiles_gistar_ind(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate GI Star Indicator Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Gi Star tiles")
-    generate_tiles_gistar_ind(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["gistar_ind"]
+    )
 
     log_goodbye()
 
@@ -518,12 +691,16 @@ def generate_map_tiles_gistar_ind(generate_tribal_layer):
 )
 def generate_map_tiles_custom_burd(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate Custom Burden Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Gi Star tiles")
-    generate_tiles_custom_burd(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["custom_burd"]
+    )
 
     log_goodbye()
 
@@ -540,12 +717,16 @@ def generate_map_tiles_custom_burd(generate_tribal_layer):
 )
 def generate_map_tiles_custom_ind(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate GI Star Indicator Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Custom tiles")
-    generate_tiles_custom_ind(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["custom_ind"]
+    )
 
     log_goodbye()
 
@@ -563,12 +744,16 @@ def generate_map_tiles_custom_ind(generate_tribal_layer):
 )
 def generate_map_tiles_add(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate Additive Burden Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Additive tiles")
-    generate_tiles_add_burd(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["add_burd"]
+    )
 
     log_goodbye()
 
@@ -585,12 +770,16 @@ def generate_map_tiles_add(generate_tribal_layer):
 )
 def generate_map_tiles_add_ind(generate_tribal_layer):
     """CLI command to generate the map tiles"""
+    from data_pipeline.tile.generate import generate_tiles
+
     log_title("Generate Additive Map Tiles")
 
     data_path = settings.APP_ROOT / "data"
 
     log_info("Generating Additive Indicator tiles")
-    generate_tiles_add_ind(data_path, generate_tribal_layer)
+    generate_tiles(
+        data_path, generate_tribal_layer, layer_names=["add_ind"]
+    )
 
     log_goodbye()
 
@@ -604,21 +793,64 @@ def generate_map_tiles_add_ind(generate_tribal_layer):
     is_flag=True,
     help="Check if data run has been run before, and don't run it if so.",
 )
+@click.option(
+    "-i",
+    "--incremental",
+    is_flag=True,
+    help="Keep the data folders and skip every stage whose inputs, configuration and code have not changed since it last completed.",
+)
+@click.option(
+    "-r",
+    "--resume",
+    is_flag=True,
+    help="Keep the data folders and resume the last run from its first incomplete stage, checking the outputs of the completed ones.",
+)
 @data_source_option
 @use_cache_option
-def data_full_run(check: bool, data_source: str, use_cache: bool):
+@executor_option
+@memory_budget_option
+@keep_going_option
+@profile_option
+def data_full_run(
+    check: bool,
+    incremental: bool,
+    resume: bool,
+    data_source: str,
+    use_cache: bool,
+    executor: str,
+    memory_budget: int,
+    keep_going: bool,
+    profile: bool,
+):
     """CLI command to run ETL, score, JSON combine and generate tiles including tribal layer in one command
 
     Args:
         check (bool): Run the full data run only if the first run semaphore file is not set (optional)
+        incremental (bool): Only run the stages whose fingerprint changed since they last completed (optional)
+        resume (bool): Resume the last run from its first incomplete stage (optional)
         data_source (str): Source for the census data (optional)
                            Options:
                            - local: fetch census and score data from the local data directory
                            - aws: fetch census and score from AWS S3 J40 data repository
+        executor (str): Run the ETLs on "thread" or "process" workers (optional)
+        memory_budget (int): Memory available to the ETLs in bytes (optional)
+        keep_going (bool): Run all the ETLs that can run and report every failure at the end (optional)
+        profile (bool): Save and print a profile of each phase of each stage (optional)
 
      Returns:
         None
     """
+    from data_pipeline.etl.journal import RunJournal
+    from data_pipeline.etl.metrics import RunProfiler
+    from data_pipeline.etl.runner import get_full_run_stages
+    from data_pipeline.etl.runner import stages_runner
+    from data_pipeline.etl.sources.census.etl_utils import (
+        reset_data_directories as census_reset,
+    )
+    from data_pipeline.etl.sources.tribal.etl_utils import (
+        reset_data_directories as tribal_reset,
+    )
+
     log_title("Full Run", "Census DL, ETL, Score, Combine, Generate Tiles")
 
     data_path = settings.APP_ROOT / "data"
@@ -635,35 +867,39 @@ def data_full_run(check: bool, data_source: str, use_cache: bool):
 
     else:
         # Directory cleanup
-        log_info("Cleaning up data folders")
-        census_reset(data_path)
-        data_folder_cleanup()
-        downloadable_cleanup()
-        score_folder_cleanup()
-        geo_score_folder_cleanup()
-        temp_folder_cleanup()
-        tribal_reset(data_path)
-
-        log_info("Downloading census data")
-        etl_runner("census", use_cache)
-
-        log_info("Running all ETLs")
-        etl_runner(use_cache)
-
-        log_info("Generating score")
-        score_generate()
-
-        log_info("Running post score")
-        score_post(data_source)
-
-        log_info("Combining score with census GeoJSON")
-        score_geo(data_source)
-
-        log_info("Generating map tiles")
-        generate_tiles(data_path, False)
-
-        log_info("Generating tribal map tiles")
-        generate_tiles(data_path, True)
+        if incremental or resume:
+            # The outputs of unchanged or completed stages are reused
+            log_info("Cleaning up temp folders")
+            temp_folder_cleanup()
+        else:
+            log_info("Cleaning up data folders")
+            census_reset(data_path)
+            data_folder_cleanup()
+            downloadable_cleanup()
+            score_folder_cleanup()
+            geo_score_folder_cleanup()
+            temp_folder_cleanup()
+            tribal_reset(data_path)
+
+        profiler = RunProfiler() if profile else None
+        try:
+            log_info("Running all stages")
+            stages_runner(
+                get_full_run_stages(
+                    data_source=data_source,
+                    use_cache=use_cache,
+                    executor_type=executor,
+                    memory_budget=memory_budget,
+                    incremental=incremental,
+                    keep_going=keep_going,
+                ),
+                incremental=incremental,
+                profiler=profiler,
+                journal=RunJournal(resume=resume),
+            )
+        finally:
+            if profiler is not None:
+                log_profile(profiler)
 
         log_info("Completing pipeline")
         file = "first_run.txt"
@@ -686,6 +922,8 @@ def print_data_sources(dataset: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import get_data_sources
+
     log_title("Print ETL Datasources")
 
     log_info("Retrieving dataset(s)")
@@ -714,6 +952,8 @@ def extract_data_sources(dataset: str, use_cache: bool):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import extract_data_sources as extract_ds
+
     log_title("Fetch ETL Datasources")
 
     log_info("Fetching data source(s)")
@@ -735,6 +975,10 @@ def clear_data_source_cache(dataset: str):
     Returns:
         None
     """
+    from data_pipeline.etl.runner import (
+        clear_data_source_cache as clear_ds_cache,
+    )
+
     log_title("Fetch ETL Datasources")
 
     log_info("Clear data source cache")
@@ -792,6 +1036,8 @@ def full_run(ctx, use_cache):
 )
 def convert_score(source: Path, destination: Path):
     """Converts the score file to CSV."""
+    import pandas as pd
+
     if source.exists():
         score_df = pd.read_parquet(source)
         logger.info(f"Saving score as CSV to {destination}")
@@ -819,6 +1065,14 @@ def log_info(info: str):
     logger.info(f"- {info}")
 
 
+def log_profile(profiler: "RunProfiler"):
+    """Saves the report of a profiled run and logs its summary"""
+    report_path = profiler.save()
+    log_info(f"Profile report saved to {report_path}")
+    for line in profiler.format_summary().splitlines():
+        logger.info(line)
+
+
 def log_goodbye():
     """Logs a goodbye message"""
     logger.info("- Finished. Bye!")
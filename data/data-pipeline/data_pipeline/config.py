@@ -14,6 +14,12 @@ settings.APP_ROOT = pathlib.Path(data_pipeline.__file__).resolve().parent
 settings.DATA_PATH = settings.APP_ROOT / "data"
 settings.REQUESTS_DEFAULT_TIMOUT = 300
 settings.REQUESTS_DEFAULT_RETRIES = 3
+settings.REQUESTS_DEFAULT_MAX_CONNECTIONS_PER_HOST = 4
+settings.REQUESTS_DEFAULT_MIN_INTERVAL_PER_HOST = 0.1
+settings.REQUESTS_DEFAULT_MIRROR_MAX_CONNECTIONS = 16
+settings.DATASOURCE_DEFAULT_FETCH_WORKERS = 8
+settings.DATASET_DEFAULT_CSV_OUTPUT = True
+settings.RAW_CSV_DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
 # To set an environment use:
 # Linux/OSX: export ENV_FOR_DYNACONF=staging
 # Windows: set ENV_FOR_DYNACONF=staging
@@ -1,4 +1,8 @@
+import concurrent.futures
+import contextlib
+import copy
 import enum
+import functools
 import pathlib
 import sys
 import typing
@@ -12,14 +16,93 @@ from data_pipeline.etl.score.etl_utils import (
     compare_to_list_of_expected_state_fips_codes,
 )
 from data_pipeline.etl.score.schemas.datasets import DatasetsConfig
+from data_pipeline.etl.score.schemas.datasets import FieldType
 from data_pipeline.utils import get_module_logger
 from data_pipeline.utils import load_yaml_dict_from_file
 from data_pipeline.utils import remove_all_from_dir
+from data_pipeline.etl import parsed_sources
 from data_pipeline.etl.datasource import DataSource
+from data_pipeline.etl.parsed_sources import ParsedSourceCache
+from data_pipeline.etl.source_cache import MANIFEST_FILE_NAME
+from data_pipeline.etl.source_cache import SourceManifest
+from data_pipeline.etl.source_cache import SourceStore
 
 logger = get_module_logger(__name__)
 
 
+@functools.lru_cache()
+def _parse_datasets_config(
+    datasets_config_file_path: pathlib.Path, mtime_ns: int
+) -> typing.Dict[str, dict]:
+    """Parses and validates a datasets.yml file, indexed by module name.
+
+    The modification time is only part of the cache key, so that a file
+    changed while the process runs is parsed again.
+    """
+    # pylint: disable=unused-argument
+    datasets_config = load_yaml_dict_from_file(
+        datasets_config_file_path,
+        DatasetsConfig,
+    )
+    return {
+        item["module_name"]: item for item in datasets_config.get("datasets")
+    }
+
+
+def load_datasets_config(
+    datasets_config_file_path: pathlib.Path,
+) -> typing.Dict[str, dict]:
+    """Returns the datasets of a datasets.yml file by module name.
+
+    Every ETL with `LOAD_YAML_CONFIG` reads its configuration from datasets.yml
+    when its class is defined, so the file is only parsed and validated once
+    per process and the result is shared. Don't modify it.
+    """
+    return _parse_datasets_config(
+        datasets_config_file_path,
+        datasets_config_file_path.stat().st_mtime_ns,
+    )
+
+
+# The dtype each field type of datasets.yml is written with. The nullable dtypes
+# keep integers and booleans typed when values are missing.
+FIELD_TYPE_DTYPES = {
+    FieldType.STRING.value: "string",
+    FieldType.INT64.value: "Int64",
+    FieldType.BOOL.value: "boolean",
+    FieldType.FLOAT.value: "float64",
+    FieldType.PERCENTAGE.value: "float64",
+}
+
+
+def get_field_dtypes(
+    datasets_config_file_path: pathlib.Path,
+) -> typing.Dict[str, str]:
+    """Returns the dtypes of the fields loaded by all the datasets of a
+    datasets.yml file, by field name, from their field types"""
+    return {
+        field["long_name"]: FIELD_TYPE_DTYPES[field["field_type"]]
+        for dataset in load_datasets_config(datasets_config_file_path).values()
+        for field in dataset["load_fields"]
+        if field.get("field_type") in FIELD_TYPE_DTYPES
+    }
+
+
+# Whether datasets are also written as CSV, next to their Parquet file
+WRITE_CSV_OUTPUT = (
+    settings.DATASET_CSV_OUTPUT
+    if "DATASET_CSV_OUTPUT" in settings
+    else settings.DATASET_DEFAULT_CSV_OUTPUT
+)
+
+# The size of the chunks raw CSV sources are read in by chunked ETLs, in bytes
+RAW_CSV_CHUNK_SIZE = (
+    settings.RAW_CSV_CHUNK_SIZE
+    if "RAW_CSV_CHUNK_SIZE" in settings
+    else settings.RAW_CSV_DEFAULT_CHUNK_SIZE
+)
+
+
 class ValidGeoLevel(enum.Enum):
     """Enum used for indicating output data's geographic resolution."""
 
@@ -60,6 +143,10 @@ class ExtractTransformLoad(ABC):
     # NAME is used to create output path and populate logger info.
     NAME: str = None
 
+    # OUTPUT_PATH is the directory of the output of the ETLs that have no NAME
+    # and write their output themselves rather than with `load`.
+    OUTPUT_PATH: pathlib.Path = None
+
     # LAST_UPDATED_YEAR is used to create output path.
     LAST_UPDATED_YEAR: int = None
 
@@ -78,6 +165,10 @@ class ExtractTransformLoad(ABC):
     # COLUMNS_TO_KEEP is used to identify which columns to keep in the output df.
     COLUMNS_TO_KEEP: typing.List[str] = None
 
+    # COLUMN_DTYPES are the dtypes of the columns of the output df, by column name.
+    # They are set from the field types of datasets.yml.
+    COLUMN_DTYPES: typing.Dict[str, str] = None
+
     # INPUT_GEOID_TRACT_FIELD_NAME is the field name that identifies the Census Tract ID
     # on the input file
     INPUT_GEOID_TRACT_FIELD_NAME: str = None
@@ -119,6 +210,12 @@ class ExtractTransformLoad(ABC):
     # the YAML files?
     LOAD_YAML_CONFIG: bool = False
 
+    # DEPENDENCIES lists the names of the upstream datasets (as named in
+    # `etl/constants.py`) whose outputs this ETL reads, e.g. "census" for the
+    # census tract GeoJSON. The ETL runner uses it to start this dataset as
+    # soon as all of its inputs exist.
+    DEPENDENCIES: typing.List[str] = []
+
     # We use output_df as the final dataframe to use to write to the CSV
     # It is used on the "load" base class method
     output_df: pd.DataFrame = None
@@ -131,19 +228,14 @@ class ExtractTransformLoad(ABC):
     def yaml_config_load(cls) -> dict:
         """Generate config dictionary and set instance variables from YAML dataset."""
         # check if the class instance has score YAML definitions
-        datasets_config = load_yaml_dict_from_file(
-            cls.DATASET_CONFIG_PATH / "datasets.yml",
-            DatasetsConfig,
+        datasets_config = load_datasets_config(
+            cls.DATASET_CONFIG_PATH / "datasets.yml"
         )
 
         # get the config for this dataset
         try:
-            dataset_config = next(
-                item
-                for item in datasets_config.get("datasets")
-                if item["module_name"] == cls.NAME
-            )
-        except StopIteration:
+            dataset_config = copy.deepcopy(datasets_config[cls.NAME])
+        except KeyError:
             # Note: it'd be nice to log the name of the dataframe, but that's not accessible in this scope.
             logger.error(
                 f"Exception encountered while extracting dataset config for dataset {cls.NAME}"
@@ -161,9 +253,14 @@ class ExtractTransformLoad(ABC):
         cls.COLUMNS_TO_KEEP = [
             cls.GEOID_TRACT_FIELD_NAME,  # always index with geoid tract id
         ]
+        cls.COLUMN_DTYPES = {}
         for field in dataset_config["load_fields"]:
             cls.COLUMNS_TO_KEEP.append(field["long_name"])
             setattr(cls, field["df_field_name"], field["long_name"])
+            if field.get("field_type") in FIELD_TYPE_DTYPES:
+                cls.COLUMN_DTYPES[field["long_name"]] = FIELD_TYPE_DTYPES[
+                    field["field_type"]
+                ]
         return dataset_config
 
     # This is a classmethod so it can be used by `get_data_frame` without
@@ -180,6 +277,37 @@ class ExtractTransformLoad(ABC):
         output_file_path = cls.DATA_PATH / "dataset" / f"{cls.NAME}" / "usa.csv"
         return output_file_path
 
+    @classmethod
+    def _get_output_parquet_path(cls) -> pathlib.Path:
+        """Generate the path of the typed Parquet output, next to the CSV one."""
+        return cls._get_output_file_path().with_suffix(".parquet")
+
+    def get_output_paths(self) -> typing.List[pathlib.Path]:
+        """Returns the files and directories the ETL writes its output to
+
+        Raises:
+            NotImplementedError: if the ETL has neither a NAME nor an OUTPUT_PATH
+        """
+        if self.NAME is not None:
+            return [self._get_output_file_path().parent]
+        if self.OUTPUT_PATH is None:
+            raise NotImplementedError(
+                f"{type(self).__name__} needs to specify `NAME` or "
+                "`OUTPUT_PATH`."
+            )
+        return [self.OUTPUT_PATH]
+
+    @classmethod
+    def _get_output_dtypes(cls) -> typing.Dict[str, str]:
+        """Returns the dtypes of the output columns, by column name"""
+        return {
+            # Not all outputs will have both a Census Block Group ID and a
+            # Tract ID, but these will be ignored if they're not present.
+            cls.GEOID_FIELD_NAME: "string",
+            cls.GEOID_TRACT_FIELD_NAME: "string",
+            **(cls.COLUMN_DTYPES or {}),
+        }
+
     def get_sources_path(self) -> pathlib.Path:
         """Returns the sources path associated with this ETL class. The sources path
         is the home for cached data sources used by this ETL."""
@@ -195,14 +323,62 @@ class ExtractTransformLoad(ABC):
     def get_data_sources(self) -> [DataSource]:
         pass
 
-    def _fetch(self) -> None:
+    def get_source_store(self) -> SourceStore:
+        """Returns the content-addressed store of the files downloaded by all
+        ETLs, shared between them"""
+        return SourceStore(self.get_sources_path().parent / ".store")
+
+    def _fetch(
+        self,
+        use_cached_data_sources: bool = False,
+        manifest: Optional[SourceManifest] = None,
+    ) -> None:
         """Fetch all data sources for this ETL. When data sources are fetched, they
-        are stored in a cache directory for consistency between runs."""
-        for ds in self.get_data_sources():
-            ds.fetch()
+        are stored in a cache directory for consistency between runs.
+
+        Data sources are fetched concurrently. The downloader limits how many
+        requests are made to each host at once and how often."""
+        data_sources = self.get_data_sources()
+        store = self.get_source_store()
+        if manifest is None:
+            manifest = SourceManifest(self.get_sources_path())
+
+        def fetch(ds: DataSource) -> None:
+            ds.fetch_cached(store, manifest, use_cached_data_sources)
+
+        if len(data_sources) <= 1:
+            for ds in data_sources:
+                fetch(ds)
+            return
+
+        max_workers = (
+            settings.DATASOURCE_FETCH_WORKERS
+            if "DATASOURCE_FETCH_WORKERS" in settings
+            else settings.DATASOURCE_DEFAULT_FETCH_WORKERS
+        )
+        logger.debug(
+            f"Fetching {len(data_sources)} data sources for {self.__class__.__name__}"
+        )
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(data_sources))
+        ) as executor:
+            futures = [executor.submit(fetch, ds) for ds in data_sources]
+            try:
+                for fut in concurrent.futures.as_completed(futures):
+                    # Calling result will raise an exception if one occurred.
+                    # Otherwise, the exceptions are silently ignored.
+                    fut.result()
+            except Exception:
+                # Don't start the fetches that are still queued
+                for fut in futures:
+                    fut.cancel()
+                raise
 
     def clear_data_source_cache(self) -> None:
-        """Clears the cache for this ETLs data source(s)"""
+        """Clears the cache for this ETLs data source(s)
+
+        The files stay in the shared source store, so fetching them again only
+        downloads the ones that changed at their source."""
         shutil.rmtree(self.get_sources_path())
 
     def extract(self, use_cached_data_sources: bool = False) -> None:
@@ -210,25 +386,255 @@ class ExtractTransformLoad(ABC):
         that data. By default, this method fetches data from the set of
         data sources returned by get_data_sources.
 
-        If use_cached_data_sources is true, this method attempts to use cached data
-        rather than re-downloading from the original source. The cache algorithm is very
-        simple: it just looks to see if the directory has any contents. If so, it uses
-        that content. If not, it downloads all data sources.
+        Every data source is recorded in a manifest in the sources directory
+        once fetched. If use_cached_data_sources is true, the data sources whose
+        files are intact according to the manifest are used as they are, and
+        only the missing or damaged ones are fetched. Otherwise, each data
+        source is revalidated with its server, and only downloaded again if it
+        changed. A sources directory cached before manifests were kept is used
+        as it is.
 
         Subclasses should call super() before performing any work if they wish to take
         advantage of the automatic downloading and caching ability of this superclass.
         """
-
-        if use_cached_data_sources and any(self.get_sources_path().iterdir()):
-            logger.info(
-                f"Using cached data sources for {self.__class__.__name__}"
+        data_sources = self.get_data_sources()
+        sources_path = self.get_sources_path()
+        if (
+            use_cached_data_sources
+            and not (sources_path / MANIFEST_FILE_NAME).exists()
+            and any(sources_path.iterdir())
+        ):
+            # The sources were cached before manifests were kept, so there is
+            # no way to check them: they are used as they are.
+            logger.warning(
+                f"Using cached data sources for {self.__class__.__name__} without a manifest"
             )
-        else:
-            self.clear_data_source_cache()
-            self._fetch()
+        elif data_sources:
+            manifest = SourceManifest(sources_path)
+            manifest.retain(data_sources)
+            if use_cached_data_sources:
+                logger.info(
+                    f"Using cached data sources for {self.__class__.__name__}"
+                )
+            try:
+                self._fetch(use_cached_data_sources, manifest)
+            finally:
+                # Keep the sources that were fetched, even if others failed
+                manifest.save()
 
         # the rest of the work should be performed here
 
+    def get_parsed_source_cache(self) -> ParsedSourceCache:
+        """Returns the cache of the data frames parsed from the sources of
+        this ETL, kept beside the cached sources"""
+        return ParsedSourceCache(
+            self.get_sources_path().parent
+            / ".parsed"
+            / str(self.__class__.__name__)
+        )
+
+    def _get_raw_csv_columns(
+        self,
+        columns: typing.Dict[str, Optional[str]],
+        optional_columns: Optional[typing.Dict[str, Optional[str]]],
+    ) -> typing.Dict[str, Optional[str]]:
+        columns = {**(optional_columns or {}), **columns}
+        if columns.get(self.INPUT_GEOID_TRACT_FIELD_NAME, "") is None:
+            columns[self.INPUT_GEOID_TRACT_FIELD_NAME] = "string"
+        return columns
+
+    @staticmethod
+    def _open_raw_source(source, member: Optional[str] = None):
+        if member is not None:
+            return source.open_member(member)
+        if isinstance(source, (str, pathlib.Path)):
+            return open(source, "rb")
+        return contextlib.nullcontext(source)
+
+    def read_raw_csv(
+        self,
+        source,
+        columns: typing.Dict[str, Optional[str]],
+        optional_columns: Optional[typing.Dict[str, Optional[str]]] = None,
+        member: Optional[str] = None,
+        na_values: Optional[typing.List[str]] = None,
+        encoding: str = "utf8",
+    ) -> pd.DataFrame:
+        """Reads the columns an ETL needs from a raw source CSV.
+
+        Only the given columns are parsed, with their dtypes, by Arrow's
+        multithreaded CSV reader. This is much faster and uses much less
+        memory than reading wide sources in full with pandas. Unless given a
+        dtype, the tract ID column of the source is read as a string.
+
+        The data frame parsed from a source file is kept, so that it is only
+        parsed again once the source changes.
+
+        Args:
+            source: the path of the CSV file, the file itself, or the
+                ZIPDataSource whose member to read
+            columns (dict): the dtypes of the columns to read, by column name.
+                A dtype of None lets Arrow infer it.
+            optional_columns (dict): the dtypes of columns to read if the
+                source has them (optional)
+            member (str): the member to read, for a ZIPDataSource
+            na_values (list): other values than the default ones to read as
+                missing (optional)
+            encoding (str): the encoding of the file
+
+        Returns:
+            pd.DataFrame: the columns read, in the order of the source
+
+        Raises:
+            ValueError: if the source is missing columns, or has values that
+                don't fit their dtype, as it changed since the ETL was written
+        """
+        columns = self._get_raw_csv_columns(columns, optional_columns)
+
+        def parse() -> pd.DataFrame:
+            with self._open_raw_source(source, member) as file:
+                try:
+                    return parsed_sources.read_csv(
+                        file,
+                        columns=columns,
+                        optional_columns=list(optional_columns or {}),
+                        na_values=na_values,
+                        encoding=encoding,
+                    )
+                except ValueError as e:
+                    raise ValueError(
+                        f"Could not read the source of `{self.NAME}`, it may have changed: {e}"
+                    ) from e
+
+        if member is not None:
+            source_path = source.get_member_file_path(member)
+        elif isinstance(source, (str, pathlib.Path)):
+            source_path = pathlib.Path(source)
+        else:
+            # A file object can't be told apart from another one
+            return parse()
+
+        return self.get_parsed_source_cache().read(
+            source_path,
+            options={
+                "format": "csv",
+                "member": member,
+                "columns": columns,
+                "optional_columns": sorted(optional_columns or {}),
+                "na_values": na_values,
+                "encoding": encoding,
+            },
+            parse=parse,
+        )
+
+    def read_raw_csv_chunks(
+        self,
+        source,
+        columns: typing.Dict[str, Optional[str]],
+        optional_columns: Optional[typing.Dict[str, Optional[str]]] = None,
+        member: Optional[str] = None,
+        na_values: Optional[typing.List[str]] = None,
+        encoding: str = "utf8",
+        chunk_size: Optional[int] = None,
+    ) -> typing.Iterator[pd.DataFrame]:
+        """Reads the columns an ETL needs from a raw source CSV, one chunk
+        at a time.
+
+        This is `read_raw_csv` for sources too large to be held in memory at
+        once. Only one chunk is parsed at a time, so memory use scales with
+        the chunk size rather than the size of the source. Chunks are not
+        kept, as the whole source would have to be held to keep it.
+
+        Args:
+            source: the path of the CSV file, the file itself, or the
+                ZIPDataSource whose member to read
+            columns (dict): the dtypes of the columns to read, by column name.
+                A dtype of None lets Arrow infer it from the first chunk.
+            optional_columns (dict): the dtypes of columns to read if the
+                source has them (optional)
+            member (str): the member to read, for a ZIPDataSource
+            na_values (list): other values than the default ones to read as
+                missing (optional)
+            encoding (str): the encoding of the file
+            chunk_size (int): the size of the chunks in bytes (optional,
+                defaults to the RAW_CSV_CHUNK_SIZE setting)
+
+        Yields:
+            pd.DataFrame: the columns read from each chunk, in the order of
+                the source
+
+        Raises:
+            ValueError: if the source is missing columns, or has values that
+                don't fit their dtype, as it changed since the ETL was written
+        """
+        columns = self._get_raw_csv_columns(columns, optional_columns)
+        with self._open_raw_source(source, member) as file:
+            try:
+                yield from parsed_sources.iter_csv(
+                    file,
+                    columns=columns,
+                    optional_columns=list(optional_columns or {}),
+                    na_values=na_values,
+                    encoding=encoding,
+                    block_size=chunk_size or RAW_CSV_CHUNK_SIZE,
+                )
+            except ValueError as e:
+                raise ValueError(
+                    f"Could not read the source of `{self.NAME}`, it may have changed: {e}"
+                ) from e
+
+    @staticmethod
+    def transform_chunks(
+        chunks: typing.Iterable[pd.DataFrame],
+        transform_chunk: typing.Callable[[pd.DataFrame], pd.DataFrame],
+        reduce: typing.Callable[[pd.DataFrame], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Transforms a raw source read in chunks, reducing the results as
+        they come.
+
+        Each chunk is transformed as soon as it is read and is then dropped.
+        Its result is reduced together with the results of the chunks before
+        it, e.g. by tract, so that what is kept is no larger than the output.
+
+        Args:
+            chunks (iterable): the chunks, as read by `read_raw_csv_chunks`
+            transform_chunk (function): transforms one chunk
+            reduce (function): reduces the concatenated results of chunks.
+                It must give the same result whether the rows it gets were
+                reduced before or not.
+
+        Returns:
+            pd.DataFrame: the reduced results of all chunks
+        """
+        df = None
+        for i, chunk in enumerate(chunks):
+            result = transform_chunk(chunk)
+            df = reduce(result if df is None else pd.concat([df, result]))
+            logger.debug(f"Transformed chunk {i + 1}, {len(df)} rows so far")
+        if df is None:
+            raise ValueError("The source has no rows to transform")
+        return df
+
+    def read_raw_excel(
+        self, source_path: pathlib.Path, **kwargs
+    ) -> pd.DataFrame:
+        """Reads a raw source Excel file with pandas, as Arrow has no Excel
+        reader. Like CSV files, the data frame parsed from the file is kept
+        until the file changes.
+
+        Args:
+            source_path (pathlib.Path): the Excel file
+            kwargs: other arguments to `pd.read_excel`
+
+        Returns:
+            pd.DataFrame: the content of the file
+        """
+        return self.get_parsed_source_cache().read(
+            pathlib.Path(source_path),
+            options={"format": "excel", **kwargs},
+            parse=lambda: pd.read_excel(source_path, **kwargs),
+        )
+
     @abstractmethod
     def transform(self) -> None:
         """Transform the data extracted into a format that can be consumed by the
@@ -347,32 +753,85 @@ class ExtractTransformLoad(ABC):
 
         Data is written in the specified local data folder or remote AWS S3 bucket.
 
-        Uses the directory and the file name from `self._get_output_file_path`.
+        The data is written as Parquet, with the dtypes of `self._get_output_dtypes`,
+        to `self._get_output_parquet_path`. Unless the DATASET_CSV_OUTPUT setting
+        is false, it is also exported as CSV to `self._get_output_file_path`.
         """
-        logger.debug(f"Saving `{self.NAME}` CSV")
+        logger.debug(f"Saving `{self.NAME}` output")
 
         # Create directory if necessary.
         output_file_path = self._get_output_file_path()
         output_file_path.parent.mkdir(parents=True, exist_ok=True)
+        output_parquet_path = self._get_output_parquet_path()
+        # Never leave the output of a previous run behind
+        output_parquet_path.unlink(missing_ok=True)
+        output_file_path.unlink(missing_ok=True)
 
-        # Write nationwide csv
-        self.output_df[self.COLUMNS_TO_KEEP].to_csv(
-            output_file_path, index=False, float_format=float_format
-        )
+        output_df = self.output_df[self.COLUMNS_TO_KEEP]
+        write_csv = WRITE_CSV_OUTPUT
+        try:
+            self._get_typed_output_df(output_df).to_parquet(
+                output_parquet_path, index=False
+            )
+            logger.debug(f"File written to `{output_parquet_path}`.")
+        except (TypeError, ValueError) as e:
+            # Columns of mixed types can't be written as Parquet
+            logger.warning(
+                f"Could not write `{self.NAME}` as Parquet because {e}, writing CSV only"
+            )
+            output_parquet_path.unlink(missing_ok=True)
+            write_csv = True
 
-        logger.debug(f"File written to `{output_file_path}`.")
+        if write_csv:
+            # Write nationwide csv
+            output_df.to_csv(
+                output_file_path, index=False, float_format=float_format
+            )
+            logger.debug(f"File written to `{output_file_path}`.")
+
+    def _get_typed_output_df(self, output_df: pd.DataFrame) -> pd.DataFrame:
+        """Casts the output columns to their dtypes. Columns that can't be cast
+        are kept as they are."""
+        output_df = output_df.copy()
+        for column, dtype in self._get_output_dtypes().items():
+            if column not in output_df.columns:
+                continue
+            try:
+                output_df[column] = output_df[column].astype(dtype)
+            except (TypeError, ValueError) as e:
+                logger.warning(
+                    f"Could not cast `{column}` of `{self.NAME}` to {dtype} because {e}"
+                )
+        return output_df
 
     # This is a classmethod so it can be used without needing to create an instance of
     # the class. This is a use case in `etl_score`.
     @classmethod
-    def get_data_frame(cls) -> pd.DataFrame:
+    def get_data_frame(
+        cls, columns: Optional[typing.List[str]] = None
+    ) -> pd.DataFrame:
         """Return the output data frame for this class.
 
         Must be run after a full ETL process has been run for this class.
 
         If the ETL has been not run for this class, this will error.
+
+        Args:
+            columns (list): the columns to read (optional, defaults to all
+                columns)
+
+        Returns:
+            pd.DataFrame: the output of the ETL
         """
         # Read in output file
+        output_parquet_path = cls._get_output_parquet_path()
+        if output_parquet_path.exists():
+            logger.debug(
+                f"Reading in Parquet `{output_parquet_path}` for ETL of class `{cls}`."
+            )
+            return pd.read_parquet(output_parquet_path, columns=columns)
+
+        # Outputs written before Parquet, or by ETLs with their own `load`
         output_file_path = cls._get_output_file_path()
         if not output_file_path.exists():
             raise ValueError(
@@ -385,6 +844,7 @@ class ExtractTransformLoad(ABC):
         )
         output_df = pd.read_csv(
             output_file_path,
+            usecols=columns,
             dtype={
                 # Not all outputs will have both a Census Block Group ID and a
                 # Tract ID, but these will be ignored if they're not present.
@@ -1,3 +1,7 @@
+# Each dataset may also set a "timeout": the number of seconds its ETL can run
+# for on a worker process before it is stopped and counted as failed. The ETLs
+# that request the Census API have one, as a stuck request would otherwise hold
+# up the whole run.
 DATASET_LIST = [
     {
         "name": "cdc_places",
@@ -28,6 +32,7 @@ DATASET_LIST = [
         "module_dir": "census_decennial",
         "class_name": "CensusDecennialETL",
         "is_memory_intensive": False,
+        "timeout": 3600,
     },
     {
         "name": "mapping_for_ej",
@@ -70,6 +75,7 @@ DATASET_LIST = [
         "module_dir": "census_acs_median_income",
         "class_name": "CensusACSMedianIncomeETL",
         "is_memory_intensive": False,
+        "timeout": 3600,
     },
     {
         "name": "cdc_life_expectancy",
@@ -161,20 +167,19 @@ DATASET_LIST = [
         "class_name": "TribalETL",
         "is_memory_intensive": False,
     },
-    # This has to come after us_geo.parquet exists
     {
         "name": "census_acs",
         "module_dir": "census_acs",
         "class_name": "CensusACSETL",
-        # Not memory intensive, but run at the end
-        "is_memory_intensive": True,
+        "is_memory_intensive": False,
+        "timeout": 3600,
     },
     {
         "name": "census_acs_2010",
         "module_dir": "census_acs_2010",
         "class_name": "CensusACS2010ETL",
-        # Not memory intensive, but run at the end
-        "is_memory_intensive": True,
+        "is_memory_intensive": False,
+        "timeout": 3600,
     },
     {
         "name": "us_army_fuds",
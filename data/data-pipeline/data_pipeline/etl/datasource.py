@@ -2,29 +2,53 @@
 from a remote source. They are meant to be used in conjuction with ETLs
 or other classes that require downloading data.
 
-There are three types of data sources defined in this file:
+There are four types of data sources defined in this file:
 
 FileDataSource – meant to be used when you have a single file to
 retrive from a remote location and save to a destination.
 
 ZipDataSource – used when you need to fetch and unzip a file, and save
-the contents of that file to a destination.
+the contents of that file to a destination. When the members to read are
+declared, the archive is kept as it is and they are read straight from it.
 
 CensusDataSource – used to download data from the Census API and store
 the contents to a destination.
 
+CensusSummaryFileDataSource – used to read ACS data from local summary
+files, and store it to a destination in the form of a Census API response.
+
 DataSource subclasses must implement the fetch method to define how
 they will reach out to a remote source, download the data, and save
 that data to the destination.
 """
 
+import contextlib
+import json
+import urllib.parse
+import zipfile
 from pathlib import Path
+from typing import IO
+from typing import Iterator
 from typing import List
+from typing import Optional
 from dataclasses import dataclass
+from dataclasses import field
 from abc import ABC, abstractmethod
 from data_pipeline.constants import NO_SSL_VERIFY
 
 from data_pipeline.etl.downloader import Downloader
+from data_pipeline.etl.source_cache import SourceManifest
+from data_pipeline.etl.source_cache import SourceStore
+from data_pipeline.etl.source_cache import link_or_copy
+from data_pipeline.etl.sources.census_acs.etl_utils import (
+    CENSUS_ACS_SUMMARY_FILE_PATH,
+)
+from data_pipeline.etl.sources.census_acs.etl_utils import (
+    read_census_acs_summary_file,
+)
+from data_pipeline.etl.sources.census_acs.etl_utils import (
+    read_census_acs_summary_file_tracts,
+)
 from data_pipeline.etl.sources.census_acs.etl_utils import (
     retrieve_census_acs_data,
 )
@@ -40,16 +64,40 @@ class DataSource(ABC):
             the location of this data source, as a url
     destination : Path
             the Path where the data source should be saved locally upon being fetched
+    expected_sha256 : str
+            the sha256 of the file at the source; when set, a download with any other
+            content fails (optional, keyword only)
 
     """
 
     source: str
     destination: Path
+    expected_sha256: Optional[str] = field(default=None, kw_only=True)
 
     @abstractmethod
     def fetch(self) -> None:
         pass
 
+    def fetch_cached(
+        self,
+        store: SourceStore,
+        manifest: SourceManifest,
+        use_cache: bool = False,
+    ) -> None:
+        """Fetches the data source, unless the cache can be used and the copy
+        described by the manifest is intact. Records the fetch in the manifest.
+
+        Args:
+            store (SourceStore): the store of downloaded files
+            manifest (SourceManifest): the manifest of the dataset's sources
+            use_cache (bool): use an intact copy as is, without checking with
+                the source whether it has changed
+        """
+        if use_cache and manifest.is_intact(self):
+            return
+        self.fetch()
+        manifest.record(self, [self.destination])
+
 
 @dataclass
 class FileDataSource(DataSource):
@@ -67,7 +115,35 @@ class FileDataSource(DataSource):
             file_url=self.source,
             download_file_name=self.destination,
             verify=not NO_SSL_VERIFY,
+            expected_sha256=self.expected_sha256,
+        )
+
+    def fetch_cached(
+        self,
+        store: SourceStore,
+        manifest: SourceManifest,
+        use_cache: bool = False,
+    ) -> None:
+        """Fetches the file through the store, where it is only downloaded
+        again if the server reports it has changed"""
+        if use_cache and manifest.is_intact(self):
+            return
+        entry = manifest.get(self)
+        download = store.fetch(
+            self.source,
+            verify=not NO_SSL_VERIFY,
+            expected_sha256=self.expected_sha256,
+            revalidate=not use_cache,
         )
+        if not (
+            entry is not None
+            and entry["sha256"] == download["sha256"]
+            and manifest.is_intact(self)
+        ):
+            link_or_copy(
+                store.get_object_path(download["sha256"]), self.destination
+            )
+        manifest.record(self, [self.destination], download)
 
     def __str__(self):
         return f"File – {self.source}"
@@ -78,17 +154,136 @@ class ZIPDataSource(DataSource):
     """A data source representing ZIP files.
 
     Zip files will be fetched and placed in the destination folder, then unzipped.
+
+    If the members of the archive to read are declared, nothing is extracted:
+    the archive is kept in the destination folder and the members are read
+    from it with `open_member`.
+
+    Attributes:
+    members : List[str]
+            the members of the archive that are read (optional, keyword only)
     """
 
+    members: Optional[List[str]] = field(default=None, kw_only=True)
+
+    @property
+    def archive_path(self) -> Path:
+        """The path the archive is kept at when its members are declared"""
+        file_name = Path(urllib.parse.urlsplit(self.source).path).name
+        return self.destination / (file_name or "download.zip")
+
+    def get_member_file_path(self, member: str) -> Path:
+        """Returns the file a declared member is read from: the archive, or
+        the member itself when the sources were cached extracted"""
+        if not self.archive_path.exists():
+            return self.destination / member
+        return self.archive_path
+
+    def _check_members(self) -> None:
+        with zipfile.ZipFile(self.archive_path, "r") as zip_ref:
+            missing_members = set(self.members) - set(zip_ref.namelist())
+        if missing_members:
+            raise FileNotFoundError(
+                f"{', '.join(sorted(missing_members))} not found in {self.source}"
+            )
+
+    @contextlib.contextmanager
+    def open_member(self, member: str) -> Iterator[IO[bytes]]:
+        """Opens a declared member of the archive, streaming it from the
+        archive without extracting it
+
+        Args:
+            member (str): the name of the member in the archive
+
+        Returns:
+            file: the binary file object of the member, e.g. for pd.read_csv
+        """
+        if self.members is None or member not in self.members:
+            raise ValueError(f"{member} is not a declared member of {self}")
+        if not self.archive_path.exists():
+            # The sources were cached extracted, before members were declared
+            with open(self.destination / member, "rb") as file:
+                yield file
+            return
+        with zipfile.ZipFile(self.archive_path, "r") as zip_ref:
+            with zip_ref.open(member) as file:
+                yield file
+
     def fetch(self) -> None:
 
         self.destination.mkdir(parents=True, exist_ok=True)
+        if self.members is not None:
+            Downloader.download_file_from_url(
+                file_url=self.source,
+                download_file_name=self.archive_path,
+                verify=not NO_SSL_VERIFY,
+                expected_sha256=self.expected_sha256,
+            )
+            self._check_members()
+            return
         Downloader.download_zip_file_from_url(
             file_url=self.source,
             unzipped_file_path=self.destination,
             verify=not NO_SSL_VERIFY,
+            expected_sha256=self.expected_sha256,
         )
 
+    def fetch_cached(
+        self,
+        store: SourceStore,
+        manifest: SourceManifest,
+        use_cache: bool = False,
+    ) -> None:
+        """Fetches the zip file through the store, and only extracts it again
+        if it has changed. The archive is linked as it is instead when its
+        members are declared."""
+        if use_cache and manifest.is_intact(self):
+            return
+        entry = manifest.get(self)
+        download = store.fetch(
+            self.source,
+            verify=not NO_SSL_VERIFY,
+            expected_sha256=self.expected_sha256,
+            revalidate=not use_cache,
+        )
+        if self.members is not None:
+            if not (
+                entry is not None
+                and entry["sha256"] == download["sha256"]
+                and manifest.is_intact(self)
+            ):
+                link_or_copy(
+                    store.get_object_path(download["sha256"]),
+                    self.archive_path,
+                )
+                self._check_members()
+            manifest.record(self, [self.archive_path], download)
+            return
+
+        if (
+            entry is not None
+            and entry["sha256"] == download["sha256"]
+            and manifest.is_intact(self)
+        ):
+            manifest.record(
+                self,
+                [manifest.sources_path / path for path in entry["files"]],
+                download,
+            )
+            return
+
+        self.destination.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(
+            store.get_object_path(download["sha256"]), "r"
+        ) as zip_ref:
+            zip_ref.extractall(self.destination)
+            members = [
+                self.destination / member.filename
+                for member in zip_ref.infolist()
+                if not member.is_dir()
+            ]
+        manifest.record(self, members, download)
+
     def __str__(self):
         return f"Zip – {self.source}"
 
@@ -98,6 +293,18 @@ class CensusDataSource(DataSource):
     """A data source representing census data.
 
     Data will be fetched using the Census API and saved to the destination file. Source is ignored.
+
+    When ACS summary files are available locally, the data is read from them
+    instead.
+
+    Attributes:
+    cache_path : Path
+            the directory the Census API responses are cached in (optional, keyword
+            only, defaults to `sources/.census_api` in the data path)
+    summary_file_path : Path
+            the directory or zip archive of ACS summary files to read the data from
+            (optional, keyword only, defaults to the CENSUS_ACS_SUMMARY_FILE_PATH
+            setting)
     """
 
     acs_year: int
@@ -105,16 +312,32 @@ class CensusDataSource(DataSource):
     tract_output_field_name: str
     data_path_for_fips_codes: Path
     acs_type: str
+    cache_path: Optional[Path] = field(default=None, kw_only=True)
+    summary_file_path: Optional[Path] = field(default=None, kw_only=True)
 
     def fetch(self) -> None:
 
-        df = retrieve_census_acs_data(
-            acs_year=self.acs_year,
-            variables=self.variables,
-            tract_output_field_name=self.tract_output_field_name,
-            data_path_for_fips_codes=self.data_path_for_fips_codes,
-            acs_type=self.acs_type,
+        summary_file_path = (
+            self.summary_file_path or CENSUS_ACS_SUMMARY_FILE_PATH
         )
+        if summary_file_path is not None:
+            df = read_census_acs_summary_file_tracts(
+                acs_year=self.acs_year,
+                variables=self.variables,
+                tract_output_field_name=self.tract_output_field_name,
+                summary_file_path=summary_file_path,
+                acs_type=self.acs_type,
+            )
+        else:
+            df = retrieve_census_acs_data(
+                acs_year=self.acs_year,
+                variables=self.variables,
+                tract_output_field_name=self.tract_output_field_name,
+                data_path_for_fips_codes=self.data_path_for_fips_codes,
+                acs_type=self.acs_type,
+                cache_path=self.cache_path
+                or self.data_path_for_fips_codes / "sources" / ".census_api",
+            )
 
         self.destination.parent.mkdir(parents=True, exist_ok=True)
 
@@ -123,3 +346,40 @@ class CensusDataSource(DataSource):
 
     def __str__(self):
         return f"Census – {self.acs_type}, {self.acs_year}"
+
+
+@dataclass
+class CensusSummaryFileDataSource(DataSource):
+    """A data source representing ACS variables for a geographic level, read
+    from the ACS summary files in `source`, a directory or zip archive.
+
+    The data is saved to the destination file as JSON, in the form of a Census
+    API response, so it can stand in for one.
+    """
+
+    acs_year: int
+    variables: List[str]
+    geo_level: str
+    acs_type: str = "acs5"
+
+    def fetch(self) -> None:
+
+        df = read_census_acs_summary_file(
+            acs_year=self.acs_year,
+            variables=self.variables,
+            summary_file_path=Path(self.source),
+            acs_type=self.acs_type,
+            geo_level=self.geo_level,
+        ).reset_index()
+        # Like the Census API, the geography comes last and values are strings
+        df = df[self.variables + [self.geo_level]]
+        rows = [list(df.columns)] + df.astype(object).where(
+            df.notna(), None
+        ).values.tolist()
+
+        self.destination.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.destination, "w", encoding="utf-8") as file:
+            json.dump(rows, file)
+
+    def __str__(self):
+        return f"Census summary file – {self.acs_type}, {self.acs_year}"
@@ -1,8 +1,14 @@
-import uuid
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import typing
+import urllib.parse
 import urllib3
 import requests
 import zipfile
-import shutil
 
 from pathlib import Path
 from data_pipeline.config import settings
@@ -11,6 +17,152 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = get_module_logger(__name__)
 
+# Size of the chunks a download is streamed to disk in
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The data sources of a dataset are fetched concurrently, so the requests
+# made to each host are limited in number and in rate
+MAX_CONNECTIONS_PER_HOST = (
+    settings.REQUEST_MAX_CONNECTIONS_PER_HOST
+    if "REQUEST_MAX_CONNECTIONS_PER_HOST" in settings
+    else settings.REQUESTS_DEFAULT_MAX_CONNECTIONS_PER_HOST
+)
+MIN_INTERVAL_PER_HOST = (
+    settings.REQUEST_MIN_INTERVAL_PER_HOST
+    if "REQUEST_MIN_INTERVAL_PER_HOST" in settings
+    else settings.REQUESTS_DEFAULT_MIN_INTERVAL_PER_HOST
+)
+# The S3 mirror of the data sources, which nearly every ETL downloads from at
+# the same time, takes more connections and needs no spacing between requests
+MIRROR_HOST = urllib.parse.urlsplit(
+    settings.AWS_JUSTICE40_DATASOURCES_URL
+).netloc
+MIRROR_MAX_CONNECTIONS = (
+    settings.REQUEST_MIRROR_MAX_CONNECTIONS
+    if "REQUEST_MIRROR_MAX_CONNECTIONS" in settings
+    else settings.REQUESTS_DEFAULT_MIRROR_MAX_CONNECTIONS
+)
+
+_session: typing.Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class DownloadChecksumError(Exception):
+    """Raised when a downloaded file doesn't have the expected sha256"""
+
+
+class IncompleteDownloadError(Exception):
+    """Raised when a download ends before the whole file was received. The
+    partial download is kept, to be resumed."""
+
+
+def get_session() -> requests.Session:
+    """Returns the session shared by all downloads, which keeps connections to
+    each host open between requests, including across ETLs running on threads"""
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=os.cpu_count() or 1,
+                pool_maxsize=max(
+                    MAX_CONNECTIONS_PER_HOST, MIRROR_MAX_CONNECTIONS
+                ),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+class HostLimiter:
+    """Limits the requests made to each host: at most `max_connections` at the
+    same time, started at least `min_interval` seconds apart. Hosts in
+    `host_limits` have their own `(max_connections, min_interval)`."""
+
+    def __init__(
+        self,
+        max_connections: int,
+        min_interval: float,
+        host_limits: typing.Optional[
+            typing.Dict[str, typing.Tuple[int, float]]
+        ] = None,
+    ):
+        self.max_connections = max_connections
+        self.min_interval = min_interval
+        self.host_limits = host_limits or {}
+        self._lock = threading.Lock()
+        self._semaphores: typing.Dict[str, threading.Semaphore] = {}
+        self._next_start_times: typing.Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def limit(self, url: str):
+        """Waits until a request can be made to the host of a URL, and holds a
+        connection slot for that host while the block runs"""
+        host = urllib.parse.urlsplit(url).netloc
+        max_connections, min_interval = self.host_limits.get(
+            host, (self.max_connections, self.min_interval)
+        )
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.Semaphore(max_connections)
+            )
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start_time = max(now, self._next_start_times.get(host, now))
+                self._next_start_times[host] = start_time + min_interval
+            time.sleep(start_time - now)
+            yield
+
+
+host_limiter = HostLimiter(
+    MAX_CONNECTIONS_PER_HOST,
+    MIN_INTERVAL_PER_HOST,
+    host_limits={MIRROR_HOST: (MIRROR_MAX_CONNECTIONS, 0)},
+)
+
+
+def _get_content_length(
+    response: requests.Response,
+) -> typing.Optional[int]:
+    """Returns the size of the file in a response, unless it is encoded, as
+    the encoded size differs from the size of the file"""
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    content_length = response.headers.get("Content-Length")
+    return int(content_length) if content_length is not None else None
+
+
+def _get_content_range_size(
+    response: requests.Response,
+) -> typing.Optional[int]:
+    """Returns the size of the whole file from the Content-Range of a partial
+    response, e.g. `bytes 100-199/200`"""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _get_range_validator(
+    response: requests.Response,
+) -> typing.Optional[str]:
+    """Returns the If-Range value to resume the download of a response, if the
+    server accepts range requests for it"""
+    if response.headers.get("Accept-Ranges") != "bytes":
+        return None
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    etag = response.headers.get("ETag")
+    # Weak ETags can't be used for range requests
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _write_resume_file(path: Path, file_url: str, validator: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"url": file_url, "validator": validator}, file)
+
 
 def _log_retry_failure(retry_state):
     logger.warning(
@@ -27,6 +179,157 @@ class Downloader:
         else settings.REQUESTS_DEFAULT_RETRIES
     )
 
+    @classmethod
+    def _download(
+        cls,
+        file_url: str,
+        download_file_name: Path,
+        verify: bool = True,
+        expected_sha256: typing.Optional[str] = None,
+        etag: typing.Optional[str] = None,
+        last_modified: typing.Optional[str] = None,
+    ) -> typing.Optional[dict]:
+        """Streams a file to disk, see `download_file_from_url`.
+
+        When `etag` or `last_modified` are given, the request is conditional:
+        if the file hasn't changed, nothing is downloaded and None is returned.
+
+        A partial download left by an earlier attempt is resumed with a Range
+        request, if the server supports them for the file and the file hasn't
+        changed since. The size received is checked against the size announced
+        by the server before the file is moved into place.
+
+        Returns:
+                dict: the size, sha256, ETag and Last-Modified of the file, or None
+                if it hasn't changed
+        """
+        # disable https warning
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        download_file_name.parent.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Downloading {file_url}")
+        timeout = (
+            settings.REQUEST_TIMEOUT
+            if "REQUEST_TIMEOUT" in settings
+            else settings.REQUESTS_DEFAULT_TIMOUT
+        )
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        partial_file_name = download_file_name.with_name(
+            f"{download_file_name.name}.part"
+        )
+        resume_file_name = download_file_name.with_name(
+            f"{download_file_name.name}.part.json"
+        )
+        resume_from = cls._get_resume_point(
+            file_url, partial_file_name, resume_file_name
+        )
+        range_headers = {}
+        if resume_from is not None:
+            range_headers = {
+                "Range": f"bytes={resume_from['size']}-",
+                "If-Range": resume_from["validator"],
+                "Accept-Encoding": "identity",
+            }
+        with host_limiter.limit(file_url), get_session().get(
+            file_url,
+            verify=verify,
+            timeout=timeout,
+            stream=True,
+            headers={**headers, **range_headers},
+        ) as response:
+            if response.status_code == 304 and headers:
+                logger.debug(f"{file_url} has not changed")
+                return None
+
+            sha256 = hashlib.sha256()
+            size = 0
+            if response.status_code == 206 and resume_from is not None:
+                logger.debug(
+                    f"Resuming the download of {file_url} from byte {resume_from['size']}"
+                )
+                # The hash covers the part downloaded earlier too
+                with open(partial_file_name, "rb") as file:
+                    for chunk in iter(
+                        lambda: file.read(DOWNLOAD_CHUNK_SIZE), b""
+                    ):
+                        sha256.update(chunk)
+                        size += len(chunk)
+                mode = "ab"
+                expected_size = _get_content_range_size(response)
+            elif response.status_code == 200:
+                mode = "wb"
+                expected_size = _get_content_length(response)
+                # The download can be resumed if it breaks, as long as the
+                # file stays the same
+                validator = _get_range_validator(response)
+                if validator is not None:
+                    _write_resume_file(resume_file_name, file_url, validator)
+                else:
+                    resume_file_name.unlink(missing_ok=True)
+            else:
+                # A partial download that can't be resumed is started again
+                partial_file_name.unlink(missing_ok=True)
+                resume_file_name.unlink(missing_ok=True)
+                # pylint: disable-next=broad-exception-raised
+                raise Exception(
+                    f"HTTP response {response.status_code} from url {file_url}. Info: {response.content}"
+                )
+
+            # Write the contents to disk as they arrive.
+            with open(partial_file_name, mode) as file:
+                for chunk in response.iter_content(
+                    chunk_size=DOWNLOAD_CHUNK_SIZE
+                ):
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    file.write(chunk)
+
+        if expected_size is not None and size != expected_size:
+            raise IncompleteDownloadError(
+                f"Received {size} of the {expected_size} bytes of {file_url}"
+            )
+        logger.debug("Downloaded.")
+
+        resume_file_name.unlink(missing_ok=True)
+        if (
+            expected_sha256 is not None
+            and sha256.hexdigest() != expected_sha256.lower()
+        ):
+            partial_file_name.unlink()
+            raise DownloadChecksumError(
+                f"File downloaded from {file_url} has sha256 {sha256.hexdigest()}, expected {expected_sha256}"
+            )
+        os.replace(partial_file_name, download_file_name)
+
+        return {
+            "size": size,
+            "sha256": sha256.hexdigest(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    @staticmethod
+    def _get_resume_point(
+        file_url: str, partial_file_name: Path, resume_file_name: Path
+    ) -> typing.Optional[dict]:
+        """Returns the size and validator of a partial download of a URL that
+        can be resumed, if there is one"""
+        if not partial_file_name.exists() or not resume_file_name.exists():
+            return None
+        try:
+            with open(resume_file_name, encoding="utf-8") as file:
+                resume_info = json.load(file)
+        except ValueError:
+            return None
+        size = partial_file_name.stat().st_size
+        if resume_info.get("url") != file_url or size == 0:
+            return None
+        return {"size": size, "validator": resume_info["validator"]}
+
     @classmethod
     @retry(
         stop=stop_after_attempt(num_retries),
@@ -38,44 +341,31 @@ class Downloader:
         file_url: str,
         download_file_name: Path,
         verify: bool = True,
-    ) -> str:
+        expected_sha256: typing.Optional[str] = None,
+    ) -> Path:
         """Downloads a file from a remote URL location and returns the file location.
 
+        The file is streamed to disk in chunks, so it is never held in memory as a
+        whole, and its sha256 is computed along the way. It is only moved to
+        `download_file_name` once complete.
+
         Args:
                 file_url (str): URL where the zip file is located
                 download_file_name (pathlib.Path): file path where the file will be downloaded (called downloaded.zip by default)
                 verify (bool): A flag to check if the certificate is valid. If truthy, an invalid certificate will throw an
                 error (optional, default to False)
+                expected_sha256 (str): The sha256 the file must have. If it doesn't, the download fails (optional)
 
         Returns:
-                None
+                pathlib.Path: the path of the downloaded file
 
         """
-        # disable https warning
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-        download_file_name.parent.mkdir(parents=True, exist_ok=True)
-        logger.debug(f"Downloading {file_url}")
-        timeout = (
-            settings.REQUEST_TIMEOUT
-            if "REQUEST_TIMEOUT" in settings
-            else settings.REQUESTS_DEFAULT_TIMOUT
+        cls._download(
+            file_url=file_url,
+            download_file_name=download_file_name,
+            verify=verify,
+            expected_sha256=expected_sha256,
         )
-        response = requests.get(file_url, verify=verify, timeout=timeout)
-        if response.status_code == 200:
-            file_contents = response.content
-            logger.debug("Downloaded.")
-        else:
-            # pylint: disable-next=broad-exception-raised
-            raise Exception(
-                f"HTTP response {response.status_code} from url {file_url}. Info: {response.content}"
-            )
-
-        # Write the contents to disk.
-        file = open(download_file_name, "wb")
-        file.write(file_contents)
-        file.close()
-
         return download_file_name
 
     @classmethod
@@ -84,43 +374,75 @@ class Downloader:
         wait=wait_exponential(multiplier=1, min=4, max=10),
         before_sleep=_log_retry_failure,
     )
+    def download_file_if_modified(
+        cls,
+        file_url: str,
+        download_file_name: Path,
+        verify: bool = True,
+        expected_sha256: typing.Optional[str] = None,
+        etag: typing.Optional[str] = None,
+        last_modified: typing.Optional[str] = None,
+    ) -> typing.Optional[dict]:
+        """Downloads a file unless the server reports that it hasn't changed since
+        a previous download, identified by its ETag or Last-Modified header.
+
+        Args:
+                file_url (str): URL where the file is located
+                download_file_name (pathlib.Path): file path where the file will be downloaded
+                verify (bool): A flag to check if the certificate is valid (optional)
+                expected_sha256 (str): The sha256 the file must have (optional)
+                etag (str): The ETag of the previous download (optional)
+                last_modified (str): The Last-Modified header of the previous download (optional)
+
+        Returns:
+                dict: the size, sha256, ETag and Last-Modified of the downloaded file,
+                or None if it hasn't changed and wasn't downloaded
+        """
+        return cls._download(
+            file_url=file_url,
+            download_file_name=download_file_name,
+            verify=verify,
+            expected_sha256=expected_sha256,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    @classmethod
     def download_zip_file_from_url(
         cls,
         file_url: str,
         unzipped_file_path: Path,
         verify: bool = True,
+        expected_sha256: typing.Optional[str] = None,
     ) -> None:
-        """Downloads a zip file from a remote URL location and unzips it in a specific directory, removing the temporary file after
+        """Downloads a zip file from a remote URL location and unzips it in a specific directory
+
+        The zip file is fetched through the store of downloaded files shared by the
+        ETLs (see `SourceStore`). A download that breaks is resumed by the next
+        attempt, rather than started over, and an unchanged file is not downloaded
+        again.
 
         Args:
                 file_url (str): URL where the zip file is located
                 unzipped_file_path (pathlib.Path): directory and name of the extracted file
                 verify (bool): A flag to check if the certificate is valid. If truthy, an invalid certificate will throw an
                 error (optional, default to False)
+                expected_sha256 (str): The sha256 the zip file must have. If it doesn't, the download fails (optional)
 
         Returns:
                 None
 
         """
-        # dir_id allows us to evade race conditions on parallel ETLs
-        dir_id = uuid.uuid4()
-
-        zip_download_path = (
-            settings.DATA_PATH
-            / "tmp"
-            / "downloads"
-            / f"{dir_id}"
-            / "download.zip"
-        )
+        # Imported here, as the store downloads its files with this class
+        from data_pipeline.etl.source_cache import SourceStore
 
-        zip_file_path = Downloader.download_file_from_url(
-            file_url=file_url,
-            download_file_name=zip_download_path,
-            verify=verify,
+        store = SourceStore(settings.DATA_PATH / "sources" / ".store")
+        download = store.fetch(
+            file_url, verify=verify, expected_sha256=expected_sha256
         )
 
-        with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
+        # Members are extracted one at a time straight from the file
+        with zipfile.ZipFile(
+            store.get_object_path(download["sha256"]), "r"
+        ) as zip_ref:
             zip_ref.extractall(unzipped_file_path)
-
-        # cleanup temporary file and directory
-        shutil.rmtree(zip_download_path.parent)
@@ -0,0 +1,158 @@
+"""Content fingerprints of the stages of a full data run.
+
+A stage's fingerprint is a hash of everything it reads: its input files, the
+YAML configs it depends on and its own source code. Once a stage has run, its
+fingerprint is stored so that an incremental run can skip every stage whose
+fingerprint has not changed since.
+"""
+import hashlib
+import json
+import os
+import typing
+from pathlib import Path
+
+from data_pipeline.config import settings
+from data_pipeline.utils import get_module_logger
+
+logger = get_module_logger(__name__)
+
+STAGE_FINGERPRINTS_FILE_PATH = settings.DATA_PATH / "stage_fingerprints.json"
+
+DATASETS_CONFIG_PATH = (
+    settings.APP_ROOT / "etl" / "score" / "config" / "datasets.yml"
+)
+CSV_CONFIG_PATH = settings.APP_ROOT / "content" / "config" / "csv.yml"
+EXCEL_CONFIG_PATH = settings.APP_ROOT / "content" / "config" / "excel.yml"
+
+# Never part of a fingerprint, as they change without the content changing
+IGNORED_NAMES = {"__pycache__", ".DS_Store", ".gitignore"}
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def list_files(path: Path) -> typing.List[Path]:
+    """Returns the file at path, or every file under it if it is a directory"""
+    if path.is_file():
+        return [path]
+    files = []
+    for root, dirs, file_names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+        files.extend(
+            Path(root) / file_name
+            for file_name in sorted(file_names)
+            if file_name not in IGNORED_NAMES and not file_name.endswith(".pyc")
+        )
+    return files
+
+
+class StageFingerprints:
+    """The fingerprints of the stages that have completed, stored as JSON on
+    the local data directory.
+
+    Hashing multi-gigabyte inputs on every run would be slow, so the hash of
+    each file is also kept along with its size and modification time, and is
+    only computed again when either of them changes.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or STAGE_FINGERPRINTS_FILE_PATH
+        self.stages: typing.Dict[str, dict] = {}
+        self.file_hashes: typing.Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    content = json.load(file)
+                self.stages = content.get("stages", {})
+                self.file_hashes = content.get("files", {})
+            except ValueError:
+                logger.warning(
+                    f"Ignoring unreadable stage fingerprints file `{self.path}`"
+                )
+
+    def hash_file(self, path: Path) -> str:
+        """Returns the sha256 of a file's content"""
+        stat = path.stat()
+        key = str(path.resolve())
+        cached = self.file_hashes.get(key)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        self.file_hashes[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256.hexdigest(),
+        }
+        return sha256.hexdigest()
+
+    def compute(
+        self,
+        inputs: typing.List[Path],
+        parameters: typing.Optional[typing.List[str]] = None,
+    ) -> str:
+        """Returns the fingerprint of a stage
+
+        Args:
+            inputs (list): the files and directories the stage reads, including
+                its own source code and configuration
+            parameters (list): any other value that changes the stage's output,
+                e.g. the fingerprints of upstream stages (optional)
+
+        Returns:
+            str: the fingerprint
+        """
+        fingerprint = hashlib.sha256()
+        for input_path in sorted(Path(p) for p in inputs):
+            if not input_path.exists():
+                fingerprint.update(f"{input_path}:missing\n".encode())
+                continue
+            for file in list_files(input_path):
+                fingerprint.update(f"{file}:{self.hash_file(file)}\n".encode())
+        for parameter in parameters or []:
+            fingerprint.update(f"{parameter}\n".encode())
+        return fingerprint.hexdigest()
+
+    def get(self, stage: str) -> typing.Optional[str]:
+        """Returns the fingerprint recorded for a stage, if it has completed"""
+        return self.stages.get(stage, {}).get("fingerprint")
+
+    def is_up_to_date(self, stage: str, fingerprint: str) -> bool:
+        """Checks whether a stage last completed with the same fingerprint and
+        its outputs are still there"""
+        record = self.stages.get(stage)
+        if not record or record["fingerprint"] != fingerprint:
+            return False
+        return all(Path(output).exists() for output in record["outputs"])
+
+    def record(
+        self,
+        stage: str,
+        fingerprint: str,
+        outputs: typing.Optional[typing.List[Path]] = None,
+    ) -> None:
+        """Records that a stage completed with a fingerprint"""
+        self.stages[stage] = {
+            "fingerprint": fingerprint,
+            "outputs": [str(output) for output in outputs or []],
+        }
+
+    def forget(self, stage: str) -> None:
+        """Drops a stage's fingerprint, e.g. before running it again"""
+        self.stages.pop(stage, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"stages": self.stages, "files": self.file_hashes},
+                file,
+                indent=2,
+                sort_keys=True,
+            )
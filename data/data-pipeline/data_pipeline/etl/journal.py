@@ -0,0 +1,88 @@
+"""Journal of the stages completed by a full data run, so that a run that
+failed part way through can be resumed from the first incomplete stage.
+"""
+import datetime
+import hashlib
+import json
+import typing
+from pathlib import Path
+
+from data_pipeline.config import settings
+from data_pipeline.etl.fingerprint import HASH_CHUNK_SIZE
+from data_pipeline.etl.fingerprint import list_files
+from data_pipeline.utils import get_module_logger
+
+logger = get_module_logger(__name__)
+
+RUN_JOURNAL_FILE_PATH = settings.DATA_PATH / "run_journal.json"
+
+
+def _get_output_manifest(output: Path) -> typing.Optional[dict]:
+    """Describes an output so that it can be checked later on
+
+    Files are checksummed. Directories such as the map tiles hold hundreds of
+    thousands of files, so only their file count and total size are kept.
+    """
+    if not output.exists():
+        return None
+    if output.is_file():
+        sha256 = hashlib.sha256()
+        with open(output, "rb") as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        return {"size": output.stat().st_size, "sha256": sha256.hexdigest()}
+    files = list_files(output)
+    return {
+        "files": len(files),
+        "size": sum(file.stat().st_size for file in files),
+    }
+
+
+class RunJournal:
+    """Records each stage of a run as it completes, with its outputs, in a
+    JSON file on the local data directory."""
+
+    def __init__(self, path: Path = None, resume: bool = False):
+        self.path = path or RUN_JOURNAL_FILE_PATH
+        self.stages: typing.Dict[str, dict] = {}
+        if resume:
+            if self.path.exists():
+                with open(self.path, encoding="utf-8") as file:
+                    self.stages = json.load(file)["stages"]
+            else:
+                logger.warning(
+                    f"No run journal found at `{self.path}`, running all stages"
+                )
+
+    def is_complete(self, stage: str) -> bool:
+        """Checks whether a stage completed and its outputs are still intact"""
+        record = self.stages.get(stage)
+        if record is None:
+            return False
+        for output, manifest in record["outputs"].items():
+            output = Path(output)
+            if not output.exists():
+                logger.warning(f"Output `{output}` of {stage} is missing")
+                return False
+            if _get_output_manifest(output) != manifest:
+                logger.warning(f"Output `{output}` of {stage} has changed")
+                return False
+        return True
+
+    def complete(
+        self, stage: str, outputs: typing.Optional[typing.List[Path]] = None
+    ) -> None:
+        """Marks a stage as complete and saves the journal"""
+        self.stages[stage] = {
+            "completed_at": datetime.datetime.now().isoformat(),
+            "outputs": {
+                str(output): _get_output_manifest(Path(output))
+                for output in outputs or []
+            },
+        }
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump({"stages": self.stages}, file, indent=2)
@@ -0,0 +1,251 @@
+"""Resource metrics collected for each dataset run by the ETL runner.
+
+The runner records the peak memory used by every dataset in a small JSON
+store on the local data directory, and uses those figures on later runs to
+decide how many datasets fit in memory at the same time. It also profiles each
+phase of each stage, which can be saved as a run report.
+"""
+import contextlib
+import datetime
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import typing
+from pathlib import Path
+
+import pandas as pd
+
+from data_pipeline.config import settings
+from data_pipeline.utils import get_module_logger
+
+logger = get_module_logger(__name__)
+
+ETL_METRICS_FILE_PATH = settings.DATA_PATH / "etl_metrics.json"
+PROFILE_REPORTS_PATH = settings.DATA_PATH / "profiles"
+
+MEMORY_SIZE_UNITS = {
+    "": 1,
+    "K": 1024,
+    "M": 1024**2,
+    "G": 1024**3,
+    "T": 1024**4,
+}
+
+
+def parse_memory_size(memory_size: str) -> int:
+    """Converts a human readable memory size such as "24G" or "512M" into bytes
+
+    Args:
+        memory_size (str): a number optionally followed by one of K, M, G or T
+
+    Returns:
+        int: the size in bytes
+    """
+    match = re.fullmatch(
+        r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", memory_size.upper()
+    )
+    if not match:
+        raise ValueError(f"Invalid memory size: {memory_size}")
+    return int(float(match.group(1)) * MEMORY_SIZE_UNITS[match.group(2)])
+
+
+def format_memory_size(size: int) -> str:
+    """Converts a number of bytes into a human readable size such as "1.5G" """
+    for unit in ["T", "G", "M", "K"]:
+        if size >= MEMORY_SIZE_UNITS[unit]:
+            return f"{size / MEMORY_SIZE_UNITS[unit]:.1f}{unit}"
+    return f"{size}B"
+
+
+def get_current_rss() -> int:
+    """Returns the resident set size of the current process in bytes.
+
+    Reads `/proc` where available (Linux, where the pipeline runs). Elsewhere
+    this falls back to the peak resident set size of the process, which is
+    still an upper bound of the current one.
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class PeakMemoryMonitor:
+    """Context manager that samples the resident memory of the process while
+    it is open and keeps the highest value seen.
+
+    By default `peak_rss` is the increase over the memory in use when the
+    monitor was opened, so that it only reflects the work done inside the
+    block. This is approximate: memory freed earlier but still held by the
+    process is reused without showing up, and when other datasets run on
+    threads of the same process at the same time, their memory is counted too.
+    With `relative=False`, `peak_rss` is the highest resident memory of the
+    whole process instead, which is exact for a process running a single
+    dataset.
+    """
+
+    def __init__(self, sampling_interval: float = 0.5, relative: bool = True):
+        self.sampling_interval = sampling_interval
+        self.relative = relative
+        self.peak_rss: int = 0
+        self._start_rss: int = 0
+        self._max_rss: int = 0
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        self._max_rss = max(self._max_rss, get_current_rss())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sampling_interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemoryMonitor":
+        self._start_rss = get_current_rss()
+        self._max_rss = self._start_rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.peak_rss = self._max_rss
+        if self.relative:
+            self.peak_rss -= self._start_rss
+
+
+class DatasetMetricsStore:
+    """A small JSON store of the resources used by each dataset on its
+    last run."""
+
+    def __init__(self, path: Path = None):
+        self.path = path or ETL_METRICS_FILE_PATH
+        self.metrics: typing.Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    self.metrics = json.load(file)
+            except ValueError:
+                logger.warning(
+                    f"Ignoring unreadable ETL metrics file `{self.path}`"
+                )
+
+    def get_peak_rss(self, dataset_name: str) -> typing.Optional[int]:
+        """Returns the peak memory in bytes of the last run of a dataset, if known"""
+        return self.metrics.get(dataset_name, {}).get("peak_rss")
+
+    def record_peak_rss(self, dataset_name: str, peak_rss: int) -> None:
+        self.metrics.setdefault(dataset_name, {})["peak_rss"] = peak_rss
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.metrics, file, indent=2, sort_keys=True)
+
+
+class RunProfiler:
+    """Collects the wall time, CPU time, peak memory and output size of each
+    phase (extract, transform, load, ...) of each stage of a run.
+
+    CPU time is that of the thread running the phase, so it is not inflated by
+    other datasets running concurrently, but it does not include the work of
+    subprocesses such as tippecanoe. Peak memory has the same caveats as
+    `PeakMemoryMonitor`.
+    """
+
+    def __init__(self):
+        self.records: typing.List[dict] = []
+
+    @contextlib.contextmanager
+    def phase(self, stage: str, phase: str, etl_instance=None):
+        """Profiles the block run inside it as one phase of a stage
+
+        Args:
+            stage (str): the name of the stage, e.g. the dataset name
+            phase (str): the name of the phase, e.g. "transform"
+            etl_instance (object): the ETL running the phase; the shape of its
+                `output_df` (or `df`) is recorded after the phase (optional)
+        """
+        start_time = time.perf_counter()
+        start_cpu_time = time.thread_time()
+        with PeakMemoryMonitor() as memory_monitor:
+            yield
+        record = {
+            "stage": stage,
+            "phase": phase,
+            "wall_time": time.perf_counter() - start_time,
+            "cpu_time": time.thread_time() - start_cpu_time,
+            "peak_rss": memory_monitor.peak_rss,
+            "rows": None,
+            "columns": None,
+        }
+        output_df = getattr(etl_instance, "output_df", None)
+        if not isinstance(output_df, pd.DataFrame):
+            output_df = getattr(etl_instance, "df", None)
+        if isinstance(output_df, pd.DataFrame):
+            record["rows"], record["columns"] = output_df.shape
+        self.records.append(record)
+
+    def extend(self, records: typing.List[dict]) -> None:
+        """Adds records collected by another profiler, e.g. in a worker process"""
+        self.records.extend(records)
+
+    def to_data_frame(self) -> pd.DataFrame:
+        """Returns the records, slowest phase first"""
+        return (
+            pd.DataFrame(
+                self.records,
+                columns=[
+                    "stage",
+                    "phase",
+                    "wall_time",
+                    "cpu_time",
+                    "peak_rss",
+                    "rows",
+                    "columns",
+                ],
+            )
+            .sort_values("wall_time", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    def save(self, path: Path = None) -> Path:
+        """Writes the run report as JSON, or as Parquet if the path ends with
+        `.parquet`. Defaults to a timestamped JSON file in data/profiles.
+
+        Returns:
+            Path: the path of the report
+        """
+        if path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = PROFILE_REPORTS_PATH / f"run-{timestamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".parquet":
+            self.to_data_frame().to_parquet(path, index=False)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self.records, file, indent=2)
+        return path
+
+    def format_summary(self) -> str:
+        """Returns the records as a table, slowest phase first"""
+        summary_df = self.to_data_frame()
+        summary_df["wall_time"] = summary_df["wall_time"].map("{:.1f}s".format)
+        summary_df["cpu_time"] = summary_df["cpu_time"].map("{:.1f}s".format)
+        summary_df["peak_rss"] = summary_df["peak_rss"].map(format_memory_size)
+        for column in ["rows", "columns"]:
+            summary_df[column] = summary_df[column].map(
+                lambda count: "" if pd.isna(count) else str(int(count))
+            )
+        return summary_df.to_string(index=False)
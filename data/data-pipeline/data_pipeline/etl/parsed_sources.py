@@ -0,0 +1,251 @@
+"""Parsing of the raw source files read by the ETLs, and cache of the result.
+
+Raw CSV files are parsed with Arrow's multithreaded CSV reader, which is much
+faster than pandas' parser on the wide national files. The data frame parsed
+from a source is then kept as Parquet, named after a hash of the source's
+content and of the way it was read, so that later runs read it from there
+until the source changes.
+"""
+import csv
+import hashlib
+import json
+import os
+import typing
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from data_pipeline.etl.fingerprint import HASH_CHUNK_SIZE
+from data_pipeline.utils import get_module_logger
+
+logger = get_module_logger(__name__)
+
+# Changing how sources are parsed must change this, so that data frames parsed
+# the old way are not read from the cache anymore
+PARSER_VERSION = 1
+
+# The types Arrow parses columns to, by pandas dtype. Columns of other dtypes
+# are parsed with the type Arrow infers, then cast.
+ARROW_TYPES = {
+    "string": pa.string(),
+    "str": pa.string(),
+    "float64": pa.float64(),
+    "int64": pa.int64(),
+}
+
+
+def hash_file(path: Path) -> str:
+    """Returns the sha256 of a file's content"""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _get_csv_options(
+    file: typing.BinaryIO,
+    columns: typing.Dict[str, typing.Optional[str]],
+    optional_columns: typing.Iterable[str],
+    na_values: typing.Optional[typing.List[str]],
+    encoding: str,
+    block_size: typing.Optional[int] = None,
+) -> typing.Tuple[pa_csv.ReadOptions, pa_csv.ConvertOptions, typing.List[str]]:
+    """Reads the header of a CSV file, and returns the options to parse the
+    rest of it with and the columns to be read"""
+    # The header is read first, to reject a file missing columns before
+    # parsing it
+    header = next(csv.reader([file.readline().decode(encoding)]), [])
+    if header:
+        header[0] = header[0].lstrip("\ufeff")
+    missing_columns = [
+        column
+        for column in columns
+        if column not in header and column not in optional_columns
+    ]
+    if missing_columns:
+        raise ValueError(f"The file is missing columns {missing_columns}")
+
+    include_columns = [column for column in header if column in columns]
+    read_options = pa_csv.ReadOptions(column_names=header, encoding=encoding)
+    if block_size is not None:
+        read_options.block_size = block_size
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=include_columns,
+        column_types={
+            column: ARROW_TYPES[columns[column]]
+            for column in include_columns
+            if columns[column] in ARROW_TYPES
+        },
+        null_values=pa_csv.ConvertOptions().null_values
+        + list(na_values or []),
+        strings_can_be_null=True,
+    )
+    return read_options, convert_options, include_columns
+
+
+def _to_data_frame(
+    table: pa.Table,
+    columns: typing.Dict[str, typing.Optional[str]],
+    include_columns: typing.List[str],
+) -> pd.DataFrame:
+    df = table.to_pandas()
+    for column in include_columns:
+        dtype = columns[column]
+        if dtype is not None and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_csv(
+    file: typing.BinaryIO,
+    columns: typing.Dict[str, typing.Optional[str]],
+    optional_columns: typing.Iterable[str] = (),
+    na_values: typing.Optional[typing.List[str]] = None,
+    encoding: str = "utf8",
+) -> pd.DataFrame:
+    """Parses the given columns of a CSV file with Arrow
+
+    Args:
+        file (file): the CSV file, opened in binary mode
+        columns (dict): the dtypes of the columns to read, by column name.
+            A dtype of None lets Arrow infer it.
+        optional_columns (list): the columns of `columns` that the file may
+            not have
+        na_values (list): other values than the default ones to read as
+            missing (optional)
+        encoding (str): the encoding of the file
+
+    Returns:
+        pd.DataFrame: the columns read, in the order of the file
+
+    Raises:
+        ValueError: if the file is missing columns, or has values that don't
+            fit their dtype
+    """
+    read_options, convert_options, include_columns = _get_csv_options(
+        file, columns, optional_columns, na_values, encoding
+    )
+    table = pa_csv.read_csv(
+        file, read_options=read_options, convert_options=convert_options
+    )
+    return _to_data_frame(table, columns, include_columns)
+
+
+def iter_csv(
+    file: typing.BinaryIO,
+    columns: typing.Dict[str, typing.Optional[str]],
+    optional_columns: typing.Iterable[str] = (),
+    na_values: typing.Optional[typing.List[str]] = None,
+    encoding: str = "utf8",
+    block_size: typing.Optional[int] = None,
+) -> typing.Iterator[pd.DataFrame]:
+    """Parses the given columns of a CSV file with Arrow, one block of the
+    file at a time, so that only one block is in memory at once
+
+    Columns whose dtype is inferred get the type inferred from the first
+    block, and values of later blocks that don't fit it raise an error.
+
+    Args:
+        file (file): the CSV file, opened in binary mode
+        columns (dict): the dtypes of the columns to read, by column name.
+            A dtype of None lets Arrow infer it.
+        optional_columns (list): the columns of `columns` that the file may
+            not have
+        na_values (list): other values than the default ones to read as
+            missing (optional)
+        encoding (str): the encoding of the file
+        block_size (int): the size of the blocks in bytes, or None for
+            Arrow's default
+
+    Yields:
+        pd.DataFrame: the columns read from each block, in the order of the
+            file
+
+    Raises:
+        ValueError: if the file is missing columns, or has values that don't
+            fit their dtype
+    """
+    read_options, convert_options, include_columns = _get_csv_options(
+        file, columns, optional_columns, na_values, encoding, block_size
+    )
+    reader = pa_csv.open_csv(
+        file, read_options=read_options, convert_options=convert_options
+    )
+    for batch in reader:
+        yield _to_data_frame(
+            pa.Table.from_batches([batch]), columns, include_columns
+        )
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Writes a Parquet file atomically, as it can be read by other workers"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f"{path.name}.{uuid.uuid4()}.part")
+    try:
+        df.to_parquet(partial_path)
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+
+class ParsedSourceCache:
+    """The data frames parsed from the raw sources of one dataset.
+
+    Each is stored as `<source file name>.<options>.<content>.parquet`, with
+    hashes of the options the source was read with and of its content. Only
+    the latest version of each source is kept, for each set of options.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def read(
+        self,
+        source_path: Path,
+        options: dict,
+        parse: typing.Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Returns the data frame parsed from a source, parsing it only if
+        this version of the source was not parsed with these options before
+
+        Args:
+            source_path (pathlib.Path): the source file
+            options (dict): the options the source is read with
+            parse (function): parses the source
+
+        Returns:
+            pd.DataFrame: the parsed source
+        """
+        options_hash = hashlib.sha256(
+            json.dumps(
+                {"parser_version": PARSER_VERSION, **options},
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()[:16]
+        prefix = f"{source_path.name}.{options_hash}"
+        path = self.path / f"{prefix}.{hash_file(source_path)[:16]}.parquet"
+
+        if path.exists():
+            logger.debug(f"Reading `{source_path.name}` parsed before")
+            return pd.read_parquet(path)
+
+        df = parse()
+        try:
+            _write_parquet(df, path)
+        except (TypeError, ValueError, pa.ArrowException) as e:
+            # Columns of mixed types can't be written as Parquet
+            logger.warning(
+                f"Could not keep the parsed `{source_path.name}` because {e}"
+            )
+            return df
+        # Drop the previous versions of the source
+        for previous_path in self.path.glob(f"{prefix}.*.parquet"):
+            if previous_path != path:
+                previous_path.unlink(missing_ok=True)
+        return df
+
@@ -1,28 +1,56 @@
 import concurrent.futures
 import importlib
+import inspect
+import multiprocessing
+import signal
+import sys
+import threading
 import time
+import traceback
 import typing
 import os
 
 from functools import reduce
+from pathlib import Path
 
 from data_pipeline.etl.score.etl_score import ScoreETL
+from data_pipeline.etl.score.etl_score_geo import GEO_SCORE_LAYERS
 from data_pipeline.etl.score.etl_score_geo import GeoScoreETL
-from data_pipeline.etl.score.etl_score_geo_gistar_burd import GeoScoreGIStarBurdETL
-from data_pipeline.etl.score.etl_score_geo_gistar_ind import GeoScoreGIStarIndETL
-from data_pipeline.etl.score.etl_score_geo_add_burd import GeoScoreAddBurdETL
-from data_pipeline.etl.score.etl_score_geo_add_ind import GeoScoreAddIndETL
-from data_pipeline.etl.score.etl_score_geo_custom_burd import GeoScoreCustomBurdETL
-from data_pipeline.etl.score.etl_score_geo_custom_ind import GeoScoreCustomIndETL
 from data_pipeline.etl.score.etl_score_post import PostScoreETL
+from data_pipeline.etl.score import constants as score_constants
+from data_pipeline.tile.generate import get_score_tile_jobs
+from data_pipeline.tile.generate import get_tribal_tile_jobs
+from data_pipeline.tile.generate import run_tile_jobs
+from data_pipeline.config import settings
 from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.base import ExtractTransformLoad
 from data_pipeline.etl.datasource import DataSource
+from data_pipeline.etl.fingerprint import CSV_CONFIG_PATH
+from data_pipeline.etl.fingerprint import DATASETS_CONFIG_PATH
+from data_pipeline.etl.fingerprint import EXCEL_CONFIG_PATH
+from data_pipeline.etl.fingerprint import StageFingerprints
+from data_pipeline.etl.journal import RunJournal
+from data_pipeline.etl.metrics import DatasetMetricsStore
+from data_pipeline.etl.metrics import PeakMemoryMonitor
+from data_pipeline.etl.metrics import RunProfiler
+from data_pipeline.etl.metrics import format_memory_size
 
 from . import constants
 
 logger = get_module_logger(__name__)
 
+# Cancels the datasets running on threads, which can't be stopped from the
+# outside: each of them checks its event before starting its next phase.
+_CANCEL_EVENTS: typing.Dict[str, threading.Event] = {}
+
+
+class DatasetCancelledError(Exception):
+    """Raised by an ETL that was asked to stop, e.g. because another failed"""
+
+
+class DatasetTimeoutError(TimeoutError):
+    """Raised when an ETL runs for longer than the timeout of its dataset"""
+
 
 def _get_datasets_to_run(dataset_to_run: str) -> typing.List[dict]:
     """Returns a list of appropriate datasets to run given input args
@@ -50,107 +78,572 @@ def _get_datasets_to_run(dataset_to_run: str) -> typing.List[dict]:
     return dataset_list
 
 
-def _get_dataset(dataset: dict) -> ExtractTransformLoad:
-    """Instantiates a dataset object from a dictionary description of that object's class"""
+def _get_dataset_class(dataset: dict) -> typing.Type[ExtractTransformLoad]:
+    """Imports the class described by a dictionary description of a dataset"""
     etl_module = importlib.import_module(
         f"data_pipeline.etl.sources.{dataset['module_dir']}.etl"
     )
-    etl_class = getattr(etl_module, dataset["class_name"])
+    return getattr(etl_module, dataset["class_name"])
+
+
+def _get_dataset(dataset: dict) -> ExtractTransformLoad:
+    """Instantiates a dataset object from a dictionary description of that object's class"""
+    etl_class = _get_dataset_class(dataset)
     etl_instance = etl_class()
 
     return etl_instance
 
 
-def _run_one_dataset(dataset: dict, use_cache: bool = False) -> None:
-    """Runs one etl process."""
+def _get_dataset_dependencies(
+    dataset_list: typing.List[dict],
+) -> typing.Dict[str, typing.Set[str]]:
+    """Returns the upstream datasets each dataset has to wait for in this run
 
-    start_time = time.time()
+    Dependencies are declared by each ETL class in `DEPENDENCIES`. Upstream
+    datasets that are not part of `dataset_list` are expected to have been
+    generated by an earlier run (e.g. `census` by `census-data-download`),
+    so they are not waited on.
+
+    Args:
+        dataset_list (list): the datasets that will be run
+
+    Returns:
+        dict: for each dataset name, the names of the datasets it waits on
+    """
+    known_names = {
+        dataset["name"]
+        for dataset in constants.DATASET_LIST + [constants.CENSUS_INFO]
+    }
+    names_to_run = {dataset["name"] for dataset in dataset_list}
+
+    dependencies = {}
+    for dataset in dataset_list:
+        declared = _get_dataset_class(dataset).DEPENDENCIES
+        unknown = [name for name in declared if name not in known_names]
+        if unknown:
+            raise ValueError(
+                f"Dataset {dataset['name']} depends on unknown dataset(s) {unknown}"
+            )
+        dependencies[dataset["name"]] = {
+            name for name in declared if name in names_to_run
+        }
+
+    # Make sure the dependencies can be satisfied before anything runs
+    resolved: typing.Set[str] = set()
+    while len(resolved) < len(dependencies):
+        newly_resolved = {
+            name
+            for name, upstream in dependencies.items()
+            if name not in resolved and upstream <= resolved
+        }
+        if not newly_resolved:
+            raise ValueError(
+                "Circular dependency between datasets "
+                f"{sorted(set(dependencies) - resolved)}"
+            )
+        resolved |= newly_resolved
+
+    return dependencies
+
+
+def _check_cancelled(dataset: dict) -> None:
+    """Stops an ETL running on a thread if it has been cancelled"""
+    cancel_event = _CANCEL_EVENTS.get(dataset["name"])
+    if cancel_event is not None and cancel_event.is_set():
+        raise DatasetCancelledError(
+            f"ETL for dataset {dataset['name']} was cancelled"
+        )
 
-    logger.info(f"Running ETL for {dataset['name']}")
-    etl_instance = _get_dataset(dataset)
 
-    # run extract
-    logger.debug(f"Extracting {dataset['name']}")
-    etl_instance.extract(use_cache)
+def _run_one_dataset(dataset: dict, use_cache: bool = False) -> dict:
+    """Runs one etl process.
 
-    # run transform
-    logger.debug(f"Transforming {dataset['name']}")
-    etl_instance.transform()
+    Returns:
+        dict: the peak memory used by the ETL in bytes (`peak_rss`) and the
+        profile of each of its phases (`profile`)
+    """
 
-    # run load
-    logger.debug(f"Loading {dataset['name']}")
-    etl_instance.load()
+    start_time = time.time()
+    profiler = RunProfiler()
 
-    # run validate
-    logger.debug(f"Validating {dataset['name']}")
-    etl_instance.validate()
+    logger.info(f"Running ETL for {dataset['name']}")
+    with PeakMemoryMonitor() as memory_monitor:
+        etl_instance = _get_dataset(dataset)
 
-    # cleanup
-    logger.debug(f"Cleaning up {dataset['name']}")
-    etl_instance.cleanup()
+        # run extract
+        _check_cancelled(dataset)
+        logger.debug(f"Extracting {dataset['name']}")
+        with profiler.phase(dataset["name"], "extract", etl_instance):
+            etl_instance.extract(use_cache)
+
+        # run transform
+        _check_cancelled(dataset)
+        logger.debug(f"Transforming {dataset['name']}")
+        with profiler.phase(dataset["name"], "transform", etl_instance):
+            etl_instance.transform()
+
+        # run load
+        _check_cancelled(dataset)
+        logger.debug(f"Loading {dataset['name']}")
+        with profiler.phase(dataset["name"], "load", etl_instance):
+            etl_instance.load()
+
+        # run validate
+        _check_cancelled(dataset)
+        logger.debug(f"Validating {dataset['name']}")
+        with profiler.phase(dataset["name"], "validate", etl_instance):
+            etl_instance.validate()
+
+        # cleanup
+        logger.debug(f"Cleaning up {dataset['name']}")
+        with profiler.phase(dataset["name"], "cleanup", etl_instance):
+            etl_instance.cleanup()
 
     logger.info(f"Finished ETL for dataset {dataset['name']}")
     logger.debug(
         f"Execution time for ETL for dataset {dataset['name']} was {time.time() - start_time}s"
     )
 
+    return {"peak_rss": memory_monitor.peak_rss, "profile": profiler.records}
+
+
+def _run_one_dataset_in_process(
+    dataset: dict,
+    use_cache: bool = False,
+    timeout: typing.Optional[float] = None,
+) -> dict:
+    """Runs one etl process inside a worker process.
+
+    Not every exception raised by pandas, geopandas or requests can be pickled
+    back to the parent process, so failures are re-raised with the formatted
+    traceback of the worker instead.
+
+    The worker runs the ETL on its main thread, so a timeout is enforced with
+    an alarm signal, which interrupts the ETL wherever it is.
+
+    Each worker runs a single ETL (see `_get_executor`), so the peak memory
+    returned is the highest resident memory of the whole worker, rather than
+    the growth over whatever memory the worker already held.
+    """
+
+    def _raise_timeout(signum, frame):
+        raise DatasetTimeoutError(
+            f"ETL for dataset {dataset['name']} timed out after {timeout}s"
+        )
+
+    use_alarm = timeout is not None and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with PeakMemoryMonitor(relative=False) as memory_monitor:
+            result = _run_one_dataset(dataset=dataset, use_cache=use_cache)
+        result["peak_rss"] = memory_monitor.peak_rss
+        return result
+    except DatasetTimeoutError:
+        raise
+    except Exception:  # pylint: disable=broad-except
+        raise RuntimeError(
+            f"ETL for dataset {dataset['name']} failed in worker process:\n"
+            f"{traceback.format_exc()}"
+        ) from None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _get_executor(
+    executor_type: str, max_workers: int
+) -> concurrent.futures.Executor:
+    """Returns the pool the ETL processes are run on
+
+    Args:
+        executor_type (str): "thread" to run the ETLs on a thread pool, or "process"
+            to run them on a pool of worker processes, which avoids contention on
+            the GIL for pandas and geopandas heavy transforms
+        max_workers (int): the number of threads or processes in the pool
+
+    Returns:
+        concurrent.futures.Executor: the pool to submit the ETLs to
+    """
+    if executor_type == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    if executor_type == "process":
+        # Workers are spawned rather than forked so they do not inherit locks
+        # held by other threads of the parent, and so each one starts with
+        # its own empty `get_tract_geojson` cache. Each ETL also gets a fresh
+        # worker, so the peak memory recorded for it is not hidden by the heap
+        # a previous ETL left behind in the same worker. Before Python 3.11
+        # workers are reused, and the figure is an overestimate instead.
+        worker_options = {}
+        if sys.version_info >= (3, 11):
+            worker_options["max_tasks_per_child"] = 1
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            **worker_options,
+        )
+    raise ValueError(f"Invalid executor type: {executor_type}")
+
+
+def _get_expected_peak_rss(
+    dataset_list: typing.List[dict],
+    metrics_store: DatasetMetricsStore,
+    memory_budget: int,
+    max_workers: int,
+) -> typing.Dict[str, int]:
+    """Returns the memory each dataset is expected to need, in bytes
+
+    This is the peak memory recorded on the last run of each dataset. Datasets
+    that have never been run fall back on the is_memory_intensive flag in
+    constants.py: memory intensive ones reserve the whole budget, the others an
+    even share of it per worker.
+    """
+    expected_peak_rss = {}
+    for dataset in dataset_list:
+        peak_rss = metrics_store.get_peak_rss(dataset["name"])
+        if peak_rss is None:
+            peak_rss = (
+                memory_budget
+                if dataset["is_memory_intensive"]
+                else memory_budget // max_workers
+            )
+        expected_peak_rss[dataset["name"]] = peak_rss
+    return expected_peak_rss
+
+
+def _admit_datasets(
+    ready: typing.List[dict],
+    running: typing.List[dict],
+    max_workers: int,
+    memory_budget: typing.Optional[int] = None,
+    expected_peak_rss: typing.Optional[typing.Dict[str, int]] = None,
+) -> typing.List[dict]:
+    """Picks which of the datasets ready to run can be started now
+
+    Without a memory budget, datasets flagged with is_memory_intensive are
+    never run at the same time as each other. With a memory budget, datasets
+    are started largest first for as long as the expected peak memory of
+    everything running stays within the budget.
+
+    Args:
+        ready (list): the datasets whose dependencies have finished
+        running (list): the datasets that are currently running
+        max_workers (int): the number of datasets that can run at the same time
+        memory_budget (int): the memory available to the ETLs in bytes (optional)
+        expected_peak_rss (dict): the memory each dataset is expected to need in
+            bytes, required with a memory budget
+
+    Returns:
+        list: the datasets to start
+    """
+    admitted: typing.List[dict] = []
+    free_workers = max_workers - len(running)
+
+    if memory_budget is None:
+        high_memory_running = any(
+            dataset["is_memory_intensive"] for dataset in running
+        )
+        for dataset in ready:
+            if len(admitted) >= free_workers:
+                break
+            if dataset["is_memory_intensive"]:
+                if high_memory_running:
+                    continue
+                high_memory_running = True
+            admitted.append(dataset)
+        return admitted
+
+    memory_in_use = sum(
+        expected_peak_rss[dataset["name"]] for dataset in running
+    )
+    for dataset in sorted(
+        ready, key=lambda d: expected_peak_rss[d["name"]], reverse=True
+    ):
+        if len(admitted) >= free_workers:
+            break
+        peak_rss = expected_peak_rss[dataset["name"]]
+        if memory_in_use + peak_rss > memory_budget:
+            if running or admitted:
+                continue
+            logger.warning(
+                f"Dataset {dataset['name']} is expected to need {format_memory_size(peak_rss)}, "
+                f"more than the memory budget of {format_memory_size(memory_budget)}. "
+                "Running it on its own."
+            )
+        admitted.append(dataset)
+        memory_in_use += peak_rss
+    return admitted
+
+
+def _cancel_running_datasets(
+    executor: concurrent.futures.Executor,
+    running: typing.Dict[concurrent.futures.Future, dict],
+) -> None:
+    """Stops everything an executor is running or has queued"""
+    for dataset in running.values():
+        if dataset["name"] in _CANCEL_EVENTS:
+            _CANCEL_EVENTS[dataset["name"]].set()
+    executor.shutdown(wait=False, cancel_futures=True)
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        # The executor has no public way to stop a running task, so its
+        # worker processes are terminated
+        for process in list(
+            (executor._processes or {}).values()  # pylint: disable=protected-access
+        ):
+            process.terminate()
+
+
+def _get_dataset_stage_name(dataset_name: str) -> str:
+    """Returns the name under which the fingerprint of an ETL is stored"""
+    return f"etl/{dataset_name}"
+
+
+def _get_dataset_fingerprint(
+    dataset: dict, fingerprints: StageFingerprints
+) -> str:
+    """Fingerprints an ETL from its source code, its configuration in
+    datasets.yml, its cached data sources and the fingerprints of the
+    datasets it depends on"""
+    dataset_class = _get_dataset_class(dataset)
+    return fingerprints.compute(
+        inputs=[
+            Path(inspect.getsourcefile(dataset_class)).parent,
+            Path(inspect.getsourcefile(ExtractTransformLoad)),
+            DATASETS_CONFIG_PATH,
+            ExtractTransformLoad.SOURCES_PATH / dataset_class.__name__,
+        ],
+        parameters=[
+            f"{dependency}:{fingerprints.get(_get_dataset_stage_name(dependency))}"
+            for dependency in sorted(dataset_class.DEPENDENCIES)
+        ],
+    )
+
 
 def etl_runner(
     dataset_to_run: str = None,
     use_cache: bool = False,
     no_concurrency: bool = False,
+    executor_type: str = "thread",
+    memory_budget: typing.Optional[int] = None,
+    incremental: bool = False,
+    profiler: typing.Optional[RunProfiler] = None,
+    keep_going: bool = False,
 ) -> None:
     """Runs all etl processes or a specific one
 
+    By default, the first failure stops the run: queued ETL processes are
+    cancelled, the running ones are asked to stop and the failure is raised.
+
+    The "timeout" of a dataset is only enforced on process workers: an ETL
+    stuck on a thread can't be stopped.
+
     Args:
         dataset_to_run (str): Run a specific ETL process. If missing, runs all processes (optional)
         use_cache (bool): Use the cached data sources – if they exist – rather than downloading them all from scratch
+        no_concurrency (bool): Run the ETL processes one at a time (optional)
+        executor_type (str): Run the ETL processes on "thread" (default) or "process" workers (optional)
+        memory_budget (int): Only run as many ETL processes at once as fit in this many bytes,
+            according to the peak memory recorded for each on previous runs, which
+            is only approximate for ETLs run on threads (optional)
+        incremental (bool): Skip the ETL processes whose fingerprint has not changed since
+            they last completed (optional)
+        profiler (RunProfiler): Collects the profile of each phase of each ETL process (optional)
+        keep_going (bool): Run every ETL process that doesn't depend on a failed one, then
+            report all failures together (optional)
 
     Returns:
         None
     """
     dataset_list = _get_datasets_to_run(dataset_to_run)
+    dependencies = _get_dataset_dependencies(dataset_list)
 
-    # Because we are memory constrained on our infrastructure,
-    # we split datasets into those that are not memory intensive
-    # (is_memory_intensive == False) and thereby can be safely
-    # run in parallel, and those that require more RAM and thus
-    # should be run sequentially. The is_memory_intensive_flag is
-    # set manually in constants.py based on experience running
-    # the pipeline
-    concurrent_datasets = [
-        dataset
-        for dataset in dataset_list
-        if not dataset["is_memory_intensive"]
-    ]
-    high_memory_datasets = [
-        dataset for dataset in dataset_list if dataset["is_memory_intensive"]
-    ]
-
+    # Datasets are run as a dependency graph: each one is started as soon as
+    # the datasets it declares in `DEPENDENCIES` have finished, and as long as
+    # there is room for it in memory (see `_admit_datasets`).
     max_workers = 1 if no_concurrency else os.cpu_count()
-    if concurrent_datasets:
-        logger.info(f"Running concurrent ETL jobs on {max_workers} thread(s)")
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=max_workers
-        ) as executor:
-            futures = {
-                executor.submit(
-                    _run_one_dataset, dataset=dataset, use_cache=use_cache
-                )
-                for dataset in concurrent_datasets
-            }
+    logger.info(f"Running ETL jobs on {max_workers} {executor_type} worker(s)")
+    run_one_dataset = (
+        _run_one_dataset_in_process
+        if executor_type == "process"
+        else _run_one_dataset
+    )
+    timed_datasets = [
+        dataset["name"] for dataset in dataset_list if "timeout" in dataset
+    ]
+    if timed_datasets and executor_type != "process":
+        # A thread can't be stopped while it is stuck, e.g. on a download, so
+        # timeouts are only enforced by worker processes
+        logger.warning(
+            f"Not enforcing the timeouts of {timed_datasets} on thread workers. "
+            "Use process workers to enforce them."
+        )
 
-            for fut in concurrent.futures.as_completed(futures):
-                # Calling result will raise an exception if one occurred.
-                # Otherwise, the exceptions are silently ignored.
-                fut.result()
+    metrics_store = DatasetMetricsStore()
+    # ETLs run on threads share one process, so their peak memory can only be
+    # estimated from the growth of that process while they run
+    peak_rss_note = (
+        ""
+        if executor_type == "process"
+        else " (peak memory is approximate on threads)"
+    )
+    expected_peak_rss = None
+    if memory_budget is not None:
+        logger.info(
+            f"Running ETL jobs within a memory budget of {format_memory_size(memory_budget)}"
+            f"{peak_rss_note}"
+        )
+        expected_peak_rss = _get_expected_peak_rss(
+            dataset_list, metrics_store, memory_budget, max_workers
+        )
 
-    # Note: these high-memory datasets also usually require the Census GeoJSON to be
-    # generated, and one of them requires the Tribal GeoJSON to be generated.
-    if high_memory_datasets:
-        logger.info("Running high-memory ETL jobs")
-        for dataset in high_memory_datasets:
-            _run_one_dataset(dataset=dataset, use_cache=use_cache)
+    fingerprints = StageFingerprints() if incremental else None
+    out_of_date: typing.Set[str] = set()
+
+    pending = {dataset["name"]: dataset for dataset in dataset_list}
+    finished: typing.Set[str] = set()
+    failures: typing.Dict[str, BaseException] = {}
+    skipped: typing.Set[str] = set()
+    running: typing.Dict[concurrent.futures.Future, dict] = {}
+    executor = _get_executor(executor_type, max_workers)
+    try:
+        while pending or running:
+            for name in list(pending):
+                failed_upstream = dependencies[name] & (
+                    set(failures) | skipped
+                )
+                if failed_upstream:
+                    logger.warning(
+                        f"Skipping ETL for {name}, as {sorted(failed_upstream)} failed"
+                    )
+                    del pending[name]
+                    skipped.add(name)
+
+            ready = [
+                dataset
+                for name, dataset in pending.items()
+                if dependencies[name] <= finished
+            ]
+
+            if fingerprints is not None:
+                up_to_date = [
+                    dataset
+                    for dataset in ready
+                    if dataset["name"] not in out_of_date
+                    and fingerprints.is_up_to_date(
+                        _get_dataset_stage_name(dataset["name"]),
+                        _get_dataset_fingerprint(dataset, fingerprints),
+                    )
+                ]
+                out_of_date.update(dataset["name"] for dataset in ready)
+                for dataset in up_to_date:
+                    logger.info(
+                        f"Skipping ETL for {dataset['name']}, its fingerprint has not changed"
+                    )
+                    del pending[dataset["name"]]
+                    finished.add(dataset["name"])
+                if up_to_date:
+                    # Their dependents may be ready now
+                    continue
+
+            for dataset in _admit_datasets(
+                ready=ready,
+                running=list(running.values()),
+                max_workers=max_workers,
+                memory_budget=memory_budget,
+                expected_peak_rss=expected_peak_rss,
+            ):
+                del pending[dataset["name"]]
+                if fingerprints is not None:
+                    # Saved right away so that an output left half-written by
+                    # an interrupted run is never taken as up to date
+                    fingerprints.forget(
+                        _get_dataset_stage_name(dataset["name"])
+                    )
+                    fingerprints.save()
+                if executor_type == "process":
+                    future = executor.submit(
+                        run_one_dataset,
+                        dataset=dataset,
+                        use_cache=use_cache,
+                        timeout=dataset.get("timeout"),
+                    )
+                else:
+                    _CANCEL_EVENTS[dataset["name"]] = threading.Event()
+                    future = executor.submit(
+                        run_one_dataset, dataset=dataset, use_cache=use_cache
+                    )
+                running[future] = dataset
+
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for fut in done:
+                dataset = running.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error(f"ETL for dataset {dataset['name']} failed")
+                    failures[dataset["name"]] = e
+                    continue
+                if result is not None:
+                    logger.debug(
+                        f"Peak memory for ETL for dataset {dataset['name']} "
+                        f"was {format_memory_size(result['peak_rss'])}"
+                        f"{peak_rss_note}"
+                    )
+                    metrics_store.record_peak_rss(
+                        dataset["name"], result["peak_rss"]
+                    )
+                    if profiler is not None:
+                        profiler.extend(result["profile"])
+                if fingerprints is not None:
+                    # Fingerprint the data sources the ETL actually used
+                    fingerprints.record(
+                        _get_dataset_stage_name(dataset["name"]),
+                        _get_dataset_fingerprint(dataset, fingerprints),
+                        outputs=_get_dataset(dataset).get_output_paths(),
+                    )
+                finished.add(dataset["name"])
+
+            if failures and not keep_going:
+                logger.error(
+                    f"Cancelling {len(running)} running and {len(pending)} queued ETL(s)"
+                )
+                _cancel_running_datasets(executor, running)
+                break
+    finally:
+        if failures and not keep_going:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            executor.shutdown(wait=True)
+        for dataset in dataset_list:
+            _CANCEL_EVENTS.pop(dataset["name"], None)
+        # Keep the figures of the datasets that did finish for the next run
+        metrics_store.save()
+        if fingerprints is not None:
+            fingerprints.save()
+
+    if not failures:
+        return
+    if not keep_going:
+        raise next(iter(failures.values()))
+    for name, error in failures.items():
+        logger.error(
+            f"ETL for dataset {name} failed:\n"
+            + "".join(
+                traceback.format_exception(
+                    type(error), error, error.__traceback__
+                )
+            )
+        )
+    raise RuntimeError(
+        f"{len(failures)} ETL(s) failed: {sorted(failures)}"
+        + (f", {len(skipped)} skipped: {sorted(skipped)}" if skipped else "")
+    )
 
 
 def get_data_sources(dataset_to_run: str = None) -> [DataSource]:
@@ -196,11 +689,27 @@ def clear_data_source_cache(dataset_to_run: str = None) -> None:
         etl_instance.clear_data_source_cache()
 
 
-def score_generate() -> None:
+def _run_score_phases(
+    stage: str,
+    etl_instance,
+    phases: typing.List[str],
+    profiler: typing.Optional[RunProfiler] = None,
+) -> None:
+    """Runs the given phases (extract, transform, ...) of a score ETL in order,
+    profiling each of them if a profiler is given"""
+    for phase in phases:
+        if profiler is None:
+            getattr(etl_instance, phase)()
+        else:
+            with profiler.phase(stage, phase, etl_instance):
+                getattr(etl_instance, phase)()
+
+
+def score_generate(profiler: typing.Optional[RunProfiler] = None) -> None:
     """Generates the score and saves it on the local data directory
 
     Args:
-        None
+        profiler (RunProfiler): Collects the profile of each phase (optional)
 
     Returns:
         None
@@ -209,15 +718,17 @@ def score_generate() -> None:
     # Score Gen
     start_time = time.time()
     score_gen = ScoreETL()
-    score_gen.extract()
-    score_gen.transform()
-    score_gen.load()
+    _run_score_phases(
+        "score", score_gen, ["extract", "transform", "load"], profiler
+    )
     logger.debug(
         f"Execution time for Score Generation was {time.time() - start_time}s"
     )
 
 
-def score_post(data_source: str = "local") -> None:
+def score_post(
+    data_source: str = "local", profiler: typing.Optional[RunProfiler] = None
+) -> None:
     """Posts the score files to the local directory
 
     Args:
@@ -225,6 +736,7 @@ def score_post(data_source: str = "local") -> None:
                            Options:
                            - local (default): fetch census data from the local data directory
                            - aws: fetch census from AWS S3 J40 data repository
+        profiler (RunProfiler): Collects the profile of each phase (optional)
 
     Returns:
         None
@@ -232,16 +744,22 @@ def score_post(data_source: str = "local") -> None:
     # Post Score Processing
     start_time = time.time()
     score_post = PostScoreETL(data_source=data_source)
-    score_post.extract()
-    score_post.transform()
-    score_post.load()
-    score_post.cleanup()
+    _run_score_phases(
+        "score_post",
+        score_post,
+        ["extract", "transform", "load", "cleanup"],
+        profiler,
+    )
     logger.debug(
         f"Execution time for Score Post was {time.time() - start_time}s"
     )
 
 
-def score_geo(data_source: str = "local") -> None:
+def score_geo(
+    data_source: str = "local",
+    profiler: typing.Optional[RunProfiler] = None,
+    layer_names: typing.Optional[typing.List[str]] = None,
+) -> None:
     """Generates the geojson files with score data baked in
 
     Args:
@@ -249,93 +767,57 @@ def score_geo(data_source: str = "local") -> None:
                            Options:
                            - local (default): fetch census data from the local data directory
                            - aws: fetch census from AWS S3 J40 data repository
+        profiler (RunProfiler): Collects the profile of each phase (optional)
+        layer_names (list): The layers to generate, from `GEO_SCORE_LAYERS`
+                            (optional, defaults to the default layer only)
 
     Returns:
         None
     """
 
+    layers = [
+        GEO_SCORE_LAYERS[layer_name] for layer_name in layer_names or ["default"]
+    ]
+
     # Score Geo
     start_time = time.time()
-    score_geo = GeoScoreETL(data_source=data_source)
-    score_geo.extract()
-    score_geo.transform()
-    score_geo.load()
+    score_geo = GeoScoreETL(data_source=data_source, layers=layers)
+    _run_score_phases(
+        "score_geo", score_geo, ["extract", "transform", "load"], profiler
+    )
     logger.debug(
         f"Execution time for Score Geo was {time.time() - start_time}s"
     )
 
 
-def score_geo_gistar_burd(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
-
-    Args:
-        data_source (str): Source for the census data (optional)
-                           Options:
-                           - local (default): fetch census data from the local data directory
-                           - aws: fetch census from AWS S3 J40 data repository
-
-    Returns:
-        None
-    """
-
-    # Score Geo
-    start_time = time.time()
-    score_geo_gistar_burd= GeoScoreGIStarBurdETL(data_source=data_source)
-    score_geo_gistar_burd.extract()
-    score_geo_gistar_burd.transform()
-    score_geo_gistar_burd.load()
-    logger.debug(
-        f"Execution time for Score Geo GI star burden was {time.time() - start_time}s"
-    )
+def _get_source_path(obj) -> Path:
+    """Returns the path of the source file defining a module, class or function"""
+    return Path(inspect.getsourcefile(obj))
 
-def score_geo_gistar_ind(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
 
-    Args:
-        data_source (str): Source for the census data (optional)
-                           Options:
-                           - local (default): fetch census data from the local data directory
-                           - aws: fetch census from AWS S3 J40 data repository
+def _generate_tiles(profiler: typing.Optional[RunProfiler] = None) -> None:
+    """Generates the score and tribal map tiles, profiled as a single phase
 
-    Returns:
-        None
+    The tippecanoe jobs of both run together, sharing the CPUs.
     """
+    jobs = get_score_tile_jobs(settings.DATA_PATH, ["default"])
+    jobs += get_tribal_tile_jobs(settings.DATA_PATH)
+    if profiler is None:
+        run_tile_jobs(jobs)
+        return
+    with profiler.phase("map_tiles", "generate"):
+        run_tile_jobs(jobs)
 
-    # Score Geo
-    start_time = time.time()
-    score_geo_gistar_ind= GeoScoreGIStarIndETL(data_source=data_source)
-    score_geo_gistar_ind.extract()
-    score_geo_gistar_ind.transform()
-    score_geo_gistar_ind.load()
-    logger.debug(
-        f"Execution time for Score Geo GI star Indicator was {time.time() - start_time}s"
-    )
-
-def score_geo_add_burd(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
-
-    Args:
-        data_source (str): Source for the census data (optional)
-                           Options:
-                           - local (default): fetch census data from the local data directory
-                           - aws: fetch census from AWS S3 J40 data repository
-
-    Returns:
-        None
-    """
 
-    # Score Geo
-    start_time = time.time()
-    score_geo_add_burd = GeoScoreAddBurdETL(data_source=data_source)
-    score_geo_add_burd.extract()
-    score_geo_add_burd.transform()
-    score_geo_add_burd.load()
-    logger.debug(
-        f"Execution time for Score Geo Additive Burdens was {time.time() - start_time}s"
-    )
+def get_score_stages(
+    data_source: str = "local",
+) -> typing.List[dict]:
+    """Describes the stages of a full data run that follow the ETLs
 
-def score_geo_add_ind(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
+    Each stage has a function to run it, taking an optional `RunProfiler`, and
+    lists the files and directories it reads (including its own source code
+    and configuration), the ones it writes, and any parameter that changes its
+    output. They are listed in the order they have to run.
 
     Args:
         data_source (str): Source for the census data (optional)
@@ -344,65 +826,193 @@ def score_geo_add_ind(data_source: str = "local") -> None:
                            - aws: fetch census from AWS S3 J40 data repository
 
     Returns:
-        None
+        list: the stages, as dictionaries
     """
+    score_constants_path = _get_source_path(score_constants)
+    score_utils_path = score_constants_path.parent / "etl_utils.py"
+    tiles_path = score_constants.DATA_SCORE_DIR / "tiles" / "default"
+    score_geojson_path = score_constants.DATA_SCORE_DIR / "geojson" / "default"
+    tribal_path = score_constants.DATA_PATH / "tribal"
+
+    return [
+        {
+            "name": "score",
+            "description": "Generating score",
+            "function": score_generate,
+            "inputs": [
+                score_constants.DATA_PATH / "dataset",
+                score_constants.DATA_CENSUS_CSV_FILE_PATH,
+                score_constants.STATIC_DATA_PATH,
+                settings.APP_ROOT / "score",
+                _get_source_path(ScoreETL),
+                score_constants_path,
+                score_utils_path,
+                DATASETS_CONFIG_PATH,
+            ],
+            "outputs": [score_constants.DATA_SCORE_CSV_FULL_FILE_PATH],
+            "parameters": [],
+        },
+        {
+            "name": "score_post",
+            "description": "Running post score",
+            "function": lambda profiler: score_post(data_source, profiler),
+            "inputs": [
+                score_constants.DATA_SCORE_CSV_FULL_FILE_PATH,
+                score_constants.DATA_CENSUS_CSV_STATE_FILE_PATH,
+                score_constants.DATA_CENSUS_GEOJSON_FILE_PATH,
+                score_constants.FILES_PATH,
+                CSV_CONFIG_PATH,
+                EXCEL_CONFIG_PATH,
+                _get_source_path(PostScoreETL),
+                score_constants_path,
+                score_utils_path,
+            ],
+            "outputs": [
+                score_constants.DATA_SCORE_CSV_TILES_FILE_PATH,
+                score_constants.SCORE_DOWNLOADABLE_DIR,
+            ],
+            "parameters": [data_source],
+        },
+        {
+            "name": "score_geo",
+            "description": "Combining score with census GeoJSON",
+            "function": lambda profiler: score_geo(data_source, profiler),
+            "inputs": [
+                score_constants.DATA_SCORE_CSV_TILES_FILE_PATH,
+                score_constants.DATA_CENSUS_GEOJSON_FILE_PATH,
+                _get_source_path(GeoScoreETL),
+                score_constants_path,
+                score_utils_path,
+            ],
+            "outputs": [score_geojson_path],
+            "parameters": [data_source],
+        },
+        {
+            "name": "map_tiles",
+            "description": "Generating score and tribal map tiles",
+            "function": _generate_tiles,
+            "inputs": [
+                score_geojson_path,
+                tribal_path / "geographic_data",
+                _get_source_path(run_tile_jobs),
+            ],
+            "outputs": [tiles_path, tribal_path / "tiles"],
+            "parameters": [],
+        },
+    ]
 
-    # Score Geo
-    start_time = time.time()
-    score_geo_add_ind = GeoScoreAddIndETL(data_source=data_source)
-    score_geo_add_ind.extract()
-    score_geo_add_ind.transform()
-    score_geo_add_ind.load()
-    logger.debug(
-        f"Execution time for Score Geo Additive Indicators was {time.time() - start_time}s"
-    )
-
-def score_geo_custom_burd(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
 
-    Args:
-        data_source (str): Source for the census data (optional)
-                           Options:
-                           - local (default): fetch census data from the local data directory
-                           - aws: fetch census from AWS S3 J40 data repository
+def get_full_run_stages(
+    data_source: str = "local",
+    use_cache: bool = False,
+    executor_type: str = "thread",
+    memory_budget: typing.Optional[int] = None,
+    incremental: bool = False,
+    keep_going: bool = False,
+) -> typing.List[dict]:
+    """Describes all the stages of a full data run, from the census download to
+    the map tiles, in the order they have to run
+
+    The census download and the ETLs fingerprint each dataset themselves, so
+    they have no `inputs`. See `get_score_stages` for the other stages and
+    `etl_runner` for the arguments.
 
     Returns:
-        None
+        list: the stages, as dictionaries
     """
-
-    # Score Geo
-    start_time = time.time()
-    score_geo_custom_burd = GeoScoreCustomBurdETL(data_source=data_source)
-    score_geo_custom_burd.extract()
-    score_geo_custom_burd.transform()
-    score_geo_custom_burd.load()
-    logger.debug(
-        f"Execution time for Score Geo Custom Burdens was {time.time() - start_time}s"
-    )
-
-def score_geo_custom_ind(data_source: str = "local") -> None:
-    """Generates the geojson files with score data baked in
+    return [
+        {
+            "name": "census",
+            "description": "Downloading census data",
+            "function": lambda profiler: etl_runner(
+                "census",
+                use_cache,
+                incremental=incremental,
+                profiler=profiler,
+            ),
+            "inputs": None,
+            "outputs": [score_constants.DATA_CENSUS_DIR],
+            "parameters": [],
+        },
+        {
+            "name": "etl",
+            "description": "Running all ETLs",
+            "function": lambda profiler: etl_runner(
+                use_cache=use_cache,
+                executor_type=executor_type,
+                memory_budget=memory_budget,
+                incremental=incremental,
+                profiler=profiler,
+                keep_going=keep_going,
+            ),
+            "inputs": None,
+            "outputs": [score_constants.DATA_PATH / "dataset"],
+            "parameters": [],
+        },
+    ] + get_score_stages(data_source)
+
+
+def stages_runner(
+    stages: typing.List[dict],
+    incremental: bool = False,
+    profiler: typing.Optional[RunProfiler] = None,
+    journal: typing.Optional[RunJournal] = None,
+) -> None:
+    """Runs the given stages in order
 
     Args:
-        data_source (str): Source for the census data (optional)
-                           Options:
-                           - local (default): fetch census data from the local data directory
-                           - aws: fetch census from AWS S3 J40 data repository
+        stages (list): the stages to run, as described by `get_full_run_stages`
+        incremental (bool): Skip the stages whose fingerprint has not changed since
+            they last completed (optional)
+        profiler (RunProfiler): Collects the profile of each phase of each stage (optional)
+        journal (RunJournal): Records each stage as it completes. When it was loaded
+            to resume a run, the stages it lists as complete are skipped until the
+            first one that is not, or whose outputs have changed since (optional)
 
     Returns:
         None
     """
+    resuming = journal is not None and bool(journal.stages)
 
-    # Score Geo
-    start_time = time.time()
-    score_geo_custom_ind = GeoScoreCustomIndETL(data_source=data_source)
-    score_geo_custom_ind.extract()
-    score_geo_custom_ind.transform()
-    score_geo_custom_ind.load()
-    logger.debug(
-        f"Execution time for Score Geo Custom Indicators was {time.time() - start_time}s"
-    )
-
+    for stage in stages:
+        if resuming:
+            if journal.is_complete(stage["name"]):
+                logger.info(
+                    f"Skipping {stage['name']}, it completed in the run being resumed"
+                )
+                continue
+            logger.info(f"Resuming the run from {stage['name']}")
+            # Every later stage may depend on this one, so they all run again
+            resuming = False
+
+        # Loaded for each stage, as the ETL stages record their own
+        fingerprints = StageFingerprints() if incremental else None
+        if fingerprints is not None and stage["inputs"] is not None:
+            fingerprint = fingerprints.compute(
+                stage["inputs"], stage["parameters"]
+            )
+            if fingerprints.is_up_to_date(stage["name"], fingerprint):
+                logger.info(
+                    f"Skipping {stage['name']}, its fingerprint has not changed"
+                )
+                if journal is not None:
+                    journal.complete(stage["name"], stage["outputs"])
+                continue
+            fingerprints.forget(stage["name"])
+            fingerprints.save()
+
+        logger.info(stage["description"])
+        stage["function"](profiler)
+
+        if fingerprints is not None and stage["inputs"] is not None:
+            fingerprints.record(
+                stage["name"],
+                fingerprints.compute(stage["inputs"], stage["parameters"]),
+                stage["outputs"],
+            )
+            fingerprints.save()
+        if journal is not None:
+            journal.complete(stage["name"], stage["outputs"])
 
 
 def _find_dataset_index(dataset_list, key, value):
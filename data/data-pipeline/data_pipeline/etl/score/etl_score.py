@@ -1,18 +1,32 @@
-import functools
+import collections
 from dataclasses import dataclass
+from typing import Dict
 from typing import List
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 from data_pipeline.etl.base import ExtractTransformLoad
+from data_pipeline.etl.base import get_field_dtypes
 from data_pipeline.etl.score import constants
+from data_pipeline.etl.sources.cdc_life_expectancy.etl import (
+    CDCLifeExpectancy,
+)
+from data_pipeline.etl.sources.cdc_places.etl import CDCPlacesETL
 from data_pipeline.etl.sources.census_acs.etl import CensusACSETL
+from data_pipeline.etl.sources.doe_energy_burden.etl import DOEEnergyBurden
 from data_pipeline.etl.sources.dot_travel_composite.etl import (
     TravelCompositeETL,
 )
 from data_pipeline.etl.sources.eamlis.etl import AbandonedMineETL
+from data_pipeline.etl.sources.ejscreen.etl import EJSCREENETL
 from data_pipeline.etl.sources.fsf_flood_risk.etl import FloodRiskETL
 from data_pipeline.etl.sources.fsf_wildfire_risk.etl import WildfireRiskETL
+from data_pipeline.etl.sources.geocorr.etl import GeoCorrETL
+from data_pipeline.etl.sources.historic_redlining.etl import (
+    HistoricRedliningETL,
+)
+from data_pipeline.etl.sources.hud_housing.etl import HudHousingETL
 from data_pipeline.etl.sources.national_risk_index.etl import (
     NationalRiskIndexETL,
 )
@@ -23,12 +37,36 @@ from data_pipeline.score import field_names
 from data_pipeline.score.score_runner import ScoreRunner
 from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.datasource import DataSource
+from data_pipeline.etl.tract_keys import from_tract_keys
+from data_pipeline.etl.tract_keys import to_tract_keys
 
 
 logger = get_module_logger(__name__)
 
 
+@dataclass
+class Percentile:
+    """A percentile to add to the score df, named
+    f"{output_column_name_root}{field_names.PERCENTILE_FIELD_SUFFIX}"."""
+
+    input_column_name: str
+    output_column_name_root: str
+    ascending: bool = True
+    # The tracts left out of the percentile, which get no percentile
+    exclude: Optional[pd.Series] = None
+
+
 class ScoreETL(ExtractTransformLoad):
+    # The dtypes of datasets.yml the score columns are compacted to once the
+    # scores are calculated. Percentiles and other floats stay float64: the
+    # thresholds compare them to values like 0.9 and they are floored for the
+    # tiles and downloads, which float32 would change the results of.
+    # Integers and strings would not be any smaller as nullable dtypes. This
+    # only shrinks the frame the score outputs: the flags of the Parquet ETL
+    # outputs already load as nullable booleans, and the ones the score
+    # calculates stay objects until it is done.
+    SCORE_COMPACT_DTYPES = ["boolean"]
+
     def __init__(self):
         # Define some global parameters
 
@@ -65,36 +103,17 @@ class ScoreETL(ExtractTransformLoad):
 
     def extract(self, use_cached_data_sources: bool = False) -> None:
 
-        # EJSCreen csv Load
-        ejscreen_csv = constants.DATA_PATH / "dataset" / "ejscreen" / "usa.csv"
-        self.ejscreen_df = pd.read_csv(
-            ejscreen_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        # Load EJSCREEN data
+        self.ejscreen_df = EJSCREENETL.get_data_frame()
 
         # Load census data
         self.census_acs_df = CensusACSETL.get_data_frame()
 
         # Load HUD housing data
-        hud_housing_csv = (
-            constants.DATA_PATH / "dataset" / "hud_housing" / "usa.csv"
-        )
-        self.hud_housing_df = pd.read_csv(
-            hud_housing_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.hud_housing_df = HudHousingETL.get_data_frame()
 
         # Load CDC Places data
-        cdc_places_csv = (
-            constants.DATA_PATH / "dataset" / "cdc_places" / "usa.csv"
-        )
-        self.cdc_places_df = pd.read_csv(
-            cdc_places_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.cdc_places_df = CDCPlacesETL.get_data_frame()
 
         # Load census AMI data
         census_acs_median_incomes_csv = (
@@ -110,24 +129,10 @@ class ScoreETL(ExtractTransformLoad):
         )
 
         # Load CDC life expectancy data
-        cdc_life_expectancy_csv = (
-            constants.DATA_PATH / "dataset" / "cdc_life_expectancy" / "usa.csv"
-        )
-        self.cdc_life_expectancy_df = pd.read_csv(
-            cdc_life_expectancy_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.cdc_life_expectancy_df = CDCLifeExpectancy.get_data_frame()
 
         # Load DOE energy burden data
-        doe_energy_burden_csv = (
-            constants.DATA_PATH / "dataset" / "doe_energy_burden" / "usa.csv"
-        )
-        self.doe_energy_burden_df = pd.read_csv(
-            doe_energy_burden_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.doe_energy_burden_df = DOEEnergyBurden.get_data_frame()
 
         # Load FEMA national risk index data
         self.national_risk_index_df = NationalRiskIndexETL.get_data_frame()
@@ -154,14 +159,7 @@ class ScoreETL(ExtractTransformLoad):
         self.tribal_overlap_df = TribalOverlapETL.get_data_frame()
 
         # Load GeoCorr Urban Rural Map
-        geocorr_urban_rural_csv = (
-            constants.DATA_PATH / "dataset" / "geocorr" / "usa.csv"
-        )
-        self.geocorr_urban_rural_df = pd.read_csv(
-            geocorr_urban_rural_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.geocorr_urban_rural_df = GeoCorrETL.get_data_frame()
 
         # Load decennial census data
         census_decennial_csv = (
@@ -187,15 +185,7 @@ class ScoreETL(ExtractTransformLoad):
         )
 
         # Load HRS data
-        hrs_csv = (
-            constants.DATA_PATH / "dataset" / "historic_redlining" / "usa.csv"
-        )
-
-        self.hrs_df = pd.read_csv(
-            hrs_csv,
-            dtype={self.GEOID_TRACT_FIELD_NAME: "string"},
-            low_memory=False,
-        )
+        self.hrs_df = HistoricRedliningETL.get_data_frame()
 
         national_tract_csv = constants.DATA_CENSUS_CSV_FILE_PATH
         self.national_tract_df = pd.read_csv(
@@ -226,46 +216,69 @@ class ScoreETL(ExtractTransformLoad):
         )  
 
     def _join_tract_dfs(self, census_tract_dfs: list) -> pd.DataFrame:
+        """Outer joins data frames of tracts on their tract IDs.
+
+        Each frame is indexed by tract key once, and all of them are combined
+        by a single concat aligned on the keys. Tracts are in the order of the
+        first frame, followed by the tracts only found in later frames, as
+        they would be with successive outer merges.
+
+        Raises:
+            ValueError: if the frames use tract IDs of different lengths,
+                have duplicate tracts, or have columns in common besides the
+                tract ID
+        """
         logger.debug("Joining Census Tract dataframes")
 
-        def merge_function(
-            left: pd.DataFrame, right: pd.DataFrame
-        ) -> pd.DataFrame:
-            """This is a custom function that merges two dataframes.
-
-            It provides some logging as additional helpful context for error handling.
-            """
-            try:
-                df = pd.merge(
-                    left=left,
-                    right=right,
-                    on=self.GEOID_TRACT_FIELD_NAME,
-                    how="outer",
+        # Sanity check the tracts before they are joined, as the length of the
+        # tract IDs is lost in their keys.
+        tract_id_lengths = set()
+        for df in census_tract_dfs:
+            tract_id_lengths.update(
+                df[self.GEOID_TRACT_FIELD_NAME].str.len().unique()
+            )
+        if len(tract_id_lengths) != 1:
+            raise ValueError(
+                f"One of the input CSVs uses {self.GEOID_TRACT_FIELD_NAME} with a different length."
+            )
+
+        # Columns found in several frames would be suffixed by a merge, and
+        # one of them silently used instead of the other.
+        column_counts = collections.Counter(
+            column for df in census_tract_dfs for column in df.columns
+        )
+        duplicate_columns = [
+            column
+            for column, count in column_counts.items()
+            if count > 1 and column != self.GEOID_TRACT_FIELD_NAME
+        ]
+        if duplicate_columns:
+            raise ValueError(
+                f"Several of the dataframes to join have the columns {duplicate_columns}"
+            )
+
+        keyed_dfs = []
+        for df in census_tract_dfs:
+            tract_keys = to_tract_keys(df[self.GEOID_TRACT_FIELD_NAME])
+            if tract_keys.duplicated().any():
+                raise ValueError(
+                    f"There are duplicate tract IDs in the dataframe that has columns {','.join(df.columns)}"
                 )
-            except Exception as e:
-                # Note: it'd be nice to log the name of the dataframe, but that's not accessible in this scope.
-                logger.warning(
-                    f"Exception encountered while merging dataframe `right` that has the following columns: {','.join(right.columns)}"
+            keyed_dfs.append(
+                df.drop(columns=self.GEOID_TRACT_FIELD_NAME).set_index(
+                    pd.Index(tract_keys, name=self.GEOID_TRACT_FIELD_NAME)
                 )
-                raise e
+            )
 
-            return df
+        census_tract_df = pd.concat(keyed_dfs, axis=1, join="outer", sort=False)
 
-        # Just a note -- it would be faster (I think) to set geoid10_tract as the index and  then concat all frames 1x
-        census_tract_df = functools.reduce(
-            merge_function,
-            census_tract_dfs,
+        # Put the tract IDs back where the first frame has them
+        census_tract_df.insert(
+            census_tract_dfs[0].columns.get_loc(self.GEOID_TRACT_FIELD_NAME),
+            self.GEOID_TRACT_FIELD_NAME,
+            from_tract_keys(census_tract_df.index.to_series()).array,
         )
-
-        # Sanity check the join.
-        if (
-            len(census_tract_df[self.GEOID_TRACT_FIELD_NAME].str.len().unique())
-            != 1
-        ):
-            raise ValueError(
-                f"One of the input CSVs uses {self.GEOID_TRACT_FIELD_NAME} with a different length."
-            )
-        return census_tract_df
+        return census_tract_df.reset_index(drop=True)
 
     def _census_tract_df_sanity_check(
         self, df_to_check: pd.DataFrame, df_name: str = None
@@ -301,6 +314,62 @@ class ScoreETL(ExtractTransformLoad):
                 f"Too many rows in the join: {len(df_to_check)} in {dataframe_descriptor}"
             )
 
+    @staticmethod
+    def _add_percentiles(
+        df: pd.DataFrame, percentiles: List[Percentile]
+    ) -> pd.DataFrame:
+        """Adds percentiles of many columns at once.
+
+        The input columns that share a direction and the tracts they leave out
+        are ranked together, in one pass over a float64 array where the tracts
+        left out are missing. Ties and missing values are ranked like
+        `pd.Series.rank(pct=True)` does. All percentiles are written to a
+        single array, added to the df at once, replacing any percentile
+        columns that were already there.
+        """
+        output_column_names = [
+            f"{percentile.output_column_name_root}"
+            f"{field_names.PERCENTILE_FIELD_SUFFIX}"
+            for percentile in percentiles
+        ]
+        if len(set(output_column_names)) != len(output_column_names):
+            raise ValueError("Some percentiles would have the same column name")
+
+        groups: Dict[tuple, List[int]] = {}
+        for i, percentile in enumerate(percentiles):
+            exclude_id = (
+                None if percentile.exclude is None else id(percentile.exclude)
+            )
+            groups.setdefault((percentile.ascending, exclude_id), []).append(i)
+
+        ranks = np.empty((len(df), len(percentiles)))
+        for (ascending, _), indices in groups.items():
+            values = df[
+                [percentiles[i].input_column_name for i in indices]
+            ].to_numpy(dtype="float64", na_value=np.nan)
+            exclude = percentiles[indices[0]].exclude
+            if exclude is not None:
+                logger.debug(
+                    f"Leaving {exclude.sum()} tracts out of {len(indices)} percentiles"
+                )
+                values[exclude.to_numpy(dtype=bool)] = np.nan
+            ranks[:, indices] = (
+                pd.DataFrame(values)
+                .rank(pct=True, ascending=ascending)
+                .to_numpy()
+            )
+
+        return pd.concat(
+            [
+                df.drop(columns=output_column_names, errors="ignore"),
+                pd.DataFrame(
+                    ranks, index=df.index, columns=output_column_names
+                ),
+            ],
+            axis=1,
+            copy=False,
+        )
+
     @staticmethod
     def _add_percentiles_to_df(
         df: pd.DataFrame,
@@ -320,44 +389,23 @@ class ScoreETL(ExtractTransformLoad):
         reverse percentile use case. In that use case, `input_column_name` may be
         something like "3rd grade reading proficiency" and `output_column_name_root`
         may be something like "Low 3rd grade reading proficiency".
-        """
-
-        # We have two potential options for assessing how to calculate percentiles.
-        # For the vast majority of columns, we will simply calculate percentiles overall.
-        # However, for Linguistic Isolation and Agricultural  Value Loss, there exist conditions
-        # for which we drop out tracts from consideration in the percentile. More details on those
-        # are below, for them, we provide a list of tracts to not include.
-        # Because of the fancy transformations below, I have removed the urban / rural percentiles,
-        # which are now deprecated.
-        if not drop_tracts:
-            # Create the "basic" percentile.
-            ## note: I believe this is less performant than if we made a bunch of these PFS columns
-            ## and then concatenated the list. For the refactor!
-            df[
-                f"{output_column_name_root}"
-                f"{field_names.PERCENTILE_FIELD_SUFFIX}"
-            ] = df[input_column_name].rank(pct=True, ascending=ascending)
-
-        else:
-            tmp_series = df[input_column_name].where(
-                ~df[field_names.GEOID_TRACT_FIELD].isin(drop_tracts),
-                np.nan,
-            )
-            logger.debug(
-                f"Creating special case column for percentiles from {input_column_name}"
-            )
-            df[
-                f"{output_column_name_root}"
-                f"{field_names.PERCENTILE_FIELD_SUFFIX}"
-            ] = tmp_series.rank(ascending=ascending, pct=True)
 
-            # Check that "drop tracts" were dropped (quicker than creating a fixture?)
-            assert df[df[field_names.GEOID_TRACT_FIELD].isin(drop_tracts)][
-                f"{output_column_name_root}"
-                f"{field_names.PERCENTILE_FIELD_SUFFIX}"
-            ].isna().sum() == len(drop_tracts), "Not all tracts were dropped"
-
-        return df
+        Tracts in `drop_tracts` are left out of the percentile. To add many
+        percentiles, use `_add_percentiles`, which ranks them together.
+        """
+        return ScoreETL._add_percentiles(
+            df,
+            [
+                Percentile(
+                    input_column_name=input_column_name,
+                    output_column_name_root=output_column_name_root,
+                    ascending=ascending,
+                    exclude=df[field_names.GEOID_TRACT_FIELD].isin(drop_tracts)
+                    if drop_tracts
+                    else None,
+                )
+            ],
+        )
 
     # TODO Move a lot of this to the ETL part of the pipeline
     def _prepare_initial_df(self) -> pd.DataFrame:
@@ -393,14 +441,24 @@ class ScoreETL(ExtractTransformLoad):
 
         census_tract_df = self._join_tract_dfs(census_tract_dfs)
 
+        # The joined df holds a copy of every input, so the inputs are let go
+        # of rather than kept in memory alongside it until the score is done
+        for attribute, value in list(vars(self).items()):
+            if any(value is input_df for input_df in census_tract_dfs):
+                setattr(self, attribute, None)
+        del census_tract_dfs
+
         # Drop tracts that don't exist in the 2010 tracts
         pre_join_len = census_tract_df[field_names.GEOID_TRACT_FIELD].nunique()
 
-        census_tract_df = census_tract_df.merge(
-            self.national_tract_df,
-            on="GEOID10_TRACT",
-            how="inner",
+        national_tract_keys = to_tract_keys(
+            self.national_tract_df[field_names.GEOID_TRACT_FIELD]
         )
+        census_tract_df = census_tract_df[
+            to_tract_keys(census_tract_df[field_names.GEOID_TRACT_FIELD]).isin(
+                national_tract_keys
+            )
+        ].reset_index(drop=True)
         assert (
             census_tract_df.shape[0] <= pre_join_len
         ), "Join against national tract list ADDED rows"
@@ -590,7 +648,11 @@ class ScoreETL(ExtractTransformLoad):
         # since this is a boolean, need to use `None`
         for col in boolean_columns:
             tmp = df_copy[col].copy()
-            df_copy[col] = np.where(tmp.notna(), tmp.astype(bool), None)
+            # Missing values are filled first, as nullable booleans can't be
+            # cast to bool with them
+            df_copy[col] = np.where(
+                tmp.notna(), tmp.fillna(False).astype(bool), None
+            )
             logger.debug(f"{col} contains {df_copy[col].isna().sum()} nulls.")
 
         # Convert all columns to numeric and do math
@@ -611,66 +673,59 @@ class ScoreETL(ExtractTransformLoad):
         #     For *Traffic Barriers*, we want to exclude low population tracts, which may have high burden because they are
         #     low population alone. We set this low population constant in the if statement.
 
-        for numeric_column in numeric_columns:
-            drop_tracts = []
-            if (
-                numeric_column
-                == field_names.EXPECTED_AGRICULTURE_LOSS_RATE_FIELD
-            ):
-                drop_tracts = df_copy[
-                    ~df_copy[field_names.AGRICULTURAL_VALUE_BOOL_FIELD]
-                    .astype(bool)
-                    .fillna(False)
-                ][field_names.GEOID_TRACT_FIELD].to_list()
-                logger.debug(
-                    f"Dropping {len(drop_tracts)} tracts from Agricultural Value Loss"
-                )
-            elif numeric_column == field_names.LINGUISTIC_ISO_FIELD:
-                drop_tracts = df_copy[
-                    # 72 is the FIPS code for Puerto Rico
-                    df_copy[field_names.GEOID_TRACT_FIELD].str.startswith("72")
-                ][field_names.GEOID_TRACT_FIELD].to_list()
-                logger.debug(
-                    f"Dropping {len(drop_tracts)} tracts from Linguistic Isolation"
-                )
-
-            elif numeric_column in [
-                field_names.DOT_TRAVEL_BURDEN_FIELD,
-                field_names.EXPECTED_POPULATION_LOSS_RATE_FIELD,
-            ]:
-                # Not having any people appears to be correlated with transit burden, but also doesn't represent
-                # on the ground need. For now, we remove these tracts from the percentile calculation.ß
-                # Similarly, we want to exclude low population tracts from FEMA's index
-                low_population = 20
-                drop_tracts = df_copy[
-                    df_copy[field_names.TOTAL_POP_FIELD].fillna(0)
-                    <= low_population
-                ][field_names.GEOID_TRACT_FIELD].to_list()
-                logger.debug(
-                    f"Dropping {len(drop_tracts)} tracts from DOT traffic burden"
-                )
+        # Each of these is computed once, and shared by the percentiles that
+        # leave the same tracts out.
+        # Missing values count as having agricultural value
+        no_agricultural_value = ~df_copy[
+            field_names.AGRICULTURAL_VALUE_BOOL_FIELD
+        ].fillna(True).astype(bool)
+        # 72 is the FIPS code for Puerto Rico
+        puerto_rico = df_copy[field_names.GEOID_TRACT_FIELD].str.startswith(
+            "72"
+        )
+        # Not having any people appears to be correlated with transit burden, but also doesn't represent
+        # on the ground need. For now, we remove these tracts from the percentile calculation.
+        # Similarly, we want to exclude low population tracts from FEMA's index
+        low_population = 20
+        low_population_tracts = (
+            df_copy[field_names.TOTAL_POP_FIELD].fillna(0) <= low_population
+        )
+        excluded_tracts = {
+            field_names.EXPECTED_AGRICULTURE_LOSS_RATE_FIELD: no_agricultural_value,
+            field_names.LINGUISTIC_ISO_FIELD: puerto_rico,
+            field_names.DOT_TRAVEL_BURDEN_FIELD: low_population_tracts,
+            field_names.EXPECTED_POPULATION_LOSS_RATE_FIELD: low_population_tracts,
+        }
+        for numeric_column, exclude in excluded_tracts.items():
+            logger.debug(
+                f"Dropping {exclude.sum()} tracts from {numeric_column}"
+            )
 
-            df_copy = self._add_percentiles_to_df(
-                df=df_copy,
+        percentiles = [
+            Percentile(
                 input_column_name=numeric_column,
                 # For this use case, the input name and output name root are the same.
                 output_column_name_root=numeric_column,
                 ascending=True,
-                drop_tracts=drop_tracts,
+                exclude=excluded_tracts.get(numeric_column),
             )
+            for numeric_column in numeric_columns
+        ]
 
         # Create reversed percentiles for these fields
-        for reverse_percentile in reverse_percentiles:
-            # Calculate reverse percentiles
-            # For instance, for 3rd grade reading level (score from 0-500),
-            # calculate reversed percentiles and give the result the name
-            # `Low 3rd grade reading level (percentile)`.
-            df_copy = self._add_percentiles_to_df(
-                df=df_copy,
+        # For instance, for 3rd grade reading level (score from 0-500),
+        # calculate reversed percentiles and give the result the name
+        # `Low 3rd grade reading level (percentile)`.
+        percentiles += [
+            Percentile(
                 input_column_name=reverse_percentile.field_name,
                 output_column_name_root=reverse_percentile.low_field_name,
                 ascending=False,
             )
+            for reverse_percentile in reverse_percentiles
+        ]
+
+        df_copy = self._add_percentiles(df_copy, percentiles)
 
         # Special logic: create a combined population field.
         # We sometimes run analytics on "population", and this makes a single field
@@ -714,6 +769,34 @@ class ScoreETL(ExtractTransformLoad):
 
         return df
 
+    def _get_compact_dtypes(self, df: pd.DataFrame) -> Dict[str, str]:
+        """Returns the dtypes to compact the columns of the score df to, by
+        column name"""
+        dtypes = {
+            column: dtype
+            for column, dtype in get_field_dtypes(
+                self.DATASET_CONFIG_PATH / "datasets.yml"
+            ).items()
+            if column in df.columns and dtype in self.SCORE_COMPACT_DTYPES
+        }
+        # The flags calculated here and by the score are not in datasets.yml.
+        # They are object columns of booleans, with None where they are missing.
+        for column in df.columns[df.dtypes == object]:
+            if (
+                column not in dtypes
+                and pd.api.types.infer_dtype(df[column], skipna=True)
+                == "boolean"
+            ):
+                dtypes[column] = "boolean"
+        return dtypes
+
+    def _compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Casts the flags of the score df from objects to nullable booleans,
+        which take a quarter of the memory"""
+        dtypes = self._get_compact_dtypes(df)
+        logger.debug(f"Compacting the dtypes of {len(dtypes)} score columns")
+        return df.astype(dtypes)
+
     def transform(self) -> None:
         # prepare the df with the right CBG/tract IDs, column names/types, and percentiles
         self.df = self._prepare_initial_df()
@@ -724,6 +807,8 @@ class ScoreETL(ExtractTransformLoad):
         # We add island demographic data since it doesn't matter to the score anyway
         self.df = self._backfill_island_demographics(self.df)
 
+        self.df = self._compact_dtypes(self.df)
+
     def load(self) -> None:
         constants.DATA_SCORE_CSV_FULL_DIR.mkdir(parents=True, exist_ok=True)
 
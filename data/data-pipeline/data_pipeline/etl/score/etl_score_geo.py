@@ -1,6 +1,12 @@
 import concurrent.futures
 import math
 import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
 
 import geopandas as gpd
 import numpy as np
@@ -20,16 +26,119 @@ from data_pipeline.etl.datasource import DataSource
 logger = get_module_logger(__name__)
 
 
+@dataclass
+class GeoScoreLayer:
+    """A map layer made of the census tract geometries with the score baked in.
+
+    All layers share the same high zoom GeoJSON, with every tile score column.
+    The low zoom GeoJSON dissolves the tracts into buckets of one target score
+    column.
+
+    Attributes:
+        name (str): the name of the layer, e.g. "gistar_burd"
+        target_score_field (str): the score column (as named in `field_names`)
+            of the low zoom GeoJSON
+        target_score_rename_to (str): the name of that column in the low zoom
+            GeoJSON
+        geojson_path (Path): the directory of the GeoJSON files, relative to
+            data/score
+        high_geojson_file_name (str): the file name of the high zoom GeoJSON
+        low_geojson_file_name (str): the file name of the low zoom GeoJSON, or
+            None if the layer has no low zoom GeoJSON
+        write_shapefile (bool): whether the layer comes with the ESRI shapefile
+            and its codebook
+    """
+
+    name: str
+    target_score_field: str
+    target_score_rename_to: str
+    geojson_path: Path
+    high_geojson_file_name: str
+    low_geojson_file_name: Optional[str] = None
+    write_shapefile: bool = False
+
+    @property
+    def has_low_zoom(self) -> bool:
+        return self.low_geojson_file_name is not None
+
+
+GEO_SCORE_LAYERS: Dict[str, GeoScoreLayer] = {
+    layer.name: layer
+    for layer in [
+        GeoScoreLayer(
+            name="default",
+            target_score_field=field_names.FINAL_SCORE_N_BOOLEAN,
+            target_score_rename_to="SCORE",
+            geojson_path=Path("geojson") / "default",
+            high_geojson_file_name="usa-high.json",
+            low_geojson_file_name="usa-low.json",
+            write_shapefile=True,
+        ),
+        GeoScoreLayer(
+            name="gistar_burd",
+            target_score_field=field_names.PSIM_BURDEN,
+            target_score_rename_to="P_BURD",
+            geojson_path=Path("geojson") / "gistar" / "burd",
+            high_geojson_file_name="usa-high-gistar-burd.json",
+            low_geojson_file_name="usa-low-gistar-burd.json",
+        ),
+        GeoScoreLayer(
+            name="gistar_ind",
+            target_score_field=field_names.PSIM_INDICATOR,
+            target_score_rename_to="P_IND",
+            geojson_path=Path("geojson") / "gistar" / "ind",
+            high_geojson_file_name="usa-high-gistar-ind.json",
+            low_geojson_file_name="usa-low-gistar-ind.json",
+        ),
+        GeoScoreLayer(
+            name="add_burd",
+            target_score_field=field_names.CATEGORY_COUNT,
+            target_score_rename_to="CC",
+            geojson_path=Path("geojson") / "add" / "burd",
+            high_geojson_file_name="usa-high-add-burd.json",
+            low_geojson_file_name="usa-low-add-burd.json",
+        ),
+        GeoScoreLayer(
+            name="add_ind",
+            target_score_field=field_names.THRESHOLD_COUNT,
+            target_score_rename_to="TC",
+            geojson_path=Path("geojson") / "add" / "ind",
+            high_geojson_file_name="usa-high-add-ind.json",
+            low_geojson_file_name="usa-low-add-ind.json",
+        ),
+        GeoScoreLayer(
+            name="custom_burd",
+            target_score_field=field_names.CATEGORY_COUNT,
+            target_score_rename_to="CC",
+            geojson_path=Path("geojson") / "custom" / "burd",
+            high_geojson_file_name="usa-high-custom-burd.json",
+        ),
+        GeoScoreLayer(
+            name="custom_ind",
+            target_score_field=field_names.THRESHOLD_COUNT,
+            target_score_rename_to="TC",
+            geojson_path=Path("geojson") / "custom" / "ind",
+            high_geojson_file_name="usa-high-custom-ind.json",
+        ),
+    ]
+}
+
+
 class GeoScoreETL(ExtractTransformLoad):
     """
     A class used to generate per state and national GeoJson files with the score baked in
+
+    The census GeoJSON and the tile scores are read and merged once, and every
+    requested layer (see `GEO_SCORE_LAYERS`) is computed from that shared frame.
     """
 
-    def __init__(self, data_source: str = None):
+    def __init__(
+        self,
+        data_source: str = None,
+        layers: Optional[List[GeoScoreLayer]] = None,
+    ):
         self.DATA_SOURCE = data_source
-        self.SCORE_GEOJSON_PATH = self.DATA_PATH / "score" / "geojson" / "default"
-        self.SCORE_LOW_GEOJSON = self.SCORE_GEOJSON_PATH / "usa-low.json"
-        self.SCORE_HIGH_GEOJSON = self.SCORE_GEOJSON_PATH / "usa-high.json"
+        self.LAYERS = layers or [GEO_SCORE_LAYERS["default"]]
 
         self.SCORE_SHP_PATH = self.DATA_PATH / "score" / "shapefile"
         self.SCORE_SHP_FILE = self.SCORE_SHP_PATH / "usa.shp"
@@ -39,28 +148,12 @@ class GeoScoreETL(ExtractTransformLoad):
 
         self.CENSUS_USA_GEOJSON = constants.DATA_CENSUS_GEOJSON_FILE_PATH
 
-        # Import the shortened name for Score N to be used on tiles.
-        # We should no longer be using PFS
-
-        ## TODO: We really should not have this any longer changing
-        self.TARGET_SCORE_SHORT_FIELD = constants.TILES_SCORE_COLUMNS[
-            field_names.FINAL_SCORE_N_BOOLEAN
-        ]
-        self.TARGET_SCORE_RENAME_TO = "SCORE"
-
         # Import the shortened name for tract ("GTF") that's used on the tiles.
         self.TRACT_SHORT_FIELD = constants.TILES_SCORE_COLUMNS[
             field_names.GEOID_TRACT_FIELD
         ]
         self.GEOMETRY_FIELD_NAME = "geometry"
         self.LAND_FIELD_NAME = "ALAND10"
-        # Add these names up here!!
-        # self.PSIM_BURDEN = "P_BURD"
-        # self.PSIM_INDICATOR = "P_IND"
-        # self.THRESHOLD_COUNT = "TC"
-        # self.CATEGORY_COUNT = "CC"
-        # self.BURDEN_ID: "ID_BURD"
-        # self.INDICATOR_ID: "ID_IND"
 
         # We will adjust this upwards while there is some fractional value
         # in the score. This is a starting value.
@@ -71,7 +164,11 @@ class GeoScoreETL(ExtractTransformLoad):
         self.geojson_usa_df: gpd.GeoDataFrame
         self.score_usa_df: pd.DataFrame
         self.geojson_score_usa_high: gpd.GeoDataFrame
-        self.geojson_score_usa_low: gpd.GeoDataFrame
+        # The low zoom GeoJSON of each layer that has one, by layer name
+        self.geojson_score_usa_low: Dict[str, gpd.GeoDataFrame] = {}
+
+    def _get_geojson_path(self, layer: GeoScoreLayer) -> Path:
+        return self.DATA_PATH / "score" / layer.geojson_path
 
     def get_data_sources(self) -> [DataSource]:
         return (
@@ -126,7 +223,6 @@ class GeoScoreETL(ExtractTransformLoad):
         logger.info("Pruning Census GeoJSON")
         fields = [self.GEOID_FIELD_NAME, self.GEOMETRY_FIELD_NAME]
 
-        # TODO update this join
         logger.info("Merging and compressing score csv with USA GeoJSON")
         self.geojson_score_usa_high = self.score_usa_df.set_index(
             self.GEOID_FIELD_NAME
@@ -137,217 +233,215 @@ class GeoScoreETL(ExtractTransformLoad):
             how="left",
         )
 
-        # missing_geom = self.geojson_score_usa_high["geometry"].isnull().sum()
-        # total = len(self.geojson_score_usa_high)
-
-        # Optional hard fail
-        # assert missing_geom == 0, "Some geometries failed to merge!"
-
-
         self.geojson_score_usa_high = gpd.GeoDataFrame(
             self.geojson_score_usa_high, crs="EPSG:4326"
         )
         # Check for null geometries
         missing_ids = self.geojson_score_usa_high[
-        self.geojson_score_usa_high["geometry"].isnull()
+            self.geojson_score_usa_high["geometry"].isnull()
         ].index.tolist()
 
-        logger.warning(f"Dropping {len(missing_ids)} tracts with null geometry. Example: {missing_ids[:5]}")
+        logger.warning(
+            f"Dropping {len(missing_ids)} tracts with null geometry. Example: {missing_ids[:5]}"
+        )
 
-        # REMOVE NULL GEOMETRIES!! 
+        # REMOVE NULL GEOMETRIES!!
         self.geojson_score_usa_high = self.geojson_score_usa_high[
-        self.geojson_score_usa_high["geometry"].notnull()
+            self.geojson_score_usa_high["geometry"].notnull()
         ]
 
-        # logger.warning("geojson_score_usa_high geometry nulls: %s", self.geojson_score_usa_high["geometry"].isnull().sum())
-        # logger.warning("geojson_score_usa_high total rows: %s", len(self.geojson_score_usa_high))
+        low_zoom_layers = [layer for layer in self.LAYERS if layer.has_low_zoom]
+        if not low_zoom_layers:
+            return
 
+        # Which tracts are kept at high zoom only depends on their state, so
+        # it's worked out once for all layers
+        keep_high_zoom = self._get_keep_high_zoom_mask()
 
-        usa_simplified = self.geojson_score_usa_high[
-            [
-                self.TARGET_SCORE_SHORT_FIELD,
-                self.GEOMETRY_FIELD_NAME,
-            ]
-        ].reset_index()
-
-        usa_tracts = usa_simplified.rename(
-            columns={self.TARGET_SCORE_SHORT_FIELD: self.TARGET_SCORE_RENAME_TO}
+        logger.info(
+            f"Creating low zoom GeoJSON for layers {[layer.name for layer in low_zoom_layers]}"
         )
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = {
+                executor.submit(
+                    self._create_low_zoom_layer, layer, keep_high_zoom
+                ): layer
+                for layer in low_zoom_layers
+            }
+            for fut in concurrent.futures.as_completed(futures):
+                # Calling result will raise an exception if one occurred.
+                # Otherwise, the exceptions are silently ignored.
+                self.geojson_score_usa_low[futures[fut].name] = fut.result()
+
+    def _get_keep_high_zoom_mask(self) -> np.ndarray:
+        """Flags the tracts of the states with few enough tracts to be kept at
+        high zoom instead of being aggregated (right now, this just keeps
+        Wyoming), in the order of `geojson_score_usa_high`"""
+        state = pd.Series(
+            self.geojson_score_usa_high.index.str[:2],
+            index=np.arange(len(self.geojson_score_usa_high)),
+        )
+        keep_high_zoom = (
+            state.groupby(state).transform("count")
+            <= self.HIGH_LOW_ZOOM_CENSUS_TRACT_THRESHOLD
+        ).to_numpy()
+        assert (
+            keep_high_zoom.sum() != len(keep_high_zoom)
+        ), "Error: Cutoff is too high, nothing is aggregated"
+        assert keep_high_zoom.sum() > 1, "Error: Nothing is kept at high zoom"
+        return keep_high_zoom
 
-        logger.info("Converting GeoJSON into GeoDataFrame with tracts")
+    def _create_low_zoom_layer(
+        self, layer: GeoScoreLayer, keep_high_zoom: np.ndarray
+    ) -> gpd.GeoDataFrame:
+        target_field = constants.TILES_SCORE_COLUMNS[layer.target_score_field]
+        score_field = layer.target_score_rename_to
+
+        logger.info(
+            f"Converting GeoJSON into GeoDataFrame with tracts for {layer.name}"
+        )
         usa_tracts = gpd.GeoDataFrame(
-            usa_tracts,
+            self.geojson_score_usa_high[
+                [target_field, self.GEOMETRY_FIELD_NAME]
+            ]
+            .reset_index()
+            .rename(columns={target_field: score_field}),
             columns=[
-                self.TARGET_SCORE_RENAME_TO,
+                score_field,
                 self.GEOMETRY_FIELD_NAME,
                 self.GEOID_FIELD_NAME,
             ],
             crs="EPSG:4326",
         )
 
-        logger.debug("Creating buckets from tracts")
-        usa_bucketed, keep_high_zoom_df = self._create_buckets_from_tracts(
-            usa_tracts, self.NUMBER_OF_BUCKETS
+        logger.debug(f"Creating buckets from tracts for {layer.name}")
+        usa_bucketed = self._create_buckets_from_tracts(
+            usa_tracts[~keep_high_zoom], score_field
         )
-        logger.warning("usa_bucketed: %s", len(usa_bucketed))
-        logger.warning("keep_high_zoom_df: %s", len(keep_high_zoom_df))
 
-        logger.debug("Aggregating buckets")
-        usa_aggregated = self._aggregate_buckets(usa_bucketed, agg_func="mean")
-
-        logger.debug("Breaking up polygons")
-        compressed = self._breakup_multipolygons(
-            usa_aggregated, self.NUMBER_OF_BUCKETS
+        logger.debug(f"Aggregating buckets for {layer.name}")
+        usa_aggregated = self._aggregate_buckets(
+            usa_bucketed, score_field, agg_func="mean"
         )
 
-        self.geojson_score_usa_low = self._join_high_and_low_zoom_frames(
-            compressed, keep_high_zoom_df
-        )
+        logger.debug(f"Breaking up polygons for {layer.name}")
+        compressed = self._breakup_multipolygons(usa_aggregated, score_field)
 
-        # Ensure the new columns got added
-        logger.debug(f"Columns in low zoom GeoJSON: {self.geojson_score_usa_low.columns}")
+        geojson_score_usa_low = self._join_high_and_low_zoom_frames(
+            compressed, usa_tracts[keep_high_zoom], score_field
+        )
 
         # round to 2 decimals
-        self.geojson_score_usa_low = self.geojson_score_usa_low.round(
-            {self.TARGET_SCORE_RENAME_TO: 2}
-        )
+        return geojson_score_usa_low.round({score_field: 2})
 
     def _create_buckets_from_tracts(
-        self, initial_state_tracts: gpd.GeoDataFrame, num_buckets: int
-    ):
+        self, state_tracts: gpd.GeoDataFrame, score_field: str
+    ) -> gpd.GeoDataFrame:
+        """Assigns the tracts to buckets of similar scores"""
         # Assert statement for null geometries
-        assert initial_state_tracts["geometry"].notnull().all(), "Some geometries are null at bucket creation!"
-
-        # First, we remove any states that have under the threshold of census tracts
-        # from being aggregated (right now, this just removes Wyoming)
-        highzoom_state_tracts = initial_state_tracts.reset_index()
-        highzoom_state_tracts["state"] = highzoom_state_tracts[
-            self.GEOID_FIELD_NAME
-        ].str[:2]
-        keep_high_zoom = highzoom_state_tracts.groupby("state")[
-            self.GEOID_FIELD_NAME
-        ].transform(
-            lambda x: x.count() <= self.HIGH_LOW_ZOOM_CENSUS_TRACT_THRESHOLD
-        )
         assert (
-            keep_high_zoom.sum() != initial_state_tracts.shape[0]
-        ), "Error: Cutoff is too high, nothing is aggregated"
-        assert keep_high_zoom.sum() > 1, "Error: Nothing is kept at high zoom"
+            state_tracts["geometry"].notnull().all()
+        ), "Some geometries are null at bucket creation!"
 
-        # Then we assign buckets only to tracts that do not get "kept" at high zoom
-        state_tracts = initial_state_tracts[~keep_high_zoom].copy()
-        state_tracts[f"{self.TARGET_SCORE_RENAME_TO}_bucket"] = np.arange(
-            len(state_tracts)
-        )
         # assign tracts to buckets by score
-        state_tracts = state_tracts.sort_values(
-            self.TARGET_SCORE_RENAME_TO, ascending=True
-        )
-        score_bucket = []
-        bucket_size = math.ceil(
-            len(state_tracts.index) / self.NUMBER_OF_BUCKETS
-        )
+        state_tracts = state_tracts.sort_values(score_field, ascending=True)
+        number_of_buckets = self.NUMBER_OF_BUCKETS
+        bucket_size = math.ceil(len(state_tracts.index) / number_of_buckets)
 
         # This just increases the number of buckets so they are more
         # homogeneous. It's not actually necessary :shrug:
         while (
-            state_tracts[self.TARGET_SCORE_RENAME_TO].sum() % bucket_size
+            state_tracts[score_field].sum() % bucket_size
             > self.HOMOGENEITY_THRESHOLD
         ):
-            self.NUMBER_OF_BUCKETS += 1
-            bucket_size = math.ceil(
-                len(state_tracts.index) / self.NUMBER_OF_BUCKETS
-            )
+            number_of_buckets += 1
+            bucket_size = math.ceil(len(state_tracts.index) / number_of_buckets)
 
         logger.debug(
-            f"The number of buckets has increased to {self.NUMBER_OF_BUCKETS}"
+            f"The number of buckets for {score_field} has increased to {number_of_buckets}"
+        )
+        return state_tracts.assign(
+            **{
+                f"{score_field}_bucket": np.arange(len(state_tracts.index))
+                // bucket_size
+            }
         )
-        for i in range(len(state_tracts.index)):
-            score_bucket.extend([math.floor(i / bucket_size)])
-        state_tracts[f"{self.TARGET_SCORE_RENAME_TO}_bucket"] = score_bucket
-
-        logger.debug(f"Columns in state_tracts before aggregation: {state_tracts.columns}")
-        logger.debug(f"Sample data in state_tracts: {state_tracts.head()}")
-
-        return state_tracts, initial_state_tracts[keep_high_zoom]
 
     def _aggregate_buckets(
-        self, state_tracts: gpd.GeoDataFrame, agg_func: str
+        self, state_tracts: gpd.GeoDataFrame, score_field: str, agg_func: str
     ) -> gpd.GeoDataFrame:
         keep_cols = [
-            self.TARGET_SCORE_RENAME_TO,
-            f"{self.TARGET_SCORE_RENAME_TO}_bucket",
+            score_field,
+            f"{score_field}_bucket",
             self.GEOMETRY_FIELD_NAME,
         ]
 
-        assert state_tracts["geometry"].notnull().all(), "Null geometry before dissolve!"
-
-        #  We dissolve all other tracts by their score bucket
-        # state_dissolve = state_tracts[keep_cols].dissolve(
-        #     by=f"{self.TARGET_SCORE_RENAME_TO}_bucket", aggfunc=agg_func
-        # )
+        assert (
+            state_tracts["geometry"].notnull().all()
+        ), "Null geometry before dissolve!"
 
         #  We dissolve all other tracts by their score bucket
         state_dissolve = state_tracts[keep_cols].dissolve(
-            by=f"{self.TARGET_SCORE_RENAME_TO}_bucket", aggfunc=agg_func
+            by=f"{score_field}_bucket", aggfunc=agg_func
         )
 
-        assert state_dissolve["geometry"].notnull().all(), "Null geometry after dissolve!"
-
-        logger.debug(f"Columns in state dissolve: {state_dissolve.columns}")
-        logger.debug(f"Sample data in state dissolve (aggregated buckets): {state_dissolve.head()}")
-
+        assert (
+            state_dissolve["geometry"].notnull().all()
+        ), "Null geometry after dissolve!"
 
         return state_dissolve
 
     def _breakup_multipolygons(
-        self, state_bucketed_df: gpd.GeoDataFrame, num_buckets: int
+        self, state_bucketed_df: gpd.GeoDataFrame, score_field: str
     ) -> gpd.GeoDataFrame:
-
-        compressed = []
-        for i in range(num_buckets):
-            for j in range(
-                len(state_bucketed_df[self.GEOMETRY_FIELD_NAME][i].geoms)
-            ):
-                compressed.append(
-                    [
-                        state_bucketed_df[self.TARGET_SCORE_RENAME_TO][i],
-                        state_bucketed_df[self.GEOMETRY_FIELD_NAME][i].geoms[j],
-                    ]
-                )
-        return compressed
+        """Splits the geometry of each bucket into its polygons"""
+        return (
+            state_bucketed_df[[score_field, self.GEOMETRY_FIELD_NAME]]
+            .explode(index_parts=False)
+            .reset_index(drop=True)
+        )
 
     def _join_high_and_low_zoom_frames(
-        self, compressed: list, keep_high_zoom_df: gpd.GeoDataFrame
+        self,
+        compressed: gpd.GeoDataFrame,
+        keep_high_zoom_df: gpd.GeoDataFrame,
+        score_field: str,
     ) -> gpd.GeoDataFrame:
         keep_columns = [
-            self.TARGET_SCORE_RENAME_TO,
+            score_field,
             self.GEOMETRY_FIELD_NAME,
         ]
-        compressed_geodf = gpd.GeoDataFrame(
-            compressed,
-            columns=keep_columns,
-            crs="EPSG:4326",
-        )
-        return pd.concat([compressed_geodf, keep_high_zoom_df[keep_columns]])
+        return pd.concat([compressed, keep_high_zoom_df[keep_columns]])
 
     def load(self) -> None:
+        for layer in self.LAYERS:
+            self._get_geojson_path(layer).mkdir(parents=True, exist_ok=True)
+
         # Create separate threads to run each write to disk.
         def write_high_to_file():
-            logger.info("Writing usa-high (~9 minutes)")
+            # The high zoom GeoJSON is the same for every layer, so it's
+            # written once and copied for the other layers
+            first_path, *other_paths = [
+                self._get_geojson_path(layer) / layer.high_geojson_file_name
+                for layer in self.LAYERS
+            ]
+            logger.info(f"Writing {first_path.name} (~9 minutes)")
 
             self.geojson_score_usa_high.to_file(
-                filename=self.SCORE_HIGH_GEOJSON,
+                filename=first_path,
                 driver="GeoJSON",
             )
+            for path in other_paths:
+                shutil.copyfile(first_path, path)
             logger.info("Completed writing usa-high")
 
-        def write_low_to_file():
-            logger.info("Writing usa-low (~9 minutes)")
-            self.geojson_score_usa_low.to_file(
-                filename=self.SCORE_LOW_GEOJSON, driver="GeoJSON"
+        def write_low_to_file(layer: GeoScoreLayer):
+            path = self._get_geojson_path(layer) / layer.low_geojson_file_name
+            logger.info(f"Writing {path.name} (~9 minutes)")
+            self.geojson_score_usa_low[layer.name].to_file(
+                filename=path, driver="GeoJSON"
             )
-            logger.info("Completed writing usa-low")
+            logger.info(f"Completed writing {path.name}")
 
         def create_esri_codebook(codebook) -> pd.DataFrame:
             """temporary: helper to make a codebook for esri shapefile only"""
@@ -514,15 +608,16 @@ class GeoScoreETL(ExtractTransformLoad):
                     version_shapefile_codebook_zip_path, files_to_compress
                 )
 
+        tasks = [write_high_to_file] + [
+            lambda layer=layer: write_low_to_file(layer)
+            for layer in self.LAYERS
+            if layer.has_low_zoom
+        ]
+        if any(layer.write_shapefile for layer in self.LAYERS):
+            tasks.append(write_esri_shapefile)
+
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = {
-                executor.submit(task)
-                for task in [
-                    write_high_to_file,
-                    write_low_to_file,
-                    write_esri_shapefile,
-                ]
-            }
+            futures = {executor.submit(task) for task in tasks}
 
             for fut in concurrent.futures.as_completed(futures):
                 # Calling result will raise an exception if one occurred.
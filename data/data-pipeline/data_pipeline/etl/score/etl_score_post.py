@@ -211,10 +211,17 @@ class PostScoreETL(ExtractTransformLoad):
         score_df: pd.DataFrame,
     ) -> pd.DataFrame:
 
+        # The names of states and counties repeat over many tracts, so they
+        # are merged as categoricals
+        counties_df = counties_df[["GEOID", "County Name"]].astype(
+            {"County Name": "category"}
+        )
+        states_df = states_df.astype({field_names.STATE_FIELD: "category"})
+
         logger.debug("Merging county info with score info")
         score_county_merged = score_df.merge(
             # We drop state abbreviation so we don't get it twice
-            counties_df[["GEOID", "County Name"]],
+            counties_df,
             on="GEOID",  # GEOID is the county ID
             how="left",
         )
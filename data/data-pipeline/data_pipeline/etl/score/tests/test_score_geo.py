@@ -0,0 +1,87 @@
+# pylint: disable=W0212
+## Above disables warning about access to underscore-prefixed methods
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+from data_pipeline.etl.score import constants
+from data_pipeline.etl.score.etl_score_geo import GEO_SCORE_LAYERS
+from data_pipeline.etl.score.etl_score_geo import GeoScoreETL
+
+
+def _get_geo_score_etl(layers) -> GeoScoreETL:
+    """Builds a GeoScoreETL on a small grid of tracts: 200 in state 01, which
+    get aggregated at low zoom, and 5 in state 56, which are kept"""
+    geo_score_etl = GeoScoreETL(layers=layers)
+    tract_ids = [f"01{i:09d}" for i in range(200)] + [
+        f"56{i:09d}" for i in range(5)
+    ]
+    rng = np.random.default_rng(0)
+    score_columns = {
+        constants.TILES_SCORE_COLUMNS[layer.target_score_field]
+        for layer in layers
+    }
+    geo_score_etl.score_usa_df = pd.DataFrame(
+        {
+            geo_score_etl.TRACT_SHORT_FIELD: tract_ids,
+            **{
+                column: rng.integers(0, 5, len(tract_ids))
+                for column in score_columns
+            },
+        }
+    )
+    geo_score_etl.geojson_usa_df = gpd.GeoDataFrame(
+        {
+            geo_score_etl.GEOID_FIELD_NAME: tract_ids,
+            geo_score_etl.GEOMETRY_FIELD_NAME: [
+                box(i, 0, i + 1, 1) for i in range(len(tract_ids))
+            ],
+        },
+        crs="EPSG:4326",
+    )
+    return geo_score_etl
+
+
+def test_transform_builds_each_layer_from_one_merge():
+    layers = [
+        GEO_SCORE_LAYERS["default"],
+        GEO_SCORE_LAYERS["add_burd"],
+        GEO_SCORE_LAYERS["custom_ind"],
+    ]
+    geo_score_etl = _get_geo_score_etl(layers)
+    geo_score_etl.transform()
+
+    assert len(geo_score_etl.geojson_score_usa_high) == 205
+    # custom_ind has no low zoom GeoJSON
+    assert set(geo_score_etl.geojson_score_usa_low) == {"default", "add_burd"}
+    for layer_name, score_field in [("default", "SCORE"), ("add_burd", "CC")]:
+        low = geo_score_etl.geojson_score_usa_low[layer_name]
+        assert list(low.columns) == [score_field, "geometry"]
+        # The 5 tracts of the small state are kept as they are
+        assert len(low) > 5
+        assert (low.geometry.geom_type == "Polygon").all()
+
+
+def test_load_writes_high_once_per_layer(tmp_path, monkeypatch):
+    layers = [GEO_SCORE_LAYERS["gistar_burd"], GEO_SCORE_LAYERS["custom_burd"]]
+    geo_score_etl = _get_geo_score_etl(layers)
+    monkeypatch.setattr(geo_score_etl, "DATA_PATH", tmp_path)
+    geo_score_etl.transform()
+    geo_score_etl.load()
+
+    high_paths = [
+        tmp_path / "score" / layer.geojson_path / layer.high_geojson_file_name
+        for layer in layers
+    ]
+    assert high_paths[0].read_bytes() == high_paths[1].read_bytes()
+    assert (
+        tmp_path / "score" / "geojson" / "gistar" / "burd"
+    ).joinpath("usa-low-gistar-burd.json").exists()
+    assert not (tmp_path / "score" / "shapefile").exists()
+
+
+def test_cli_layer_names_match_layers():
+    from data_pipeline.application import GEO_SCORE_LAYER_NAMES
+
+    assert GEO_SCORE_LAYER_NAMES == list(GEO_SCORE_LAYERS)
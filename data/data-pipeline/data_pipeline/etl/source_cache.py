@@ -0,0 +1,289 @@
+"""Cache of the data sources downloaded by the ETLs.
+
+Every downloaded file is kept once in a content-addressed store, named after
+its sha256, so that datasets fetching the same URL or the same content share
+it. Each dataset's sources directory has a manifest recording, for each of its
+data sources, the URL, size, sha256 and HTTP validators (ETag and
+Last-Modified) of the file it was fetched from. This lets each source be
+checked and revalidated on its own, so only the sources that changed are
+downloaded again.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+import typing
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from data_pipeline.etl.downloader import Downloader
+from data_pipeline.etl.fingerprint import list_files
+from data_pipeline.utils import get_module_logger
+
+logger = get_module_logger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def _write_json(path: Path, content: dict) -> None:
+    """Writes a JSON file atomically, as it can be read by other workers"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f"{path.name}.{uuid.uuid4()}.part")
+    with open(partial_path, "w", encoding="utf-8") as file:
+        json.dump(content, file, indent=2, sort_keys=True)
+    os.replace(partial_path, path)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Makes a file available at destination, sharing its content with the
+    source through a hard link where the file system allows it"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+_url_locks: typing.Dict[str, threading.Lock] = {}
+_url_locks_lock = threading.Lock()
+
+
+class SourceStore:
+    """The content-addressed store of the downloaded files.
+
+    Files are stored under `objects/` by sha256. The details of the last
+    download of each URL are stored under `urls/`, one file per URL, so that
+    datasets running on other threads or processes can update them at the
+    same time.
+
+    Downloads in progress are kept under `tmp/`, one per URL, so that a
+    download that breaks is resumed by the next fetch of the URL.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @staticmethod
+    def _get_url_hash(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    @contextlib.contextmanager
+    def _lock_url(self, url: str):
+        """Makes sure a URL is only downloaded by one thread or process at a
+        time, as they would share the partial download"""
+        url_hash = self._get_url_hash(url)
+        with _url_locks_lock:
+            lock = _url_locks.setdefault(url_hash, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            lock_path = self.path / "tmp" / f"{url_hash}.lock"
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "w", encoding="utf-8") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_object_path(self, sha256: str) -> Path:
+        return self.path / "objects" / sha256[:2] / sha256
+
+    def _get_url_record_path(self, url: str) -> Path:
+        return self.path / "urls" / f"{self._get_url_hash(url)}.json"
+
+    def get_url_record(self, url: str) -> typing.Optional[dict]:
+        """Returns the details of the last download of a URL, if its content is
+        still in the store"""
+        path = self._get_url_record_path(url)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as file:
+            record = json.load(file)
+        object_path = self.get_object_path(record["sha256"])
+        if (
+            not object_path.exists()
+            or object_path.stat().st_size != record["size"]
+        ):
+            return None
+        return record
+
+    def fetch(
+        self,
+        url: str,
+        verify: bool = True,
+        expected_sha256: typing.Optional[str] = None,
+        revalidate: bool = True,
+    ) -> dict:
+        """Makes sure the content of a URL is in the store
+
+        Args:
+            url (str): the URL to fetch
+            verify (bool): whether to check the certificate of the host
+            expected_sha256 (str): the sha256 the content must have (optional)
+            revalidate (bool): whether to check with the host that content
+                downloaded earlier has not changed. Otherwise it is reused as is.
+
+        Returns:
+            dict: the URL, size, sha256, ETag and Last-Modified of the content
+        """
+        with self._lock_url(url):
+            return self._fetch(url, verify, expected_sha256, revalidate)
+
+    def _fetch(
+        self,
+        url: str,
+        verify: bool,
+        expected_sha256: typing.Optional[str],
+        revalidate: bool,
+    ) -> dict:
+        record = self.get_url_record(url)
+        if record is not None and (
+            expected_sha256 is not None
+            and record["sha256"] != expected_sha256.lower()
+        ):
+            record = None
+        if record is not None and not revalidate:
+            logger.debug(f"Using the stored copy of {url}")
+            return record
+
+        download_path = self.path / "tmp" / self._get_url_hash(url)
+        try:
+            if record is not None and (
+                record["etag"] or record["last_modified"]
+            ):
+                downloaded = Downloader.download_file_if_modified(
+                    file_url=url,
+                    download_file_name=download_path,
+                    verify=verify,
+                    expected_sha256=expected_sha256,
+                    etag=record["etag"],
+                    last_modified=record["last_modified"],
+                )
+                if downloaded is None:
+                    logger.debug(f"{url} has not changed since it was stored")
+                    return record
+            else:
+                downloaded = Downloader.download_file_if_modified(
+                    file_url=url,
+                    download_file_name=download_path,
+                    verify=verify,
+                    expected_sha256=expected_sha256,
+                )
+            object_path = self.get_object_path(downloaded["sha256"])
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            # An identical file may have been stored by another dataset
+            os.replace(download_path, object_path)
+        finally:
+            download_path.unlink(missing_ok=True)
+
+        record = {"url": url, **downloaded}
+        _write_json(self._get_url_record_path(url), record)
+        return record
+
+
+class SourceManifest:
+    """The manifest of the data sources of one dataset, in its sources
+    directory.
+
+    Each entry describes how one data source was fetched (`url`, `size`,
+    `sha256`, `etag`, `last_modified`) and the files it produced in the
+    sources directory, with their sizes, so that a half-finished or damaged
+    source is noticed.
+    """
+
+    def __init__(self, sources_path: Path):
+        self.sources_path = sources_path
+        self.path = sources_path / MANIFEST_FILE_NAME
+        self.entries: typing.Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    self.entries = json.load(file)
+            except ValueError:
+                logger.warning(
+                    f"Ignoring unreadable source manifest `{self.path}`"
+                )
+
+    def get_key(self, data_source) -> str:
+        destination = self._get_relative_path(data_source.destination)
+        return f"{data_source.source}|{destination}"
+
+    def get(self, data_source) -> typing.Optional[dict]:
+        return self.entries.get(self.get_key(data_source))
+
+    def _get_relative_path(self, path: Path) -> str:
+        try:
+            return str(Path(path).relative_to(self.sources_path))
+        except ValueError:
+            return str(path)
+
+    def _get_absolute_path(self, path: str) -> Path:
+        return (
+            Path(path) if Path(path).is_absolute() else self.sources_path / path
+        )
+
+    def is_intact(self, data_source) -> bool:
+        """Checks that a data source was fetched completely and that the files
+        it produced are still there, with the same sizes"""
+        entry = self.get(data_source)
+        if entry is None or not entry["files"]:
+            return False
+        for path, size in entry["files"].items():
+            path = self._get_absolute_path(path)
+            if not path.is_file() or path.stat().st_size != size:
+                return False
+        return True
+
+    def record(
+        self,
+        data_source,
+        outputs: typing.List[Path],
+        download: typing.Optional[dict] = None,
+    ) -> None:
+        """Records that a data source has been fetched
+
+        Args:
+            data_source (DataSource): the data source
+            outputs (list): the files and directories it produced
+            download (dict): the details of the file it was fetched from, as
+                returned by `SourceStore.fetch` (optional)
+        """
+        files = {}
+        for output in outputs:
+            if not output.exists():
+                continue
+            for file in list_files(output):
+                files[self._get_relative_path(file)] = file.stat().st_size
+        self.entries[self.get_key(data_source)] = {
+            "url": data_source.source,
+            "destination": self._get_relative_path(data_source.destination),
+            "size": download["size"] if download else None,
+            "sha256": download["sha256"] if download else None,
+            "etag": download["etag"] if download else None,
+            "last_modified": download["last_modified"] if download else None,
+            "files": files,
+        }
+
+    def forget(self, data_source) -> None:
+        self.entries.pop(self.get_key(data_source), None)
+
+    def retain(self, data_sources) -> None:
+        """Drops the entries of data sources the dataset no longer has"""
+        keys = {self.get_key(data_source) for data_source in data_sources}
+        self.entries = {
+            key: entry for key, entry in self.entries.items() if key in keys
+        }
+
+    def save(self) -> None:
+        _write_json(self.path, self.entries)
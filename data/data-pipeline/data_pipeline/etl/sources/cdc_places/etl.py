@@ -59,33 +59,42 @@ class CDCPlacesETL(ExtractTransformLoad):
             )
         ]
 
-    def extract(self, use_cached_data_sources: bool = False) -> None:
-
-        super().extract(
-            use_cached_data_sources
-        )  # download and extract data sources
-
-        self.df = pd.read_csv(
-            filepath_or_buffer=self.places_source,
-            dtype={self.CDC_GEOID_FIELD_NAME: "string"},
-            low_memory=False,
-        )
-
-    def transform(self) -> None:
-
-        # Rename GEOID field
-        self.df.rename(
+    def _pivot_measures(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Makes one column of each measure, with one row per tract"""
+        df = df.rename(
             columns={self.CDC_GEOID_FIELD_NAME: self.GEOID_TRACT_FIELD_NAME},
-            inplace=True,
             errors="raise",
         )
-        # Note: Puerto Rico not included.
-        self.df = self.df.pivot(
+        return df.pivot(
             index=self.GEOID_TRACT_FIELD_NAME,
             columns=self.CDC_MEASURE_FIELD_NAME,
             values=self.CDC_VALUE_FIELD_NAME,
         )
 
+    @staticmethod
+    def _combine_tract_measures(df: pd.DataFrame) -> pd.DataFrame:
+        """Combines the rows of tracts whose measures were read in different
+        chunks"""
+        df = df.groupby(level=0).first()
+        return df[sorted(df.columns)]
+
+    def transform(self) -> None:
+        # The source has a row per tract and measure, for many more measures
+        # than are used, so it is read and pivoted in chunks.
+        # Note: Puerto Rico not included.
+        self.df = self.transform_chunks(
+            self.read_raw_csv_chunks(
+                self.places_source,
+                columns={
+                    self.CDC_GEOID_FIELD_NAME: "string",
+                    self.CDC_MEASURE_FIELD_NAME: "string",
+                    self.CDC_VALUE_FIELD_NAME: "float64",
+                },
+            ),
+            transform_chunk=self._pivot_measures,
+            reduce=self._combine_tract_measures,
+        )
+
         # rename columns to be used in score
         rename_fields = {
             "Current asthma among adults aged >=18 years": field_names.ASTHMA_FIELD,
@@ -6,6 +6,7 @@ from data_pipeline.etl.datasource import FileDataSource
 from data_pipeline.score import field_names
 from data_pipeline.utils import get_module_logger
 from data_pipeline.config import settings
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -115,10 +116,9 @@ class CDCSVIIndex(ExtractTransformLoad):
             >= self.CDC_RPL_THEMES_THRESHOLD
         )
         expected_census_tract_field_length = 11
-        self.df[self.GEOID_TRACT_FIELD_NAME] = (
-            self.df[self.GEOID_TRACT_FIELD_NAME]
-            .astype(str)
-            .apply(lambda x: x.zfill(expected_census_tract_field_length))
+        self.df[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
+            self.df[self.GEOID_TRACT_FIELD_NAME],
+            length=expected_census_tract_field_length,
         )
 
         if len(self.df[self.GEOID_TRACT_FIELD_NAME].str.len().unique()) != 1:
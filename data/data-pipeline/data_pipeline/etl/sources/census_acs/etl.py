@@ -13,6 +13,7 @@ from data_pipeline.utils import get_module_logger
 from data_pipeline.utils import unzip_file_from_url
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import CensusDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -23,6 +24,8 @@ CENSUS_DATA_S3_URL = settings.AWS_JUSTICE40_DATASOURCES_URL + "/census.zip"
 
 class CensusACSETL(ExtractTransformLoad):
     NAME = "census_acs"
+    # Reads the census tract GeoJSON to impute income from neighbors
+    DEPENDENCIES = ["census"]
     ACS_YEAR = 2019
     MINIMUM_POPULATION_REQUIRED_FOR_IMPUTATION = 1
     ImputeVariables = namedtuple(
@@ -474,9 +477,7 @@ class CensusACSETL(ExtractTransformLoad):
         state_code_field: str = "STATEFP10",
         county_code_field: str = "COUNTYFP10",
     ) -> gpd.GeoDataFrame:
-        usa_geo_df[geoid_field] = (
-            usa_geo_df[geoid_field].astype(str).str.zfill(11)
-        )
+        usa_geo_df[geoid_field] = normalize_tract_ids(usa_geo_df[geoid_field])
         return gpd.GeoDataFrame(
             df.merge(
                 usa_geo_df[
@@ -1,21 +1,164 @@
+import concurrent.futures
+import contextlib
+import hashlib
+import json
 import os
+import re
+import uuid
+import zipfile
 from pathlib import Path
+from pathlib import PurePosixPath
+from typing import IO
+from typing import Callable
+from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 
-import censusdata
 import pandas as pd
+from data_pipeline.config import settings
+from data_pipeline.etl.downloader import MAX_CONNECTIONS_PER_HOST
+from data_pipeline.etl.downloader import Downloader
+from data_pipeline.etl.downloader import get_session
+from data_pipeline.etl.downloader import host_limiter
 from data_pipeline.etl.sources.census.etl_utils import get_state_fips_codes
 from data_pipeline.utils import get_module_logger
+from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = get_module_logger(__name__)
 
 CENSUS_ACS_FIPS_CODES_TO_SKIP = ["60", "66", "69", "78"]
 
+CENSUS_API_URL = "https://api.census.gov/data"
 
-def _fips_from_censusdata_censusgeo(censusgeo: censusdata.censusgeo) -> str:
-    """Create a FIPS code from the proprietary censusgeo index."""
-    fips = "".join([value for (key, value) in censusgeo.params()])
-    return fips
+# The Census API returns at most 50 variables per request, NAME included
+CENSUS_API_MAX_VARIABLES = 49
+
+CENSUS_GEO_FIELDS = ["state", "county", "tract"]
+
+# A local directory or zip archive of ACS summary files. When set, the ACS ETLs
+# read the ACS from it instead of requesting the Census API.
+CENSUS_ACS_SUMMARY_FILE_PATH = (
+    Path(settings.CENSUS_ACS_SUMMARY_FILE_PATH)
+    if "CENSUS_ACS_SUMMARY_FILE_PATH" in settings
+    else None
+)
+
+# The summary level of each geographic level, by the name of the level in the
+# Census API. The GEO_ID of a geography starts with its summary level and, for
+# the whole of the geography, the geographic component 00. In the table-based
+# summary files (from 2021 onwards) a variant comes in between, e.g. M6 in
+# 310M600US12060 for the 2020 delineations of metropolitan areas.
+CENSUS_ACS_SUMMARY_LEVELS = {
+    "state": "040",
+    "metropolitan statistical area/micropolitan statistical area": "310",
+    "tract": "140",
+}
+
+# The columns of the LOGRECNO and GEOID fields in the geography files of the
+# sequence-based summary files, and of LOGRECNO in their data files
+_CENSUS_ACS_GEO_FILE_COLUMNS = [4, 48]
+_CENSUS_ACS_SEQUENCE_FILE_LOGRECNO_COLUMN = 5
+
+# A variable of a detailed table, e.g. B19013_001E, the estimate of line 1 of
+# table B19013. Its column in the summary file of the table is B19013_E001.
+_CENSUS_ACS_VARIABLE_PATTERN = re.compile(
+    r"^(?P<table>[BC]\d{5}[A-Z]*)_(?P<line>\d{3})(?P<type>[EM])$"
+)
+
+
+def _get_census_api_cache_file(
+    cache_path: Path,
+    acs_year: int,
+    acs_type: str,
+    fips: str,
+    variables: List[str],
+) -> Path:
+    """Returns the cache file of one request. The responses are cached by year,
+    table and state, and by batch of variables within them."""
+    variables_hash = hashlib.sha256(",".join(variables).encode()).hexdigest()
+    return (
+        cache_path
+        / str(acs_year)
+        / acs_type
+        / fips
+        / f"{variables_hash[:16]}.json"
+    )
+
+
+def _log_retry_failure(retry_state):
+    logger.warning(
+        f"Failure requesting the Census API for state/territory with FIPS code {retry_state.args[3]}. Will retry."
+    )
+
+
+@retry(
+    stop=stop_after_attempt(Downloader.num_retries),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+    before_sleep=_log_retry_failure,
+)
+def _request_census_api(
+    acs_year: int, acs_type: str, variables: List[str], fips: str
+) -> list:
+    """Requests a batch of variables for the tracts of a state from the
+    Census API, and returns the rows of the response, headers first"""
+    url = f"{CENSUS_API_URL}/{acs_year}/acs/{acs_type}"
+    params = {
+        "get": ",".join(["NAME"] + variables),
+        "for": "tract:*",
+        "in": f"state:{fips} county:*",
+    }
+    if os.environ.get("CENSUS_API_KEY"):
+        params["key"] = os.environ["CENSUS_API_KEY"]
+    timeout = (
+        settings.REQUEST_TIMEOUT
+        if "REQUEST_TIMEOUT" in settings
+        else settings.REQUESTS_DEFAULT_TIMOUT
+    )
+    with host_limiter.limit(url):
+        response = get_session().get(url, params=params, timeout=timeout)
+    try:
+        return response.json()
+    except ValueError as e:
+        raise ValueError(
+            f"Unexpected response (URL: {response.url}): {response.text}"
+        ) from e
+
+
+def _retrieve_census_acs_batch(
+    acs_year: int,
+    acs_type: str,
+    variables: List[str],
+    fips: str,
+    cache_path: Optional[Path],
+) -> pd.DataFrame:
+    """Retrieves a batch of variables for the tracts of a state, from the
+    cache if it was requested before"""
+    cache_file = None
+    if cache_path is not None:
+        cache_file = _get_census_api_cache_file(
+            cache_path, acs_year, acs_type, fips, variables
+        )
+    if cache_file is not None and cache_file.exists():
+        with open(cache_file, encoding="utf-8") as file:
+            rows = json.load(file)
+    else:
+        logger.debug(
+            f"Downloading {len(variables)} variables for state/territory with FIPS code {fips}"
+        )
+        rows = _request_census_api(acs_year, acs_type, variables, fips)
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            partial_file = cache_file.with_name(
+                f"{cache_file.name}.{uuid.uuid4()}.part"
+            )
+            with open(partial_file, "w", encoding="utf-8") as file:
+                json.dump(rows, file)
+            os.replace(partial_file, cache_file)
+
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    return df.set_index(CENSUS_GEO_FIELDS)[variables]
 
 
 # pylint: disable=too-many-arguments
@@ -25,44 +168,403 @@ def retrieve_census_acs_data(
     tract_output_field_name: str,
     data_path_for_fips_codes: Path,
     acs_type="acs5",
+    cache_path: Optional[Path] = None,
 ) -> pd.DataFrame:
-    """Retrieves and combines census ACS data for a given year."""
-    dfs = []
+    """Retrieves and combines census ACS data for a given year.
+
+    The tracts of each state are requested from the Census API concurrently,
+    in batches of at most `CENSUS_API_MAX_VARIABLES` variables. The downloader
+    limits how many requests are made to the API at once.
+
+    Args:
+        acs_year (int): the year of the ACS
+        variables (list): the variables to retrieve
+        tract_output_field_name (str): the name of the tract GEOID field
+        data_path_for_fips_codes (Path): the data path of the state FIPS codes
+        acs_type (str): the ACS dataset, e.g. "acs5"
+        cache_path (Path): the directory the API responses are cached in. A
+            published ACS doesn't change, so a cached response is always used
+            (optional, defaults to no cache)
+
+    Returns:
+        pd.DataFrame: a row per tract, with the variables and the tract GEOID
+    """
+    variables = list(dict.fromkeys(variables))
+    states = []
     for fips in get_state_fips_codes(data_path_for_fips_codes):
         if fips in CENSUS_ACS_FIPS_CODES_TO_SKIP:
             logger.debug(
                 f"Skipping download for state/territory with FIPS code {fips}"
             )
         else:
-            census_api_key = ""
-            if os.environ.get("CENSUS_API_KEY"):
-                census_api_key = "with API key"
-            logger.debug(
-                f"Downloading data for state/territory with FIPS code {fips} {census_api_key}"
+            states.append(fips)
+
+    census_api_key = ""
+    if os.environ.get("CENSUS_API_KEY"):
+        census_api_key = " with API key"
+    logger.debug(
+        f"Downloading data for {len(states)} states/territories{census_api_key}"
+    )
+
+    batches = [
+        variables[i : i + CENSUS_API_MAX_VARIABLES]
+        for i in range(0, len(variables), CENSUS_API_MAX_VARIABLES)
+    ]
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=MAX_CONNECTIONS_PER_HOST
+    ) as executor:
+        futures = {
+            (fips, i): executor.submit(
+                _retrieve_census_acs_batch,
+                acs_year,
+                acs_type,
+                batch,
+                fips,
+                cache_path,
             )
+            for fips in states
+            for i, batch in enumerate(batches)
+        }
+        dfs = []
+        try:
+            for fips in states:
+                try:
+                    dfs.append(
+                        pd.concat(
+                            [
+                                futures[(fips, i)].result()
+                                for i in range(len(batches))
+                            ],
+                            axis=1,
+                        )
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Could not download data for state/territory with FIPS code {fips} because {e}"
+                    )
+                    raise
+        except BaseException:
+            for fut in futures.values():
+                fut.cancel()
+            raise
 
-            try:
-                response = censusdata.download(
-                    src=acs_type,
-                    year=acs_year,
-                    geo=censusdata.censusgeo(
-                        [("state", fips), ("county", "*"), ("tract", "*")]
-                    ),
-                    var=variables,
-                    key=os.environ.get("CENSUS_API_KEY"),
-                )
-                dfs.append(response)
+    df = pd.concat(dfs).reset_index()
+    for variable in variables:
+        df[variable] = pd.to_numeric(df[variable], errors="ignore")
 
-            except ValueError as e:
-                logger.error(
-                    f"Could not download data for state/territory with FIPS code {fips} because {e}"
-                )
-                raise e
+    # The GEOID of a tract is its state, county and tract codes
+    df[tract_output_field_name] = df["state"] + df["county"] + df["tract"]
+
+    return df[variables + [tract_output_field_name]]
+
+
+def _get_census_acs_summary_file_columns(
+    variables: List[str],
+) -> Dict[str, Dict[str, str]]:
+    """Returns the summary file columns of variables, by table"""
+    columns: Dict[str, Dict[str, str]] = {}
+    unsupported_variables = []
+    for variable in variables:
+        match = _CENSUS_ACS_VARIABLE_PATTERN.match(variable)
+        if match is None:
+            unsupported_variables.append(variable)
+            continue
+        columns.setdefault(match["table"], {})[
+            f"{match['table']}_{match['type']}{match['line']}"
+        ] = variable
+    if unsupported_variables:
+        # Subject and data profile tables are not in the summary files
+        raise ValueError(
+            f"Variables not in the ACS summary files: {', '.join(unsupported_variables)}"
+        )
+    return columns
 
-    df = pd.concat(dfs)
 
-    df[tract_output_field_name] = df.index.to_series().apply(
-        func=_fips_from_censusdata_censusgeo
+def _get_census_acs_geo_id_pattern(
+    geo_level: str, table_based: bool
+) -> re.Pattern:
+    """Returns the pattern of the start of the GEO_IDs of a geographic level,
+    up to the code of the geography"""
+    variant = "[0-9A-Z]{2}" if table_based else ""
+    return re.compile(rf"^{CENSUS_ACS_SUMMARY_LEVELS[geo_level]}{variant}00US")
+
+
+def _select_census_acs_geo_ids(
+    geo_ids: pd.Series, geo_id_pattern: re.Pattern
+) -> pd.Series:
+    """Returns the codes of the geographies whose GEO_ID matches a pattern"""
+    geo_ids = geo_ids[geo_ids.str.match(geo_id_pattern)]
+    return geo_ids.str.replace(geo_id_pattern, "", regex=True)
+
+
+@contextlib.contextmanager
+def _open_census_acs_summary_files(
+    summary_file_path: Path,
+) -> Iterator[Tuple[List[PurePosixPath], Callable[[PurePosixPath], IO[bytes]]]]:
+    """Lists the files of a directory or zip archive of summary files, and
+    returns a function that opens them by their path within it"""
+    if zipfile.is_zipfile(summary_file_path):
+        with zipfile.ZipFile(summary_file_path, "r") as zip_ref:
+            yield (
+                [
+                    PurePosixPath(name)
+                    for name in zip_ref.namelist()
+                    if not name.endswith("/")
+                ],
+                lambda member: zip_ref.open(str(member)),
+            )
+    else:
+        yield (
+            [
+                PurePosixPath(path.relative_to(summary_file_path).as_posix())
+                for path in summary_file_path.rglob("*")
+                if path.is_file()
+            ],
+            lambda member: open(summary_file_path / member, "rb"),
+        )
+
+
+def _read_census_acs_table_based_summary_files(
+    file_name_prefix: str,
+    columns_by_table: Dict[str, Dict[str, str]],
+    geo_id_pattern: re.Pattern,
+    members: List[PurePosixPath],
+    open_member: Callable[[PurePosixPath], IO[bytes]],
+) -> pd.DataFrame:
+    """Reads variables from the summary file of each table, e.g.
+    acsdt5y2021-b19013.dat, and joins the tables on the geographies"""
+    dfs = []
+    for table, columns in columns_by_table.items():
+        file_name = f"{file_name_prefix}{table.lower()}.dat"
+        paths = [member for member in members if member.name == file_name]
+        if not paths:
+            raise FileNotFoundError(f"{file_name} not found")
+        logger.debug(f"Reading {len(columns)} variables from {file_name}")
+        with open_member(paths[0]) as file:
+            df = pd.read_csv(
+                file,
+                sep="|",
+                usecols=["GEO_ID"] + list(columns),
+                dtype=str,
+            )
+        df.index = df.pop("GEO_ID")
+        geo_ids = _select_census_acs_geo_ids(
+            df.index.to_series(), geo_id_pattern
+        )
+        if geo_ids.empty:
+            raise ValueError(
+                f"No {geo_id_pattern.pattern} GEO_IDs in {file_name}"
+            )
+        df = df.loc[geo_ids.index].set_axis(geo_ids.values)
+        dfs.append(df.rename(columns=columns))
+    return pd.concat(dfs, axis=1)
+
+
+def _read_census_acs_sequence_lookup(
+    file: IO[bytes],
+) -> Dict[str, Tuple[int, int]]:
+    """Returns the sequence number and start position of each table, from the
+    sequence/table number lookup file of the sequence-based summary files"""
+    lookup = pd.read_csv(
+        file, usecols=[1, 2, 3, 4], dtype=str, encoding="latin-1"
     )
+    lookup.columns = ["table", "sequence", "line", "position"]
+    lookup = lookup.apply(lambda column: column.str.strip())
+    # Each table has a row without a line number, with the position of its
+    # first cell in its sequence files, counting from 1
+    starts = lookup[lookup["line"].isna() & lookup["position"].notna()]
+    return {
+        row.table: (int(row.sequence), int(row.position))
+        for row in starts.itertuples()
+    }
+
+
+def _read_census_acs_sequence_based_summary_files(
+    acs_year: int,
+    acs_type: str,
+    columns_by_table: Dict[str, Dict[str, str]],
+    geo_id_pattern: re.Pattern,
+    members: List[PurePosixPath],
+    open_member: Callable[[PurePosixPath], IO[bytes]],
+) -> pd.DataFrame:
+    """Reads variables from the sequence-based summary files of each state,
+    e.g. e20195al0001000.txt for the estimates of sequence 1 in Alabama, which
+    list the geographies by logical record number in g20195al.csv"""
+    geo_file_pattern = re.compile(
+        rf"^g{acs_year}{acs_type[-1]}(?P<state>[a-z]{{2}})\.csv$"
+    )
+    geo_files = [
+        (member, match["state"])
+        for member in members
+        if (match := geo_file_pattern.match(member.name))
+    ]
+    lookup_files = [
+        member
+        for member in members
+        if re.match(r"^.*seq.*table.*lookup.*\.(txt|csv)$", member.name.lower())
+    ]
+    if not geo_files or not lookup_files:
+        raise FileNotFoundError(
+            f"No {acs_year} {acs_type} summary files or sequence/table number "
+            "lookup file found"
+        )
+
+    # The lookup file of the year is the nearest one up the directories of
+    # its geography files
+    geo_file_dir = geo_files[0][0].parent
+    lookup_files = [
+        member
+        for member in lookup_files
+        if member.parent == geo_file_dir
+        or member.parent in geo_file_dir.parents
+    ] or lookup_files
+    with open_member(max(lookup_files, key=lambda m: len(m.parts))) as file:
+        table_starts = _read_census_acs_sequence_lookup(file)
+
+    # The variables in each sequence file, by their column in the file, for
+    # the estimate (e) and margin of error (m) files
+    sequence_columns: Dict[Tuple[str, int], Dict[int, str]] = {}
+    for table, columns in columns_by_table.items():
+        if table not in table_starts:
+            raise ValueError(
+                f"Table {table} not in the {acs_year} summary files"
+            )
+        sequence, start = table_starts[table]
+        for column, variable in columns.items():
+            cell = column.split("_")[1]
+            sequence_columns.setdefault((cell[0].lower(), sequence), {})[
+                start + int(cell[1:]) - 2
+            ] = variable
+
+    dfs = []
+    for geo_file, state in geo_files:
+        with open_member(geo_file) as file:
+            geo_ids = pd.read_csv(
+                file,
+                header=None,
+                usecols=_CENSUS_ACS_GEO_FILE_COLUMNS,
+                dtype=str,
+                encoding="latin-1",
+            ).set_index(_CENSUS_ACS_GEO_FILE_COLUMNS[0])[
+                _CENSUS_ACS_GEO_FILE_COLUMNS[1]
+            ]
+        geo_ids = _select_census_acs_geo_ids(geo_ids, geo_id_pattern)
+        if geo_ids.empty:
+            continue
+
+        logger.debug(
+            f"Reading {len(sequence_columns)} sequence files from {geo_file.parent}"
+        )
+        state_dfs = []
+        for (file_type, sequence), columns in sequence_columns.items():
+            file_name = (
+                f"{file_type}{acs_year}{acs_type[-1]}{state}{sequence:04d}000.txt"
+            )
+            with open_member(geo_file.parent / file_name) as file:
+                df = pd.read_csv(
+                    file,
+                    header=None,
+                    usecols=[_CENSUS_ACS_SEQUENCE_FILE_LOGRECNO_COLUMN]
+                    + list(columns),
+                    dtype=str,
+                    encoding="latin-1",
+                    na_values=["."],
+                    keep_default_na=False,
+                )
+            df = df.set_index(_CENSUS_ACS_SEQUENCE_FILE_LOGRECNO_COLUMN)
+            state_dfs.append(df.rename(columns=columns).reindex(geo_ids.index))
+        dfs.append(pd.concat(state_dfs, axis=1).set_axis(geo_ids.values))
 
-    return df
+    if not dfs:
+        raise ValueError(
+            f"No {geo_id_pattern.pattern} GEO_IDs in the {acs_year} geography files"
+        )
+    return pd.concat(dfs)
+
+
+def read_census_acs_summary_file(
+    acs_year: int,
+    variables: List[str],
+    summary_file_path: Path,
+    acs_type: str = "acs5",
+    geo_level: str = "tract",
+) -> pd.DataFrame:
+    """Reads ACS variables for every geography of a level from the summary
+    files of the ACS.
+
+    Both layouts of the summary files are read: the table-based one published
+    from the 2021 ACS onwards (e.g. `acsdt5y2021-b19013.dat`), and the
+    sequence-based one of earlier years (e.g. `e20195al0001000.txt`, with the
+    `g20195al.csv` geography files and the sequence/table number lookup file).
+    Only the columns of the variables are parsed, and the tables are joined on
+    the geographies.
+
+    Args:
+        acs_year (int): the year of the ACS
+        variables (list): the variables to read, from detailed (B and C) tables
+        summary_file_path (Path): the directory or zip archive of the summary
+            files. It can hold the files of several years.
+        acs_type (str): the ACS dataset, "acs5" or "acs1"
+        geo_level (str): the geographic level, as named by the Census API
+
+    Returns:
+        pd.DataFrame: the variables, indexed by the code of each geography,
+        e.g. the GEOID of a tract
+
+    Raises:
+        FileNotFoundError: if the summary files of the year are missing
+        ValueError: if a variable isn't in the summary files, or no geography
+            of the level is
+    """
+    variables = list(dict.fromkeys(variables))
+    columns_by_table = _get_census_acs_summary_file_columns(variables)
+    table_based_file_name_prefix = f"acsdt{acs_type[-1]}y{acs_year}-"
+    with _open_census_acs_summary_files(summary_file_path) as (
+        members,
+        open_member,
+    ):
+        if any(
+            member.name.startswith(table_based_file_name_prefix)
+            for member in members
+        ):
+            df = _read_census_acs_table_based_summary_files(
+                table_based_file_name_prefix,
+                columns_by_table,
+                _get_census_acs_geo_id_pattern(geo_level, table_based=True),
+                members,
+                open_member,
+            )
+        else:
+            df = _read_census_acs_sequence_based_summary_files(
+                acs_year,
+                acs_type,
+                columns_by_table,
+                _get_census_acs_geo_id_pattern(geo_level, table_based=False),
+                members,
+                open_member,
+            )
+
+    df.index.name = geo_level
+    return df[variables]
+
+
+def read_census_acs_summary_file_tracts(
+    acs_year: int,
+    variables: List[str],
+    tract_output_field_name: str,
+    summary_file_path: Path,
+    acs_type: str = "acs5",
+) -> pd.DataFrame:
+    """Reads census ACS data for a given year from the ACS summary files, in
+    the same form as `retrieve_census_acs_data`"""
+    df = read_census_acs_summary_file(
+        acs_year=acs_year,
+        variables=variables,
+        summary_file_path=summary_file_path,
+        acs_type=acs_type,
+    )
+    df = df[~df.index.str.slice(0, 2).isin(CENSUS_ACS_FIPS_CODES_TO_SKIP)]
+    df = df.reset_index().rename(columns={"tract": tract_output_field_name})
+    for variable in df.columns.drop(tract_output_field_name):
+        df[variable] = pd.to_numeric(df[variable], errors="ignore")
+    return df[list(dict.fromkeys(variables)) + [tract_output_field_name]]
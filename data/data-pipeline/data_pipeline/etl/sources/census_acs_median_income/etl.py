@@ -11,6 +11,10 @@ from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
 from data_pipeline.etl.datasource import FileDataSource
+from data_pipeline.etl.datasource import CensusSummaryFileDataSource
+from data_pipeline.etl.sources.census_acs.etl_utils import (
+    CENSUS_ACS_SUMMARY_FILE_PATH,
+)
 
 logger = get_module_logger(__name__)
 
@@ -108,7 +112,7 @@ class CensusACSMedianIncomeETL(ExtractTransformLoad):
 
     def get_data_sources(self) -> [DataSource]:
 
-        return [
+        data_sources = [
             ZIPDataSource(
                 source=self.GEOCORR_ALL_STATES_URL,
                 destination=self.GEOCORR_ALL_STATES_PATH,
@@ -117,6 +121,27 @@ class CensusACSMedianIncomeETL(ExtractTransformLoad):
                 source=self.PUERTO_RICO_S3_LINK,
                 destination=self.PUERTO_RICO_ALL_STATES_SOURCE,
             ),
+        ]
+        if CENSUS_ACS_SUMMARY_FILE_PATH is not None:
+            # The median incomes are read from the ACS summary files, in the
+            # form of the Census API responses
+            return data_sources + [
+                CensusSummaryFileDataSource(
+                    source=str(CENSUS_ACS_SUMMARY_FILE_PATH),
+                    destination=destination,
+                    acs_year=self.ACS_YEAR,
+                    variables=["B19013_001E"],
+                    geo_level=geo_level,
+                )
+                for geo_level, destination in [
+                    (
+                        "metropolitan statistical area/micropolitan statistical area",
+                        self.MSA_MEDIAN_INCOME_SOURCE,
+                    ),
+                    ("state", self.STATE_MEDIAN_INCOME_SOURCE),
+                ]
+            ]
+        return data_sources + [
             FileDataSource(
                 source=self.MSA_MEDIAN_INCOME_URL,
                 destination=self.MSA_MEDIAN_INCOME_SOURCE,
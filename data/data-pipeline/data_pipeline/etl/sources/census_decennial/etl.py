@@ -27,6 +27,8 @@ logger = get_module_logger(__name__)
 
 class CensusDecennialETL(ExtractTransformLoad):
     DECENNIAL_YEAR = 2020
+    # Reads the census tract GeoJSON to impute income from neighbors
+    DEPENDENCIES = ["census"]
     OUTPUT_PATH = (
         ExtractTransformLoad.DATA_PATH
         / "dataset"
@@ -72,6 +72,7 @@ class ChildOpportunityIndex(ExtractTransformLoad):
         self.HEALTHY_FOOD_INPUT_FIELD = "HE_FOOD"
         self.IMPENETRABLE_SURFACES_INPUT_FIELD = "HE_GREEN"
         self.READING_INPUT_FIELD = "ED_READING"
+        self.YEAR_INPUT_FIELD = "year"
 
         self.raw_df: pd.DataFrame
         self.output_df: pd.DataFrame
@@ -90,14 +91,18 @@ class ChildOpportunityIndex(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        self.raw_df = pd.read_csv(
-            filepath_or_buffer=self.child_opportunity_index_source,
-            # The following need to remain as strings for all of their digits, not get
-            # converted to numbers.
-            dtype={
+        self.raw_df = self.read_raw_csv(
+            self.child_opportunity_index_source,
+            columns={
+                # The tract IDs need to remain as strings for all of their
+                # digits, not get converted to numbers.
                 self.TRACT_INPUT_COLUMN_NAME: "string",
+                self.YEAR_INPUT_FIELD: "int64",
+                self.EXTREME_HEAT_INPUT_FIELD: "float64",
+                self.HEALTHY_FOOD_INPUT_FIELD: "float64",
+                self.IMPENETRABLE_SURFACES_INPUT_FIELD: "float64",
+                self.READING_INPUT_FIELD: "float64",
             },
-            low_memory=False,
         )
 
     def transform(self) -> None:
@@ -117,7 +122,7 @@ class ChildOpportunityIndex(ExtractTransformLoad):
             raise ValueError("Wrong tract length.")
 
         # COI has two rows per tract: one for 2010 and one for 2015.
-        output_df = output_df[output_df["year"] == 2015]
+        output_df = output_df[output_df[self.YEAR_INPUT_FIELD] == 2015]
 
         # Convert percents from 0-100 to 0-1 to standardize with our other fields.
         percent_fields_to_convert = [
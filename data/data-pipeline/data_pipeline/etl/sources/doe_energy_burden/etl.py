@@ -7,6 +7,7 @@ from data_pipeline.etl.base import ValidGeoLevel
 from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -29,8 +30,11 @@ class DOEEnergyBurden(ExtractTransformLoad):
         )
 
         # input
-        self.doe_energy_burden_source = (
-            self.get_sources_path() / "DOE_LEAD_AMI_TRACT_2018_ALL.csv"
+        self.doe_energy_burden_file_name = "DOE_LEAD_AMI_TRACT_2018_ALL.csv"
+        self.doe_energy_burden_source = ZIPDataSource(
+            source=self.doe_energy_burden_url,
+            destination=self.get_sources_path(),
+            members=[self.doe_energy_burden_file_name],
         )
 
         # output
@@ -43,12 +47,7 @@ class DOEEnergyBurden(ExtractTransformLoad):
         self.output_df: pd.DataFrame
 
     def get_data_sources(self) -> [DataSource]:
-        return [
-            ZIPDataSource(
-                source=self.doe_energy_burden_url,
-                destination=self.get_sources_path(),
-            )
-        ]
+        return [self.doe_energy_burden_source]
 
     def extract(self, use_cached_data_sources: bool = False) -> None:
 
@@ -56,14 +55,17 @@ class DOEEnergyBurden(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        self.raw_df = pd.read_csv(
-            filepath_or_buffer=self.doe_energy_burden_source,
-            # The following need to remain as strings for all of their digits, not get converted to numbers.
-            dtype={
-                self.INPUT_GEOID_TRACT_FIELD_NAME: "string",
-            },
-            low_memory=False,
-        )
+        with self.doe_energy_burden_source.open_member(
+            self.doe_energy_burden_file_name
+        ) as file:
+            self.raw_df = pd.read_csv(
+                filepath_or_buffer=file,
+                # The following need to remain as strings for all of their digits, not get converted to numbers.
+                dtype={
+                    self.INPUT_GEOID_TRACT_FIELD_NAME: "string",
+                },
+                low_memory=False,
+            )
 
     def transform(self) -> None:
 
@@ -76,11 +78,8 @@ class DOEEnergyBurden(ExtractTransformLoad):
         )
 
         # Left-pad the tracts with 0s
-        expected_length_of_census_tract_field = 11
-        output_df[self.GEOID_TRACT_FIELD_NAME] = (
+        output_df[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
             output_df[self.GEOID_TRACT_FIELD_NAME]
-            .astype(str)
-            .apply(lambda x: x.zfill(expected_length_of_census_tract_field))
         )
 
         self.output_df = output_df
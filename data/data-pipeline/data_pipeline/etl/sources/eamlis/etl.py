@@ -24,6 +24,7 @@ class AbandonedMineETL(ExtractTransformLoad):
     GEO_LEVEL = ValidGeoLevel.CENSUS_TRACT
     AML_BOOLEAN: str
     LOAD_YAML_CONFIG: bool = True
+    DEPENDENCIES = ["census"]
 
     PUERTO_RICO_EXPECTED_IN_DATA = False
     EXPECTED_MISSING_STATES = [
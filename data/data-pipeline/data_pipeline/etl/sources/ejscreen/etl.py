@@ -22,8 +22,11 @@ class EJSCREENETL(ExtractTransformLoad):
         self.ejscreen_url = "https://gaftp.epa.gov/EJSCREEN/2021/EJSCREEN_2021_USPR_Tracts.csv.zip"
 
         # input
-        self.ejscreen_source = (
-            self.get_sources_path() / "EJSCREEN_2021_USPR_Tracts.csv"
+        self.ejscreen_file_name = "EJSCREEN_2021_USPR_Tracts.csv"
+        self.ejscreen_source = ZIPDataSource(
+            source=self.ejscreen_url,
+            destination=self.get_sources_path(),
+            members=[self.ejscreen_file_name],
         )
 
         # output
@@ -31,6 +34,26 @@ class EJSCREENETL(ExtractTransformLoad):
 
         self.df: pd.DataFrame
 
+        # The EJSCREEN fields used, with the names they are given
+        self.INPUT_FIELD_NAMES = {
+            "CANCER": field_names.AIR_TOXICS_CANCER_RISK_FIELD,
+            "RESP": field_names.RESPIRATORY_HAZARD_FIELD,
+            "DSLPM": field_names.DIESEL_FIELD,
+            "PM25": field_names.PM25_FIELD,
+            "OZONE": field_names.OZONE_FIELD,
+            "PTRAF": field_names.TRAFFIC_FIELD,
+            "PRMP": field_names.RMP_FIELD,
+            "PTSDF": field_names.TSDF_FIELD,
+            "PNPL": field_names.NPL_FIELD,
+            "PWDIS": field_names.WASTEWATER_FIELD,
+            "LINGISOPCT": field_names.HOUSEHOLDS_LINGUISTIC_ISO_FIELD,
+            "LOWINCPCT": field_names.POVERTY_FIELD,
+            "OVER64PCT": field_names.OVER_64_FIELD,
+            "UNDER5PCT": field_names.UNDER_5_FIELD,
+            "PRE1960PCT": field_names.LEAD_PAINT_FIELD,
+            "UST": field_names.UST_FIELD,  # added for 2021 update
+        }
+
         self.COLUMNS_TO_KEEP = [
             self.GEOID_TRACT_FIELD_NAME,
             # pylint: disable=duplicate-code
@@ -53,11 +76,7 @@ class EJSCREENETL(ExtractTransformLoad):
         ]
 
     def get_data_sources(self) -> [DataSource]:
-        return [
-            ZIPDataSource(
-                source=self.ejscreen_url, destination=self.get_sources_path()
-            )
-        ]
+        return [self.ejscreen_source]
 
     def extract(self, use_cached_data_sources: bool = False) -> None:
 
@@ -65,12 +84,15 @@ class EJSCREENETL(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        self.df = pd.read_csv(
+        self.df = self.read_raw_csv(
             self.ejscreen_source,
-            dtype={self.INPUT_GEOID_TRACT_FIELD_NAME: str},
+            member=self.ejscreen_file_name,
+            columns={
+                self.INPUT_GEOID_TRACT_FIELD_NAME: "string",
+                **{field: "float64" for field in self.INPUT_FIELD_NAMES},
+            },
             # EJSCREEN writes the word "None" for NA data.
             na_values=["None"],
-            low_memory=False,
         )
 
     def transform(self) -> None:
@@ -79,21 +101,6 @@ class EJSCREENETL(ExtractTransformLoad):
         self.output_df = self.df.rename(
             columns={
                 self.INPUT_GEOID_TRACT_FIELD_NAME: self.GEOID_TRACT_FIELD_NAME,
-                "CANCER": field_names.AIR_TOXICS_CANCER_RISK_FIELD,
-                "RESP": field_names.RESPIRATORY_HAZARD_FIELD,
-                "DSLPM": field_names.DIESEL_FIELD,
-                "PM25": field_names.PM25_FIELD,
-                "OZONE": field_names.OZONE_FIELD,
-                "PTRAF": field_names.TRAFFIC_FIELD,
-                "PRMP": field_names.RMP_FIELD,
-                "PTSDF": field_names.TSDF_FIELD,
-                "PNPL": field_names.NPL_FIELD,
-                "PWDIS": field_names.WASTEWATER_FIELD,
-                "LINGISOPCT": field_names.HOUSEHOLDS_LINGUISTIC_ISO_FIELD,
-                "LOWINCPCT": field_names.POVERTY_FIELD,
-                "OVER64PCT": field_names.OVER_64_FIELD,
-                "UNDER5PCT": field_names.UNDER_5_FIELD,
-                "PRE1960PCT": field_names.LEAD_PAINT_FIELD,
-                "UST": field_names.UST_FIELD,  # added for 2021 update
+                **self.INPUT_FIELD_NAMES,
             },
         )
@@ -7,6 +7,7 @@ from data_pipeline.utils import get_module_logger
 from data_pipeline.config import settings
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -155,10 +156,9 @@ class EPARiskScreeningEnvironmentalIndicatorsETL(ExtractTransformLoad):
         )
 
         expected_census_tract_field_length = 11
-        self.df[self.GEOID_TRACT_FIELD_NAME] = (
-            self.df[self.GEOID_TRACT_FIELD_NAME]
-            .astype(str)
-            .apply(lambda x: x.zfill(expected_census_tract_field_length))
+        self.df[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
+            self.df[self.GEOID_TRACT_FIELD_NAME],
+            length=expected_census_tract_field_length,
         )
 
         if len(self.df[self.GEOID_TRACT_FIELD_NAME].str.len().unique()) != 1:
@@ -7,6 +7,7 @@ from data_pipeline.etl.base import ValidGeoLevel
 from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -77,9 +78,9 @@ class FloodRiskETL(ExtractTransformLoad):
         - Calculates share of properties at risk, left-clipping number of properties at 250
         """
 
-        self.df_fsf_flood[self.GEOID_TRACT_FIELD_NAME] = self.df_fsf_flood[
-            self.INPUT_GEOID_TRACT_FIELD_NAME
-        ].str.zfill(11)
+        self.df_fsf_flood[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
+            self.df_fsf_flood[self.INPUT_GEOID_TRACT_FIELD_NAME]
+        )
 
         self.df_fsf_flood[self.COUNT_PROPERTIES] = self.df_fsf_flood[
             self.COUNT_PROPERTIES_NATIVE_FIELD_NAME
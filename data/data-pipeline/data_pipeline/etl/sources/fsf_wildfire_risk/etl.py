@@ -6,6 +6,7 @@ from data_pipeline.etl.base import ExtractTransformLoad
 from data_pipeline.etl.base import ValidGeoLevel
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 from data_pipeline.utils import get_module_logger
 
 logger = get_module_logger(__name__)
@@ -83,9 +84,9 @@ class WildfireRiskETL(ExtractTransformLoad):
         # read in the unzipped csv data source then rename the
         # Census Tract column for merging
 
-        self.df_fsf_fire[self.GEOID_TRACT_FIELD_NAME] = self.df_fsf_fire[
-            self.INPUT_GEOID_TRACT_FIELD_NAME
-        ].str.zfill(11)
+        self.df_fsf_fire[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
+            self.df_fsf_fire[self.INPUT_GEOID_TRACT_FIELD_NAME]
+        )
 
         self.df_fsf_fire[self.COUNT_PROPERTIES] = self.df_fsf_fire[
             self.COUNT_PROPERTIES_NATIVE_FIELD_NAME
@@ -5,6 +5,7 @@ from data_pipeline.etl.base import ValidGeoLevel
 from data_pipeline.utils import get_module_logger
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 
 logger = get_module_logger(__name__)
 
@@ -61,14 +62,14 @@ class HistoricRedliningETL(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        self.historic_redlining_data = pd.read_excel(self.hrs_source)
+        self.historic_redlining_data = self.read_raw_excel(self.hrs_source)
 
     def transform(self) -> None:
         # this is obviously temporary
 
-        self.historic_redlining_data[self.GEOID_TRACT_FIELD_NAME] = (
-            self.historic_redlining_data["GEOID10"].astype(str).str.zfill(11)
-        )
+        self.historic_redlining_data[
+            self.GEOID_TRACT_FIELD_NAME
+        ] = normalize_tract_ids(self.historic_redlining_data["GEOID10"])
         self.historic_redlining_data = self.historic_redlining_data.rename(
             columns={"HRS2010": self.REDLINING_SCALAR}
         )
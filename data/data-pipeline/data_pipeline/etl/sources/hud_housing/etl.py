@@ -14,6 +14,126 @@ class HudHousingETL(ExtractTransformLoad):
     NAME = "hud_housing"
     GEO_LEVEL: ValidGeoLevel = ValidGeoLevel.CENSUS_TRACT
 
+    # The fields of Table 3 used for the share of homes with no kitchen or
+    # indoor plumbing
+    NO_KITCHEN_OR_INDOOR_PLUMBING_FIELDS = [
+        "T3_est2",  # subtotal: owner-occupied for all levels of income
+        "T3_est3",  # owner-occupied lacking complete plumbing or kitchen facilities for all levels of income
+        "T3_est45",  # subtotal: renter-occupied for all levels of income
+        "T3_est46",  # subtotal: renter-occupied lacking complete plumbing or kitchen facilities for all levels of income
+    ]
+
+    # The fields of Table 8 used for housing burden
+    # See "CHAS data dictionary 12-16.xlsx"
+
+    # Owner occupied numerator fields
+    OWNER_OCCUPIED_NUMERATOR_FIELDS = [
+        "T8_est7",  # Owner, less than or equal to 30% of HAMFI, greater than 30% but less than or equal to 50%
+        "T8_est10",  # Owner, less than or equal to 30% of HAMFI, greater than 50%
+        "T8_est20",  # Owner, greater than 30% but less than or equal to 50% of HAMFI, greater than 30% but less than or equal to 50%
+        "T8_est23",  # Owner, greater than 30% but less than or equal to 50% of HAMFI, greater than 50%
+        "T8_est33",  # Owner, greater than 50% but less than or equal to 80% of HAMFI, greater than 30% but less than or equal to 50%
+        "T8_est36",  # Owner, greater than 50% but less than or equal to 80% of HAMFI, greater than 50%
+    ]
+
+    # These rows have the values where HAMFI was not computed, b/c of no or negative income.
+    # They are in the same order as the rows above
+    OWNER_OCCUPIED_NOT_COMPUTED_FIELDS = [
+        "T8_est13",
+        "T8_est26",
+        "T8_est39",
+        "T8_est52",
+        "T8_est65",
+    ]
+
+    # This represents all owner-occupied housing units
+    OWNER_OCCUPIED_POPULATION_FIELD = "T8_est2"
+
+    # Renter occupied numerator fields
+    RENTER_OCCUPIED_NUMERATOR_FIELDS = [
+        # Column Name
+        #   Line_Type
+        #   Tenure
+        #   Household income
+        #   Cost burden
+        #   Facilities
+        "T8_est73",
+        #   Subtotal
+        #   Renter occupied
+        #   less than or equal to 30% of HAMFI
+        #   greater than 30% but less than or equal to 50%
+        #   All
+        "T8_est76",
+        #   Subtotal
+        #   Renter occupied
+        #   less than or equal to 30% of HAMFI
+        #   greater than 50%
+        #   All
+        "T8_est86",
+        #   Subtotal
+        #   Renter occupied
+        #   greater than 30% but less than or equal to 50% of HAMFI
+        #   greater than 30% but less than or equal to 50%
+        #   All
+        "T8_est89",
+        #   Subtotal
+        #   Renter occupied
+        #   greater than 30% but less than or equal to 50% of HAMFI
+        #   greater than 50%
+        #   All
+        "T8_est99",
+        #   Subtotal
+        #   Renter occupied	greater than 50% but less than or equal to 80% of HAMFI
+        #   greater than 30% but less than or equal to 50%
+        #   All
+        "T8_est102",
+        #   Subtotal
+        #   Renter occupied
+        #   greater than 50% but less than or equal to 80% of HAMFI
+        #   greater than 50%
+        #   All
+    ]
+
+    # These rows have the values where HAMFI was not computed, b/c of no or negative income.
+    RENTER_OCCUPIED_NOT_COMPUTED_FIELDS = [
+        # Column Name
+        #   Line_Type
+        #   Tenure
+        #   Household income
+        #   Cost burden
+        #   Facilities
+        "T8_est79",
+        #   Subtotal
+        #   Renter occupied	less than or equal to 30% of HAMFI
+        #   not computed (no/negative income)
+        #   All
+        "T8_est92",
+        #   Subtotal
+        #   Renter occupied	greater than 30% but less than or equal to 50% of HAMFI
+        #   not computed (no/negative income)
+        #   All
+        "T8_est105",
+        #   Subtotal
+        #   Renter occupied
+        #   greater than 50% but less than or equal to 80% of HAMFI
+        #   not computed (no/negative income)
+        #   All
+        "T8_est118",
+        #   Subtotal
+        #   Renter occupied	greater than 80% but less than or equal to 100% of HAMFI
+        #   not computed (no/negative income)
+        #   All
+        "T8_est131",
+        #   Subtotal
+        #   Renter occupied
+        #   greater than 100% of HAMFI
+        #   not computed (no/negative income)
+        #   All
+    ]
+
+    # T8_est68	Subtotal	Renter occupied	All	All	All
+    RENTER_OCCUPIED_POPULATION_FIELD = "T8_est68"
+
     def __init__(self):
 
         # fetch
@@ -26,6 +146,11 @@ class HudHousingETL(ExtractTransformLoad):
             self.housing_url = "https://www.huduser.gov/portal/datasets/cp/2014thru2018-140-csv.zip"
 
         # source
+        self.housing_source = ZIPDataSource(
+            source=self.housing_url,
+            destination=self.get_sources_path(),
+            members=["140/Table8.csv", "140/Table3.csv"],
+        )
 
         # output
 
@@ -65,17 +190,18 @@ class HudHousingETL(ExtractTransformLoad):
         self.df: pd.DataFrame
 
     def get_data_sources(self) -> [DataSource]:
-        return [
-            ZIPDataSource(
-                source=self.housing_url, destination=self.get_sources_path()
-            )
-        ]
-
-    def _read_chas_table(self, file_name):
-
-        tmp_csv_file_path = self.get_sources_path() / "140" / file_name
-        tmp_df = pd.read_csv(
-            filepath_or_buffer=tmp_csv_file_path,
+        return [self.housing_source]
+
+    def _read_chas_table(self, file_name, fields):
+
+        tmp_df = self.read_raw_csv(
+            self.housing_source,
+            member=f"140/{file_name}",
+            # The counts are inferred, as int64 unless values are missing
+            columns={
+                "geoid": "string",
+                **{field: None for field in fields},
+            },
             encoding="latin-1",
         )
 
@@ -94,8 +220,18 @@ class HudHousingETL(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        table_8 = self._read_chas_table("Table8.csv")
-        table_3 = self._read_chas_table("Table3.csv")
+        table_8 = self._read_chas_table(
+            "Table8.csv",
+            self.OWNER_OCCUPIED_NUMERATOR_FIELDS
+            + self.OWNER_OCCUPIED_NOT_COMPUTED_FIELDS
+            + [self.OWNER_OCCUPIED_POPULATION_FIELD]
+            + self.RENTER_OCCUPIED_NUMERATOR_FIELDS
+            + self.RENTER_OCCUPIED_NOT_COMPUTED_FIELDS
+            + [self.RENTER_OCCUPIED_POPULATION_FIELD],
+        )
+        table_3 = self._read_chas_table(
+            "Table3.csv", self.NO_KITCHEN_OR_INDOOR_PLUMBING_FIELDS
+        )
 
         self.df = table_8.merge(
             table_3, how="outer", on=self.GEOID_TRACT_FIELD_NAME
@@ -120,116 +256,6 @@ class HudHousingETL(ExtractTransformLoad):
         ) / (self.df["T3_est2"] + self.df["T3_est45"])
 
         # Calculate housing burden
-        # See "CHAS data dictionary 12-16.xlsx"
-
-        # Owner occupied numerator fields
-        OWNER_OCCUPIED_NUMERATOR_FIELDS = [
-            "T8_est7",  # Owner, less than or equal to 30% of HAMFI, greater than 30% but less than or equal to 50%
-            "T8_est10",  # Owner, less than or equal to 30% of HAMFI, greater than 50%
-            "T8_est20",  # Owner, greater than 30% but less than or equal to 50% of HAMFI, greater than 30% but less than or equal to 50%
-            "T8_est23",  # Owner, greater than 30% but less than or equal to 50% of HAMFI, greater than 50%
-            "T8_est33",  # Owner, greater than 50% but less than or equal to 80% of HAMFI, greater than 30% but less than or equal to 50%
-            "T8_est36",  # Owner, greater than 50% but less than or equal to 80% of HAMFI, greater than 50%
-        ]
-
-        # These rows have the values where HAMFI was not computed, b/c of no or negative income.
-        # They are in the same order as the rows above
-        OWNER_OCCUPIED_NOT_COMPUTED_FIELDS = [
-            "T8_est13",
-            "T8_est26",
-            "T8_est39",
-            "T8_est52",
-            "T8_est65",
-        ]
-
-        # This represents all owner-occupied housing units
-        OWNER_OCCUPIED_POPULATION_FIELD = "T8_est2"
-
-        # Renter occupied numerator fields
-        RENTER_OCCUPIED_NUMERATOR_FIELDS = [
-            # Column Name
-            #   Line_Type
-            #   Tenure
-            #   Household income
-            #   Cost burden
-            #   Facilities
-            "T8_est73",
-            #   Subtotal
-            #   Renter occupied
-            #   less than or equal to 30% of HAMFI
-            #   greater than 30% but less than or equal to 50%
-            #   All
-            "T8_est76",
-            #   Subtotal
-            #   Renter occupied
-            #   less than or equal to 30% of HAMFI
-            #   greater than 50%
-            #   All
-            "T8_est86",
-            #   Subtotal
-            #   Renter occupied
-            #   greater than 30% but less than or equal to 50% of HAMFI
-            #   greater than 30% but less than or equal to 50%
-            #   All
-            "T8_est89",
-            #   Subtotal
-            #   Renter occupied
-            #   greater than 30% but less than or equal to 50% of HAMFI
-            #   greater than 50%
-            #   All
-            "T8_est99",
-            #   Subtotal
-            #   Renter occupied	greater than 50% but less than or equal to 80% of HAMFI
-            #   greater than 30% but less than or equal to 50%
-            #   All
-            "T8_est102",
-            #   Subtotal
-            #   Renter occupied
-            #   greater than 50% but less than or equal to 80% of HAMFI
-            #   greater than 50%
-            #   All
-        ]
-
-        # These rows have the values where HAMFI was not computed, b/c of no or negative income.
-        RENTER_OCCUPIED_NOT_COMPUTED_FIELDS = [
-            # Column Name
-            #   Line_Type
-            #   Tenure
-            #   Household income
-            #   Cost burden
-            #   Facilities
-            "T8_est79",
-            #   Subtotal
-            #   Renter occupied	less than or equal to 30% of HAMFI
-            #   not computed (no/negative income)
-            #   All
-            "T8_est92",
-            #   Subtotal
-            #   Renter occupied	greater than 30% but less than or equal to 50% of HAMFI
-            #   not computed (no/negative income)
-            #   All
-            "T8_est105",
-            #   Subtotal
-            #   Renter occupied
-            #   greater than 50% but less than or equal to 80% of HAMFI
-            #   not computed (no/negative income)
-            #   All
-            "T8_est118",
-            #   Subtotal
-            #   Renter occupied	greater than 80% but less than or equal to 100% of HAMFI
-            #   not computed (no/negative income)
-            #   All
-            "T8_est131",
-            #   Subtotal
-            #   Renter occupied
-            #   greater than 100% of HAMFI
-            #   not computed (no/negative income)
-            #   All
-        ]
-
-        # T8_est68	Subtotal	Renter occupied	All	All	All
-        RENTER_OCCUPIED_POPULATION_FIELD = "T8_est68"
-
         # Math:
         # (
         #     # of Owner Occupied Units Meeting Criteria
@@ -244,19 +270,21 @@ class HudHousingETL(ExtractTransformLoad):
         # )
 
         self.df[self.HOUSING_BURDEN_NUMERATOR_FIELD_NAME] = self.df[
-            OWNER_OCCUPIED_NUMERATOR_FIELDS
-        ].sum(axis=1) + self.df[RENTER_OCCUPIED_NUMERATOR_FIELDS].sum(axis=1)
+            self.OWNER_OCCUPIED_NUMERATOR_FIELDS
+        ].sum(axis=1) + self.df[self.RENTER_OCCUPIED_NUMERATOR_FIELDS].sum(
+            axis=1
+        )
 
         self.df[self.HOUSING_BURDEN_DENOMINATOR_FIELD_NAME] = (
-            self.df[OWNER_OCCUPIED_POPULATION_FIELD]
-            + self.df[RENTER_OCCUPIED_POPULATION_FIELD]
-            - self.df[OWNER_OCCUPIED_NOT_COMPUTED_FIELDS].sum(axis=1)
-            - self.df[RENTER_OCCUPIED_NOT_COMPUTED_FIELDS].sum(axis=1)
+            self.df[self.OWNER_OCCUPIED_POPULATION_FIELD]
+            + self.df[self.RENTER_OCCUPIED_POPULATION_FIELD]
+            - self.df[self.OWNER_OCCUPIED_NOT_COMPUTED_FIELDS].sum(axis=1)
+            - self.df[self.RENTER_OCCUPIED_NOT_COMPUTED_FIELDS].sum(axis=1)
         )
 
         self.df["DENOM INCL NOT COMPUTED"] = (
-            self.df[OWNER_OCCUPIED_POPULATION_FIELD]
-            + self.df[RENTER_OCCUPIED_POPULATION_FIELD]
+            self.df[self.OWNER_OCCUPIED_POPULATION_FIELD]
+            + self.df[self.RENTER_OCCUPIED_POPULATION_FIELD]
         )
 
         # TODO: add small sample size checks
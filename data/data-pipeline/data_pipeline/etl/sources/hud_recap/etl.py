@@ -32,7 +32,7 @@ class HudRecapETL(ExtractTransformLoad):
         )
 
         # output
-        self.CSV_PATH = self.DATA_PATH / "dataset" / "hud_recap"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "hud_recap"
 
         # Defining some variable names
         self.HUD_RECAP_PRIORITY_COMMUNITY_FIELD_NAME = (
@@ -82,5 +82,5 @@ class HudRecapETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write nationwide csv
-        self.CSV_PATH.mkdir(parents=True, exist_ok=True)
-        self.df.to_csv(self.CSV_PATH / "usa.csv", index=False)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+        self.df.to_csv(self.OUTPUT_PATH / "usa.csv", index=False)
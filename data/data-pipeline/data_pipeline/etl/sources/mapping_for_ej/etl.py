@@ -4,6 +4,7 @@ from data_pipeline.config import settings
 from data_pipeline.etl.base import ExtractTransformLoad
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 from data_pipeline.score import field_names
 from data_pipeline.utils import get_module_logger
 
@@ -30,7 +31,7 @@ class MappingForEJETL(ExtractTransformLoad):
         )
 
         # output
-        self.CSV_PATH = self.DATA_PATH / "dataset" / "mapping_for_ej"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "mapping_for_ej"
 
         # Defining variables
         self.COLUMNS_TO_KEEP = [
@@ -82,8 +83,8 @@ class MappingForEJETL(ExtractTransformLoad):
         # Note that VA and CO should never have leading 0s, so this isn't
         # strictly necessary, but if in the future, there are more states
         # this seems like a reasonable thing to include.
-        self.df[self.GEOID_TRACT_FIELD_NAME] = (
-            self.df["fips_tract"].astype(str).str.zfill(11)
+        self.df[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
+            self.df["fips_tract"]
         )
 
         # Note that there are tracts in this dataset that do not have a final ranking
@@ -104,9 +105,9 @@ class MappingForEJETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write selected states csv
-        self.CSV_PATH.mkdir(parents=True, exist_ok=True)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.df[self.COLUMNS_TO_KEEP].to_csv(
-            self.CSV_PATH / "co_va.csv", index=False
+            self.OUTPUT_PATH / "co_va.csv", index=False
         )
 
     def validate(self) -> None:
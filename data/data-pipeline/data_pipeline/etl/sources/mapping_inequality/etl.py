@@ -47,7 +47,7 @@ class MappingInequalityETL(ExtractTransformLoad):
         )
 
         # output
-        self.CSV_PATH = self.DATA_PATH / "dataset" / "mapping_inequality"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "mapping_inequality"
 
         # Some input field names. From documentation: 'Census Tracts were intersected
         # with HOLC Polygons. Census information can be joined via the "geoid" field.
@@ -221,7 +221,7 @@ class MappingInequalityETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write nationwide csv
-        self.CSV_PATH.mkdir(parents=True, exist_ok=True)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.df[self.COLUMNS_TO_KEEP].to_csv(
-            self.CSV_PATH / "usa.csv", index=False
+            self.OUTPUT_PATH / "usa.csv", index=False
         )
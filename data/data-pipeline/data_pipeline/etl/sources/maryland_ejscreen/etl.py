@@ -29,7 +29,7 @@ class MarylandEJScreenETL(ExtractTransformLoad):
         self.shape_files_source = self.get_sources_path() / "mdejscreen"
 
         # output
-        self.OUTPUT_CSV_PATH = self.DATA_PATH / "dataset" / "maryland_ejscreen"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "maryland_ejscreen"
 
         self.COLUMNS_TO_KEEP = [
             self.GEOID_TRACT_FIELD_NAME,
@@ -121,7 +121,7 @@ class MarylandEJScreenETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write maryland tracts to csv
-        self.OUTPUT_CSV_PATH.mkdir(parents=True, exist_ok=True)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.df[self.COLUMNS_TO_KEEP].to_csv(
-            self.OUTPUT_CSV_PATH / "maryland.csv", index=False
+            self.OUTPUT_PATH / "maryland.csv", index=False
         )
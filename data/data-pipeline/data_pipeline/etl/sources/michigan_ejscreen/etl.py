@@ -30,7 +30,7 @@ class MichiganEnviroScreenETL(ExtractTransformLoad):
         )
 
         # output
-        self.CSV_PATH = self.DATA_PATH / "dataset" / "michigan_ejscreen"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "michigan_ejscreen"
 
         self.MICHIGAN_EJSCREEN_PRIORITY_COMMUNITY_THRESHOLD: float = 0.75
 
@@ -83,7 +83,7 @@ class MichiganEnviroScreenETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write nationwide csv
-        self.CSV_PATH.mkdir(parents=True, exist_ok=True)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.df[self.COLUMNS_TO_KEEP].to_csv(
-            self.CSV_PATH / "michigan_ejscreen.csv", index=False
+            self.OUTPUT_PATH / "michigan_ejscreen.csv", index=False
         )
@@ -36,6 +36,24 @@ class NationalRiskIndexETL(ExtractTransformLoad):
     # This is defined as roughly the 10th percentile for "rural tracts"
     AGRIVALUE_LOWER_BOUND = 408000
 
+    # Only use disasters linked to climate change
+    DISASTER_CATEGORIES = [
+        "AVLN",  # Avalanche
+        "CFLD",  # Coastal Flooding
+        "CWAV",  # Cold Wave
+        "DRGT",  # Drought
+        "HAIL",  # Hail
+        "HWAV",  # Heat Wave
+        "HRCN",  # Hurricane
+        "ISTM",  # Ice Storm
+        "LNDS",  # Landslide
+        "RFLD",  # Riverine Flooding
+        "SWND",  # Strong Wind
+        "TRND",  # Tornado
+        "WFIR",  # Wildfire
+        "WNTW",  # Winter Weather
+    ]
+
     def __init__(self):
 
         # fetch
@@ -51,8 +69,11 @@ class NationalRiskIndexETL(ExtractTransformLoad):
             )
 
         # source
-        self.risk_index_source = (
-            self.get_sources_path() / "NRI_Table_CensusTracts.csv"
+        self.risk_index_file_name = "NRI_Table_CensusTracts.csv"
+        self.risk_index_source = ZIPDataSource(
+            source=self.risk_index_url,
+            destination=self.get_sources_path(),
+            members=[self.risk_index_file_name],
         )
 
         # output
@@ -74,11 +95,7 @@ class NationalRiskIndexETL(ExtractTransformLoad):
         self.BUILDING_VALUE_INPUT_FIELD_NAME = "BUILDVALUE"
 
     def get_data_sources(self) -> [DataSource]:
-        return [
-            ZIPDataSource(
-                source=self.risk_index_url, destination=self.get_sources_path()
-            )
-        ]
+        return [self.risk_index_source]
 
     def extract(self, use_cached_data_sources: bool = False) -> None:
 
@@ -86,13 +103,25 @@ class NationalRiskIndexETL(ExtractTransformLoad):
             use_cached_data_sources
         )  # download and extract data sources
 
-        # read in the unzipped csv from NRI data source then rename the
+        # read in the csv from the NRI archive then rename the
         # Census Tract column for merging
-        self.df_nri = pd.read_csv(
+        self.df_nri = self.read_raw_csv(
             self.risk_index_source,
-            dtype={self.INPUT_GEOID_TRACT_FIELD_NAME: "string"},
+            member=self.risk_index_file_name,
+            columns={
+                self.INPUT_GEOID_TRACT_FIELD_NAME: None,
+                self.RISK_INDEX_EXPECTED_ANNUAL_LOSS_SCORE_INPUT_FIELD_NAME: "float64",
+                self.AGRICULTURAL_VALUE_INPUT_FIELD_NAME: "float64",
+                self.POPULATION_INPUT_FIELD_NAME: None,
+                self.BUILDING_VALUE_INPUT_FIELD_NAME: "float64",
+            },
+            # Some disaster categories do not have all loss columns
+            optional_columns={
+                f"{category}_{loss}": "float64"
+                for category in self.DISASTER_CATEGORIES
+                for loss in ["EALA", "EALP", "EALB"]
+            },
             na_values=["None"],
-            low_memory=False,
         )
 
     def transform(self) -> None:
@@ -112,40 +141,22 @@ class NationalRiskIndexETL(ExtractTransformLoad):
             inplace=True,
         )
 
-        # Only use disasters linked to climate change
-        disaster_categories = [
-            "AVLN",  # Avalanche
-            "CFLD",  # Coastal Flooding
-            "CWAV",  # Cold Wave
-            "DRGT",  # Drought
-            "HAIL",  # Hail
-            "HWAV",  # Heat Wave
-            "HRCN",  # Hurricane
-            "ISTM",  # Ice Storm
-            "LNDS",  # Landslide
-            "RFLD",  # Riverine Flooding
-            "SWND",  # Strong Wind
-            "TRND",  # Tornado
-            "WFIR",  # Wildfire
-            "WNTW",  # Winter Weather
-        ]
-
         # Some disaster categories do not have agriculture value column
         agriculture_columns = [
             f"{x}_EALA"
-            for x in disaster_categories
+            for x in self.DISASTER_CATEGORIES
             if f"{x}_EALA" in list(self.df_nri.columns)
         ]
 
         population_columns = [
             f"{x}_EALP"
-            for x in disaster_categories
+            for x in self.DISASTER_CATEGORIES
             if f"{x}_EALP" in list(self.df_nri.columns)
         ]
 
         buildings_columns = [
             f"{x}_EALB"
-            for x in disaster_categories
+            for x in self.DISASTER_CATEGORIES
             if f"{x}_EALB" in list(self.df_nri.columns)
         ]
 
@@ -6,6 +6,7 @@ from data_pipeline.etl.base import ExtractTransformLoad
 from data_pipeline.etl.datasource import DataSource
 from data_pipeline.etl.datasource import ZIPDataSource
 from data_pipeline.etl.base import ValidGeoLevel
+from data_pipeline.etl.tract_keys import normalize_tract_ids
 from data_pipeline.utils import get_module_logger
 
 logger = get_module_logger(__name__)
@@ -85,11 +86,8 @@ class PersistentPovertyETL(ExtractTransformLoad):
         )
 
         # Left-pad the tracts with 0s
-        expected_length_of_census_tract_field = 11
-        df[self.GEOID_TRACT_FIELD_NAME] = (
+        df[self.GEOID_TRACT_FIELD_NAME] = normalize_tract_ids(
             df[self.GEOID_TRACT_FIELD_NAME]
-            .astype(str)
-            .apply(lambda x: x.zfill(expected_length_of_census_tract_field))
         )
 
         # Sanity check the join.
@@ -27,7 +27,7 @@ class TreeEquityScoreETL(ExtractTransformLoad):
         self.TES_CSV = self.get_sources_path() / "tes_2021_data.csv"
 
         # output
-        self.CSV_PATH = self.DATA_PATH / "dataset" / "tree_equity_score"
+        self.OUTPUT_PATH = self.DATA_PATH / "dataset" / "tree_equity_score"
         self.df: gpd.GeoDataFrame
 
         self.tes_state_dfs = []
@@ -126,7 +126,7 @@ class TreeEquityScoreETL(ExtractTransformLoad):
 
     def load(self) -> None:
         # write nationwide csv
-        self.CSV_PATH.mkdir(parents=True, exist_ok=True)
+        self.OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.df = self.df[
             [
                 ExtractTransformLoad.GEOID_FIELD_NAME,
@@ -154,4 +154,4 @@ class TreeEquityScoreETL(ExtractTransformLoad):
                 "geometry",  # Block group geometry coordinates
             ]
         ]
-        self.df.to_csv(self.CSV_PATH / "usa.csv", index=False)
+        self.df.to_csv(self.OUTPUT_PATH / "usa.csv", index=False)
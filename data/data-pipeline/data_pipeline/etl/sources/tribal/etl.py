@@ -26,6 +26,9 @@ class TribalETL(ExtractTransformLoad):
 
         self.USA_TRIBAL_DF_LIST = []
 
+    def get_output_paths(self) -> [Path]:
+        return [self.CSV_BASE_PATH, self.NATIONAL_TRIBAL_GEOJSON_PATH]
+
     def get_data_sources(self) -> [DataSource]:
         
         # Need to figure out how to get these datasets!
@@ -21,6 +21,7 @@ class TribalOverlapETL(ExtractTransformLoad):
     # Metadata for the baseclass
     NAME = "tribal_overlap"
     GEO_LEVEL = ValidGeoLevel.CENSUS_TRACT
+    DEPENDENCIES = ["census", "tribal"]
 
     PUERTO_RICO_EXPECTED_IN_DATA = False
     ALASKA_AND_HAWAII_EXPECTED_IN_DATA = True
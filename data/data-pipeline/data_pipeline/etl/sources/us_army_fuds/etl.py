@@ -24,6 +24,7 @@ class USArmyFUDS(ExtractTransformLoad):
     ELIGIBLE_FUDS_BINARY_FIELD_NAME: str
     GEO_LEVEL: ValidGeoLevel = ValidGeoLevel.CENSUS_TRACT
     LOAD_YAML_CONFIG: bool = True
+    DEPENDENCIES = ["census"]
 
     ISLAND_AREAS_EXPECTED_IN_DATA = True
 
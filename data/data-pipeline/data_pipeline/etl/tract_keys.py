@@ -0,0 +1,78 @@
+"""Conversions of census tract IDs between their forms.
+
+Tract IDs are read as strings, or as numbers that lost their leading zeros,
+and are written as zero-padded 11 digit strings. Joining on them is faster as
+int64 keys, which take an eighth of the memory of Python strings and are
+hashed without reading any string. All conversions run in Arrow, on the whole
+column at once.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+TRACT_ID_LENGTH = 11
+
+
+def _to_arrow_strings(ids: pd.Series) -> pa.Array:
+    """Returns IDs as an Arrow array of strings, numbers being written
+    without decimals"""
+    if pd.api.types.is_numeric_dtype(ids) and not pd.api.types.is_bool_dtype(
+        ids
+    ):
+        ids = pa.array(ids, from_pandas=True)
+        if pa.types.is_floating(ids.type):
+            ids = pc.cast(ids, pa.int64())
+        return pc.cast(ids, pa.string())
+    return pa.array(ids.astype("string"), type=pa.string(), from_pandas=True)
+
+
+def normalize_tract_ids(
+    ids: pd.Series, length: int = TRACT_ID_LENGTH
+) -> pd.Series:
+    """Left-pads IDs with zeros to their full length
+
+    Args:
+        ids (pd.Series): the IDs, as strings or numbers
+        length (int): the length of the IDs
+
+    Returns:
+        pd.Series: the padded IDs, as strings. Missing IDs stay missing.
+
+    Raises:
+        pyarrow.ArrowInvalid: if numeric IDs aren't whole numbers
+    """
+    padded = pc.utf8_lpad(_to_arrow_strings(ids), width=length, padding="0")
+    return pd.Series(
+        padded.to_numpy(zero_copy_only=False),
+        index=ids.index,
+        name=ids.name,
+        dtype="string",
+    )
+
+
+def to_tract_keys(ids: pd.Series) -> pd.Series:
+    """Converts IDs to int64 keys, to join and compare them on
+
+    Args:
+        ids (pd.Series): the IDs, as strings or numbers
+
+    Returns:
+        pd.Series: the keys
+
+    Raises:
+        ValueError: if IDs are missing or aren't all digits
+    """
+    if ids.isna().any():
+        raise ValueError(f"{ids.isna().sum()} {ids.name} values are missing")
+    try:
+        keys = pc.cast(_to_arrow_strings(ids), pa.int64())
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Some {ids.name} values aren't numbers: {e}") from e
+    return pd.Series(keys.to_numpy(), index=ids.index, name=ids.name)
+
+
+def from_tract_keys(
+    keys: pd.Series, length: int = TRACT_ID_LENGTH
+) -> pd.Series:
+    """Converts int64 keys back to zero-padded IDs, as strings"""
+    return normalize_tract_ids(keys, length)
@@ -1,7 +1,9 @@
 # pylint: disable=protected-access
+import numpy as np
 import pandas as pd
 import pytest
 from data_pipeline.config import settings
+from data_pipeline.etl.score.etl_score import Percentile
 from data_pipeline.etl.score.etl_score import ScoreETL
 from data_pipeline.score import field_names
 from data_pipeline.score.score_narwhal import ScoreNarwhal
@@ -84,6 +86,40 @@ def test_drop_all_tracts(toy_score_df):
     ), "Percentile in score fails when we drop all tracts"
 
 
+def test_add_percentiles_ranks_columns_together(toy_score_df):
+    df = toy_score_df.assign(
+        reversed_rank=-toy_score_df["to_rank"],
+        # Ties are ranked like rank(pct=True) does
+        tied_rank=toy_score_df["to_rank"] // 2,
+    )
+    exclude = df.index % 3 == 0
+
+    result = ScoreETL._add_percentiles(
+        df,
+        [
+            Percentile("to_rank", "to_rank", exclude=pd.Series(exclude)),
+            Percentile("reversed_rank", "low_rank", ascending=False),
+            Percentile("tied_rank", "tied_rank"),
+        ],
+    )
+
+    suffix = field_names.PERCENTILE_FIELD_SUFFIX
+    assert list(result.columns) == list(df.columns) + [
+        "to_rank" + suffix,
+        "low_rank" + suffix,
+        "tied_rank" + suffix,
+    ]
+    assert result["to_rank" + suffix].equals(
+        df["to_rank"].where(~exclude).rank(pct=True)
+    )
+    assert result["low_rank" + suffix].equals(
+        df["reversed_rank"].rank(pct=True, ascending=False)
+    )
+    assert result["tied_rank" + suffix].equals(
+        df["tied_rank"].rank(pct=True)
+    )
+
+
 def test_mark_territory_dacs():
     test_data = pd.read_csv(
         TEST_DATA_FOLDER / "test_mark_territory_dacs.csv",
@@ -155,3 +191,62 @@ def test_mark_grandfathered_dacs():
     assert result[field_names.FINAL_SCORE_N_BOOLEAN][1]
     assert result[field_names.FINAL_SCORE_N_BOOLEAN][2]
     assert result[field_names.FINAL_SCORE_N_BOOLEAN][3]
+
+
+def test_compact_dtypes():
+    df = pd.DataFrame(
+        {
+            field_names.GEOID_TRACT_FIELD: ["01001020100", "01001020200"],
+            # A flag of datasets.yml, and one calculated by the score
+            field_names.AML_BOOLEAN: [1.0, None],
+            field_names.HISTORIC_REDLINING_SCORE_EXCEEDED: [True, None],
+            field_names.POVERTY_LESS_THAN_100_FPL_FIELD
+            + field_names.PERCENTILE_FIELD_SUFFIX: [0.9, None],
+        }
+    )
+
+    result = ScoreETL()._compact_dtypes(df)
+
+    assert result.dtypes.to_dict() == {
+        field_names.GEOID_TRACT_FIELD: "object",
+        field_names.AML_BOOLEAN: "boolean",
+        field_names.HISTORIC_REDLINING_SCORE_EXCEEDED: "boolean",
+        # Percentiles are compared to thresholds, so they are kept as is
+        field_names.POVERTY_LESS_THAN_100_FPL_FIELD
+        + field_names.PERCENTILE_FIELD_SUFFIX: "float64",
+    }
+    assert result[field_names.AML_BOOLEAN].tolist() == [True, pd.NA]
+
+
+def test_join_tract_dfs():
+    left = pd.DataFrame(
+        {
+            "a": [1, 2],
+            field_names.GEOID_TRACT_FIELD: ["72001956300", "01001020100"],
+        }
+    )
+    right = pd.DataFrame(
+        {
+            field_names.GEOID_TRACT_FIELD: ["01001020200", "01001020100"],
+            "b": [3.0, 4.0],
+        }
+    )
+
+    result = ScoreETL()._join_tract_dfs([left, right])
+
+    # Tracts stay in the order they are found in, like with outer merges
+    pd.testing.assert_frame_equal(
+        result,
+        pd.DataFrame(
+            {
+                "a": [1.0, 2.0, np.nan],
+                field_names.GEOID_TRACT_FIELD: pd.Series(
+                    ["72001956300", "01001020100", "01001020200"],
+                    dtype="string",
+                ),
+                "b": [np.nan, 4.0, 3.0],
+            }
+        ),
+    )
+    with pytest.raises(ValueError, match="columns \\['a'\\]"):
+        ScoreETL()._join_tract_dfs([left, left])
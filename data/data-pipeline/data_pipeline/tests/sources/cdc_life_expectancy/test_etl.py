@@ -1,4 +1,5 @@
 # pylint: disable=protected-access
+import io
 import pathlib
 from unittest import mock
 
@@ -59,8 +60,8 @@ class TestCDCLifeExpectency(TestETL):
         sources_path.mkdir(parents=True, exist_ok=True)
 
         with mock.patch(
-            "data_pipeline.etl.downloader.requests"
-        ) as requests_mock, mock.patch(
+            "data_pipeline.etl.downloader.get_session"
+        ) as session_mock, mock.patch(
             "data_pipeline.etl.base.ExtractTransformLoad.get_sources_path"
         ) as sources_mock, mock.patch(
             "data_pipeline.etl.score.etl_utils.get_state_fips_codes"
@@ -77,12 +78,11 @@ class TestCDCLifeExpectency(TestETL):
 
                 response_mock = requests.Response()
                 response_mock.status_code = 200
-                # pylint: disable=protected-access
                 # Return text fixture:
-                response_mock._content = file_contents
+                response_mock.raw = io.BytesIO(file_contents)
                 return response_mock
 
-            requests_mock.get = fake_get
+            session_mock.return_value.get = fake_get
 
             # fips codes mock
             mock_get_state_fips_codes.return_value = [
@@ -0,0 +1,296 @@
+import http.server
+import json
+import threading
+import urllib.parse
+import zipfile
+from unittest import mock
+
+import pytest
+from data_pipeline.etl.datasource import CensusSummaryFileDataSource
+from data_pipeline.etl.sources.census_acs import etl_utils
+
+TRACTS = [("001", "020100"), ("001", "020200")]
+
+
+class CensusAPIHandler(http.server.BaseHTTPRequestHandler):
+    """A stand-in for the Census API, returning the value `<state><i>` for the
+    i-th variable of every tract"""
+
+    requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        self.requests.append(query)
+        variables = query["get"][0].split(",")
+        state = query["in"][0].split()[0].split(":")[1]
+        rows = [variables + ["state", "county", "tract"]]
+        for county, tract in TRACTS:
+            rows.append(
+                ["Tract name"]
+                + [f"{state}{i}" for i in range(1, len(variables))]
+                + [state, county, tract]
+            )
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def census_api(monkeypatch):
+    CensusAPIHandler.requests = []
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), CensusAPIHandler
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        etl_utils,
+        "CENSUS_API_URL",
+        f"http://127.0.0.1:{server.server_address[1]}/data",
+    )
+    with mock.patch.object(
+        etl_utils, "get_state_fips_codes", return_value=["01", "02", "60"]
+    ):
+        yield CensusAPIHandler.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_retrieve_census_acs_data(tmp_path, census_api, monkeypatch):
+    monkeypatch.setattr(etl_utils, "CENSUS_API_MAX_VARIABLES", 2)
+    variables = ["B01_001E", "B02_001E", "B03_001E"]
+
+    df = etl_utils.retrieve_census_acs_data(
+        acs_year=2019,
+        variables=variables,
+        tract_output_field_name="GEOID10_TRACT",
+        data_path_for_fips_codes=tmp_path,
+    )
+
+    # 2 states (territories are skipped) x 2 batches of variables
+    assert len(census_api) == 4
+    assert list(df.columns) == variables + ["GEOID10_TRACT"]
+    assert df["GEOID10_TRACT"].tolist() == [
+        "01001020100",
+        "01001020200",
+        "02001020100",
+        "02001020200",
+    ]
+    # The batches are joined on the tracts, and values are numeric
+    assert df["B03_001E"].tolist() == [11, 11, 21, 21]
+
+
+def test_retrieve_census_acs_data_uses_cache(tmp_path, census_api):
+    for _ in range(2):
+        df = etl_utils.retrieve_census_acs_data(
+            acs_year=2019,
+            variables=["B01_001E"],
+            tract_output_field_name="GEOID10_TRACT",
+            data_path_for_fips_codes=tmp_path,
+            cache_path=tmp_path / "cache",
+        )
+
+    assert len(census_api) == 2
+    assert len(df) == 4
+    assert (tmp_path / "cache" / "2019" / "acs5" / "01").is_dir()
+
+
+@pytest.fixture
+def summary_file_path(tmp_path):
+    path = tmp_path / "summary_files"
+    path.mkdir()
+    (path / "acsdt5y2021-b19013.dat").write_text(
+        "GEO_ID|NAME|B19013_E001|B19013_M001\n"
+        "0400000US01|Alabama|52035|281\n"
+        "310M600US10180|Abilene, TX Metro Area|52000|1500\n"
+        "1400000US01001020100|Tract 201|60563|9012\n"
+        "1400000US60010950100|Tract 9501|25000|4000\n"
+        "1400000US72001956300|Tract 9563|-666666666|-222222222\n"
+    )
+    (path / "acsdt5y2021-c16002.dat").write_text(
+        "GEO_ID|NAME|C16002_E001|C16002_E004\n"
+        "0400000US01|Alabama|1888504|1234\n"
+        "1400000US01001020100|Tract 201|745|3\n"
+        "1400000US60010950100|Tract 9501|100|10\n"
+        "1400000US72001956300|Tract 9563|1200|900\n"
+    )
+    return path
+
+
+def test_read_census_acs_summary_file_tracts(summary_file_path):
+    df = etl_utils.read_census_acs_summary_file_tracts(
+        acs_year=2021,
+        variables=["B19013_001E", "C16002_004E", "B19013_001M"],
+        tract_output_field_name="GEOID10_TRACT",
+        summary_file_path=summary_file_path,
+    )
+
+    # Territories are skipped, like with the Census API
+    assert df.to_dict("list") == {
+        "B19013_001E": [60563, -666666666],
+        "C16002_004E": [3, 900],
+        "B19013_001M": [9012, -222222222],
+        "GEOID10_TRACT": ["01001020100", "72001956300"],
+    }
+
+
+def test_read_census_acs_summary_file_from_archive(summary_file_path):
+    archive_path = summary_file_path.parent / "summary_files.zip"
+    with zipfile.ZipFile(archive_path, "w") as zip_file:
+        for path in summary_file_path.iterdir():
+            zip_file.write(path, f"5YRData/{path.name}")
+
+    df = etl_utils.read_census_acs_summary_file(
+        acs_year=2021,
+        variables=["B19013_001E"],
+        summary_file_path=archive_path,
+        geo_level="state",
+    )
+
+    assert df.to_dict() == {"B19013_001E": {"01": "52035"}}
+
+
+def test_read_census_acs_summary_file_metro_areas(summary_file_path):
+    df = etl_utils.read_census_acs_summary_file(
+        acs_year=2021,
+        variables=["B19013_001E"],
+        summary_file_path=summary_file_path,
+        geo_level="metropolitan statistical area/micropolitan statistical area",
+    )
+
+    assert df.to_dict() == {"B19013_001E": {"10180": "52000"}}
+
+    # C16002 has no metropolitan areas
+    with pytest.raises(ValueError, match="c16002"):
+        etl_utils.read_census_acs_summary_file(
+            acs_year=2021,
+            variables=["C16002_001E"],
+            summary_file_path=summary_file_path,
+            geo_level="metropolitan statistical area/micropolitan statistical area",
+        )
+
+
+def _write_geo_file(path, state, geo_ids):
+    """Writes a geography file of the sequence-based summary files, with
+    only its LOGRECNO and GEOID fields filled in"""
+    rows = []
+    for i, geo_id in enumerate(geo_ids, start=1):
+        fields = [""] * 53
+        fields[:5] = ["ACSSF", state, "", "00", f"{i:07d}"]
+        fields[48] = geo_id
+        rows.append(",".join(fields))
+    path.write_text("\n".join(rows) + "\n")
+
+
+@pytest.fixture
+def sequence_summary_file_path(tmp_path):
+    path = tmp_path / "summary_files_2019"
+    tracts_path = path / "Tracts_Block_Groups_Only"
+    others_path = path / "All_Geographies_Not_Tracts_Block_Groups"
+    tracts_path.mkdir(parents=True)
+    others_path.mkdir()
+    (path / "ACS_5yr_Seq_Table_Number_Lookup.txt").write_text(
+        "File ID,Table ID,Sequence Number,Line Number,Start Position,"
+        "Total Cells in Table,Total Cells in Sequence,Table Title,"
+        "Subject Area\n"
+        "ACSSF,B19013,0042,,7,1 CELL,,MEDIAN HOUSEHOLD INCOME,Income\n"
+        "ACSSF,B19013,0042,1,,,,Median household income,\n"
+        "ACSSF,C16002,0042,,8,4 CELLS,5,HOUSEHOLD LANGUAGE,Language\n"
+        "ACSSF,C16002,0042,0.5,,,,Universe: Households,\n"
+        "ACSSF,C16002,0042,1,,,,Total:,\n"
+    )
+    _write_geo_file(
+        tracts_path / "g20195al.csv",
+        "AL",
+        ["14000US01001020100", "15000US010010201001"],
+    )
+    for file_type, values in [("e", "60563,745,1,2,3"), ("m", "9012,.,1,1,1")]:
+        (tracts_path / f"{file_type}20195al0042000.txt").write_text(
+            f"ACSSF,2019e5,al,000,0042,0000001,{values}\n"
+            f"ACSSF,2019e5,al,000,0042,0000002,1,2,3,4,5\n"
+        )
+    _write_geo_file(
+        others_path / "g20195us.csv", "US", ["01000US", "31000US10180"]
+    )
+    (others_path / "e20195us0042000.txt").write_text(
+        "ACSSF,2019e5,us,000,0042,0000001,62843,1,2,3,4\n"
+        "ACSSF,2019e5,us,000,0042,0000002,52000,1,2,3,4\n"
+    )
+    return path
+
+
+def test_read_census_acs_sequence_based_summary_file_tracts(
+    sequence_summary_file_path,
+):
+    df = etl_utils.read_census_acs_summary_file_tracts(
+        acs_year=2019,
+        variables=["B19013_001E", "C16002_004E", "B19013_001M"],
+        tract_output_field_name="GEOID10_TRACT",
+        summary_file_path=sequence_summary_file_path,
+    )
+
+    assert df.to_dict("list") == {
+        "B19013_001E": [60563],
+        "C16002_004E": [3],
+        "B19013_001M": [9012],
+        "GEOID10_TRACT": ["01001020100"],
+    }
+
+
+def test_read_census_acs_sequence_based_summary_file_metro_areas(
+    sequence_summary_file_path,
+):
+    archive_path = sequence_summary_file_path.with_suffix(".zip")
+    with zipfile.ZipFile(archive_path, "w") as zip_file:
+        for path in sequence_summary_file_path.rglob("*.*"):
+            zip_file.write(
+                path, path.relative_to(sequence_summary_file_path).as_posix()
+            )
+
+    df = etl_utils.read_census_acs_summary_file(
+        acs_year=2019,
+        variables=["B19013_001E"],
+        summary_file_path=archive_path,
+        geo_level="metropolitan statistical area/micropolitan statistical area",
+    )
+
+    assert df.to_dict() == {"B19013_001E": {"10180": "52000"}}
+
+    with pytest.raises(FileNotFoundError):
+        etl_utils.read_census_acs_summary_file(
+            acs_year=2010,
+            variables=["B19013_001E"],
+            summary_file_path=archive_path,
+        )
+
+
+def test_read_census_acs_summary_file_rejects_subject_tables(
+    summary_file_path,
+):
+    with pytest.raises(ValueError, match="S1701_C01_001E"):
+        etl_utils.read_census_acs_summary_file(
+            acs_year=2021,
+            variables=["B19013_001E", "S1701_C01_001E"],
+            summary_file_path=summary_file_path,
+        )
+
+
+def test_summary_file_data_source_stands_in_for_api(
+    tmp_path, summary_file_path
+):
+    CensusSummaryFileDataSource(
+        source=str(summary_file_path),
+        destination=tmp_path / "state_median_income.json",
+        acs_year=2021,
+        variables=["B19013_001E"],
+        geo_level="state",
+    ).fetch()
+
+    with open(tmp_path / "state_median_income.json", encoding="utf-8") as file:
+        assert json.load(file) == [["B19013_001E", "state"], ["52035", "01"]]
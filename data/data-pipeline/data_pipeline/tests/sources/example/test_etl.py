@@ -1,5 +1,6 @@
 # pylint: disable=protected-access, unsubscriptable-object, unnecessary-dunder-call
 import copy
+import io
 import os
 import pathlib
 from typing import Optional
@@ -12,6 +13,7 @@ import pytest
 import requests
 from data_pipeline.etl.base import ExtractTransformLoad
 from data_pipeline.etl.base import ValidGeoLevel
+from data_pipeline.etl.datasource import ZIPDataSource
 from data_pipeline.etl.score.constants import TILES_ALASKA_AND_HAWAII_FIPS_CODE
 from data_pipeline.etl.score.constants import TILES_CONTINENTAL_US_FIPS_CODE
 from data_pipeline.tests.sources.example.etl import ExampleETL
@@ -129,8 +131,8 @@ class TestETL:
         sources_path.mkdir(parents=True, exist_ok=True)
 
         with mock.patch(
-            "data_pipeline.etl.downloader.requests"
-        ) as requests_mock, mock.patch(
+            "data_pipeline.etl.downloader.get_session"
+        ) as session_mock, mock.patch(
             "data_pipeline.etl.base.ExtractTransformLoad.get_sources_path"
         ) as sources_mock, mock.patch(
             "data_pipeline.etl.score.etl_utils.get_state_fips_codes"
@@ -154,10 +156,11 @@ class TestETL:
 
             response_mock = requests.Response()
             response_mock.status_code = 200
-            # pylint: disable=protected-access
-            response_mock._content = file_contents
             # Return text fixture:
-            requests_mock.get = mock.MagicMock(return_value=response_mock)
+            response_mock.raw = io.BytesIO(file_contents)
+            session_mock.return_value.get = mock.MagicMock(
+                return_value=response_mock
+            )
             mock_get_state_fips_codes.return_value = [
                 x[0:2] for x in self._FIXTURES_SHARED_TRACT_IDS
             ]
@@ -300,10 +303,25 @@ class TestETL:
 
         data_path, tmp_path = mock_paths
 
-        tmp_df = pd.read_csv(
-            etl.get_sources_path() / self._SAMPLE_DATA_FILE_NAME,
-            dtype={etl.GEOID_TRACT_FIELD_NAME: str},
-        )
+        # Declared members of zip data sources are read from the archive
+        zip_data_sources = [
+            data_source
+            for data_source in etl.get_data_sources()
+            if isinstance(data_source, ZIPDataSource)
+            and self._SAMPLE_DATA_FILE_NAME in (data_source.members or [])
+        ]
+        if zip_data_sources:
+            with zip_data_sources[0].open_member(
+                self._SAMPLE_DATA_FILE_NAME
+            ) as file:
+                tmp_df = pd.read_csv(
+                    file, dtype={etl.GEOID_TRACT_FIELD_NAME: str}
+                )
+        else:
+            tmp_df = pd.read_csv(
+                etl.get_sources_path() / self._SAMPLE_DATA_FILE_NAME,
+                dtype={etl.GEOID_TRACT_FIELD_NAME: str},
+            )
         snapshot.snapshot_dir = self._DATA_DIRECTORY_FOR_TEST
         snapshot.assert_match(
             tmp_df.to_csv(index=False, float_format=self._FLOAT_FORMAT),
@@ -359,9 +377,10 @@ class TestETL:
         # execution
         etl.load()
 
-        # Make sure it creates the file.
+        # Make sure it creates the files.
         actual_output_path = etl._get_output_file_path()
         assert actual_output_path.exists()
+        assert etl._get_output_parquet_path().exists()
 
         # Check COLUMNS_TO_KEEP remain
         actual_output = pd.read_csv(
@@ -557,11 +576,14 @@ class TestETL:
         # TODO: look into moving this file deletion to a setup/teardown method that
         #  applies to all methods. I struggled to get that to work because I couldn't
         #  pass `mock_etl` and `mock_paths`
-        # Delete output file.
-        output_file_path = etl._get_output_file_path()
-        if os.path.exists(output_file_path):
-            logger.debug("Deleting output file created by other tests.")
-            os.remove(output_file_path)
+        # Delete output files.
+        for output_file_path in [
+            etl._get_output_file_path(),
+            etl._get_output_parquet_path(),
+        ]:
+            if os.path.exists(output_file_path):
+                logger.debug("Deleting output file created by other tests.")
+                os.remove(output_file_path)
 
         # Run more steps to generate test data.
         etl.transform()
@@ -596,3 +618,8 @@ class TestETL:
 
         else:
             raise NotImplementedError("This geo level not tested yet.")
+
+        # Only the requested columns are read
+        assert list(etl.get_data_frame(columns=etl.COLUMNS_TO_KEEP[:1])) == [
+            etl.COLUMNS_TO_KEEP[0]
+        ]
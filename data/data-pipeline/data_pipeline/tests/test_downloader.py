@@ -0,0 +1,325 @@
+import concurrent.futures
+import functools
+import hashlib
+import http.server
+import io
+import threading
+import time
+import zipfile
+from unittest import mock
+
+import pytest
+import requests
+import tenacity
+from data_pipeline.etl import downloader
+from data_pipeline.etl.base import ExtractTransformLoad
+from data_pipeline.etl.datasource import DataSource
+from data_pipeline.etl.datasource import ZIPDataSource
+from data_pipeline.etl.downloader import Downloader
+
+
+def _get_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(content)
+    return response
+
+
+@pytest.fixture
+def session_mock():
+    with mock.patch.object(downloader, "get_session") as get_session_mock:
+        yield get_session_mock.return_value
+
+
+def test_download_file_streams_and_checks_sha256(tmp_path, session_mock):
+    content = b"GEOID10_TRACT,value\n01001020100,1\n" * 1000
+    session_mock.get.return_value = _get_response(content)
+
+    path = Downloader.download_file_from_url.__wrapped__(
+        Downloader,
+        file_url="https://example.com/data.csv",
+        download_file_name=tmp_path / "data.csv",
+        expected_sha256=hashlib.sha256(content).hexdigest(),
+    )
+
+    assert path.read_bytes() == content
+    assert session_mock.get.call_args.kwargs["stream"] is True
+
+
+def test_download_file_rejects_wrong_sha256(tmp_path, session_mock):
+    session_mock.get.return_value = _get_response(b"truncated")
+
+    with pytest.raises(downloader.DownloadChecksumError):
+        Downloader.download_file_from_url.__wrapped__(
+            Downloader,
+            file_url="https://example.com/data.csv",
+            download_file_name=tmp_path / "data.csv",
+            expected_sha256=hashlib.sha256(b"complete").hexdigest(),
+        )
+    # Neither the file nor its partial download are left behind
+    assert not list(tmp_path.iterdir())
+
+
+def test_zip_data_source_extracts_download(tmp_path, session_mock, monkeypatch):
+    monkeypatch.setattr(downloader.settings, "DATA_PATH", tmp_path / "data")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("data.csv", "GEOID10_TRACT\n01001020100\n")
+    session_mock.get.return_value = _get_response(archive.getvalue())
+
+    ZIPDataSource(
+        source="https://example.com/data.zip",
+        destination=tmp_path / "sources",
+        expected_sha256=hashlib.sha256(archive.getvalue()).hexdigest(),
+    ).fetch()
+
+    assert (tmp_path / "sources" / "data.csv").exists()
+    # The archive is kept in the store, and no partial download is left
+    store_path = tmp_path / "data" / "sources" / ".store"
+    assert len(list((store_path / "objects").rglob("*"))) == 2
+    assert not list((store_path / "tmp").glob("*.part*"))
+
+
+def test_zip_data_source_reads_declared_members(tmp_path, session_mock):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("data.csv", "GEOID10_TRACT\n01001020100\n")
+        zip_file.writestr("other.csv", "unused\n")
+    session_mock.get.return_value = _get_response(archive.getvalue())
+    data_source = ZIPDataSource(
+        source="https://example.com/data.zip",
+        destination=tmp_path / "sources",
+        members=["data.csv"],
+    )
+
+    data_source.fetch()
+
+    # Only the archive is written, its members are not extracted
+    assert list((tmp_path / "sources").iterdir()) == [
+        tmp_path / "sources" / "data.zip"
+    ]
+    with data_source.open_member("data.csv") as file:
+        assert file.read() == b"GEOID10_TRACT\n01001020100\n"
+    with pytest.raises(ValueError):
+        with data_source.open_member("other.csv"):
+            pass
+
+
+def test_zip_data_source_checks_declared_members(tmp_path, session_mock):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("data.csv", "GEOID10_TRACT\n01001020100\n")
+    session_mock.get.return_value = _get_response(archive.getvalue())
+
+    with pytest.raises(FileNotFoundError):
+        ZIPDataSource(
+            source="https://example.com/data.zip",
+            destination=tmp_path / "sources",
+            members=["missing.csv"],
+        ).fetch()
+
+
+def test_host_limiter_bounds_connections_per_host():
+    limiter = downloader.HostLimiter(max_connections=2, min_interval=0)
+    lock = threading.Lock()
+    active = {"example.com": 0, "census.gov": 0}
+    peak = {"example.com": 0, "census.gov": 0}
+
+    def request(url, host):
+        with limiter.limit(url):
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for i in range(8):
+            executor.submit(request, f"https://example.com/{i}", "example.com")
+            executor.submit(request, f"https://census.gov/{i}", "census.gov")
+
+    assert peak == {"example.com": 2, "census.gov": 2}
+
+
+def test_host_limiter_applies_host_limits():
+    limiter = downloader.HostLimiter(
+        max_connections=1,
+        min_interval=0,
+        host_limits={"mirror.example.com": (3, 0)},
+    )
+    lock = threading.Lock()
+    active = {"mirror.example.com": 0, "census.gov": 0}
+    peak = {"mirror.example.com": 0, "census.gov": 0}
+
+    def request(url, host):
+        with limiter.limit(url):
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for i in range(4):
+            for host in peak:
+                executor.submit(request, f"https://{host}/{i}", host)
+
+    assert peak == {"mirror.example.com": 3, "census.gov": 1}
+
+
+def test_host_limiter_spaces_out_requests():
+    limiter = downloader.HostLimiter(max_connections=4, min_interval=0.05)
+    start_time = time.monotonic()
+    for i in range(3):
+        with limiter.limit(f"https://example.com/{i}"):
+            pass
+    assert time.monotonic() - start_time >= 0.1
+
+
+def test_extract_fetches_data_sources_concurrently(tmp_path):
+    fetching_threads = set()
+
+    class SlowDataSource(DataSource):
+        def fetch(self):
+            fetching_threads.add(threading.get_ident())
+            time.sleep(0.05)
+
+    class MultiSourceETL(ExtractTransformLoad):
+        SOURCES_PATH = tmp_path / "sources"
+
+        def get_data_sources(self):
+            return [
+                SlowDataSource(source=str(i), destination=tmp_path / str(i))
+                for i in range(4)
+            ]
+
+        def transform(self):
+            pass
+
+    MultiSourceETL()._fetch()  # pylint: disable=protected-access
+
+    assert len(fetching_threads) == 4
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves `content`, supporting range requests. The connection is broken
+    after `break_after` bytes of the first response."""
+
+    content = b""
+    break_after = None
+    range_headers = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.range_headers.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == '"v1"':
+            start = int(self.headers["Range"][len("bytes=") : -1])
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(self.content) - 1}/{len(self.content)}",
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(self.content) - start))
+        self.end_headers()
+        body = self.content[start:]
+        if RangeHandler.break_after is not None:
+            body = body[: RangeHandler.break_after]
+            RangeHandler.break_after = None
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def range_server():
+    # Several download chunks long
+    RangeHandler.content = b"GEOID10_TRACT,value\n01001020100,1\n" * 100000
+    RangeHandler.range_headers = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/data.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_broken_download_is_resumed(tmp_path, range_server):
+    RangeHandler.break_after = 2 * downloader.DOWNLOAD_CHUNK_SIZE + 100
+    download = Downloader.download_file_from_url.__wrapped__
+
+    with pytest.raises(requests.exceptions.RequestException):
+        download(
+            Downloader,
+            file_url=range_server,
+            download_file_name=tmp_path / "data.csv",
+        )
+    # The chunks received in full are kept
+    partial_size = (tmp_path / "data.csv.part").stat().st_size
+    assert partial_size >= downloader.DOWNLOAD_CHUNK_SIZE
+
+    path = download(
+        Downloader,
+        file_url=range_server,
+        download_file_name=tmp_path / "data.csv",
+        expected_sha256=hashlib.sha256(RangeHandler.content).hexdigest(),
+    )
+
+    assert RangeHandler.range_headers == [None, f"bytes={partial_size}-"]
+    assert path.read_bytes() == RangeHandler.content
+    assert sorted(tmp_path.iterdir()) == [tmp_path / "data.csv"]
+
+
+def test_partial_download_of_changed_file_starts_over(tmp_path, range_server):
+    (tmp_path / "data.csv.part").write_bytes(b"stale content")
+    (tmp_path / "data.csv.part.json").write_text(
+        f'{{"url": "{range_server}", "validator": "\\"v0\\""}}'
+    )
+
+    path = Downloader.download_file_from_url.__wrapped__(
+        Downloader,
+        file_url=range_server,
+        download_file_name=tmp_path / "data.csv",
+    )
+
+    # The server ignores the range, as the file changed since
+    assert RangeHandler.range_headers == ["bytes=13-"]
+    assert path.read_bytes() == RangeHandler.content
+
+
+def test_broken_zip_download_is_resumed(tmp_path, range_server, monkeypatch):
+    monkeypatch.setattr(downloader.settings, "DATA_PATH", tmp_path / "data")
+    # Give up on the first failure, as a run that is stopped would
+    monkeypatch.setattr(
+        Downloader.download_file_if_modified.retry,
+        "stop",
+        tenacity.stop_after_attempt(1),
+    )
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("data.csv", RangeHandler.content)
+    RangeHandler.content = archive.getvalue()
+    RangeHandler.break_after = 2 * downloader.DOWNLOAD_CHUNK_SIZE + 100
+    download_zip = functools.partial(
+        Downloader.download_zip_file_from_url,
+        file_url=range_server,
+        unzipped_file_path=tmp_path / "sources",
+        expected_sha256=hashlib.sha256(RangeHandler.content).hexdigest(),
+    )
+
+    with pytest.raises(tenacity.RetryError):
+        download_zip()
+    download_zip()
+
+    # The second download picks up from the chunks received in full
+    assert RangeHandler.range_headers[0] is None
+    resume_from = int(RangeHandler.range_headers[1][len("bytes=") : -1])
+    assert resume_from >= downloader.DOWNLOAD_CHUNK_SIZE
+    assert (tmp_path / "sources" / "data.csv").exists()
@@ -1,7 +1,41 @@
 # pylint: disable=protected-access
+import concurrent.futures
+import time
+from unittest.mock import MagicMock
+
+import pandas as pd
+
 import pytest
+from data_pipeline.etl import base
 from data_pipeline.etl import constants
+from data_pipeline.etl import fingerprint
+from data_pipeline.etl import journal
+from data_pipeline.etl import metrics
+from data_pipeline.etl import parsed_sources
 from data_pipeline.etl import runner
+from data_pipeline.etl.sources.tribal.etl import TribalETL
+
+
+@pytest.fixture(autouse=True)
+def etl_metrics_file(monkeypatch, tmp_path):
+    # Keep the runner from recording test runs in the local data directory
+    path = tmp_path / "etl_metrics.json"
+    monkeypatch.setattr(metrics, "ETL_METRICS_FILE_PATH", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def stage_fingerprints_file(monkeypatch, tmp_path):
+    path = tmp_path / "stage_fingerprints.json"
+    monkeypatch.setattr(fingerprint, "STAGE_FINGERPRINTS_FILE_PATH", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def run_journal_file(monkeypatch, tmp_path):
+    path = tmp_path / "run_journal.json"
+    monkeypatch.setattr(journal, "RUN_JOURNAL_FILE_PATH", path)
+    return path
 
 
 def test_get_datasets_to_run():
@@ -9,3 +43,595 @@ def test_get_datasets_to_run():
     assert runner._get_datasets_to_run("census") == [constants.CENSUS_INFO]
     with pytest.raises(ValueError):
         runner._get_datasets_to_run("doesnt_exist")
+
+
+def test_get_dataset_dependencies():
+    dependencies = runner._get_dataset_dependencies(constants.DATASET_LIST)
+    assert dependencies["tribal_overlap"] == {"tribal"}
+    assert dependencies["cdc_places"] == set()
+
+    # Upstream datasets outside of the run are expected to exist already
+    tribal_overlap = [
+        dataset
+        for dataset in constants.DATASET_LIST
+        if dataset["name"] == "tribal_overlap"
+    ]
+    assert runner._get_dataset_dependencies(tribal_overlap) == {
+        "tribal_overlap": set()
+    }
+
+
+def test_get_dataset_dependencies_detects_cycles(monkeypatch):
+    class FirstETL:
+        DEPENDENCIES = ["tribal"]
+
+    class SecondETL:
+        DEPENDENCIES = ["cdc_places"]
+
+    classes = {"cdc_places": FirstETL, "tribal": SecondETL}
+    monkeypatch.setattr(
+        runner, "_get_dataset_class", lambda dataset: classes[dataset["name"]]
+    )
+    datasets = [
+        {"name": "cdc_places", "is_memory_intensive": False},
+        {"name": "tribal", "is_memory_intensive": False},
+    ]
+    with pytest.raises(ValueError, match="Circular dependency"):
+        runner._get_dataset_dependencies(datasets)
+
+
+def test_etl_runner_runs_dependencies_first(monkeypatch):
+    run_order = []
+    monkeypatch.setattr(
+        runner,
+        "_run_one_dataset",
+        lambda dataset, use_cache: run_order.append(dataset["name"]),
+    )
+    runner.etl_runner(no_concurrency=True)
+
+    assert sorted(run_order) == sorted(
+        dataset["name"] for dataset in constants.DATASET_LIST
+    )
+    assert run_order.index("tribal") < run_order.index("tribal_overlap")
+
+
+def test_parse_memory_size():
+    assert metrics.parse_memory_size("512") == 512
+    assert metrics.parse_memory_size("512M") == 512 * 1024**2
+    assert metrics.parse_memory_size("24G") == 24 * 1024**3
+    assert metrics.parse_memory_size("1.5gb") == int(1.5 * 1024**3)
+    with pytest.raises(ValueError):
+        metrics.parse_memory_size("lots")
+
+
+def test_dataset_metrics_store_round_trip(etl_metrics_file):
+    store = metrics.DatasetMetricsStore()
+    assert store.get_peak_rss("census_acs") is None
+    store.record_peak_rss("census_acs", 1024)
+    store.save()
+
+    assert etl_metrics_file.exists()
+    assert metrics.DatasetMetricsStore().get_peak_rss("census_acs") == 1024
+
+
+def test_admit_datasets_without_budget():
+    small = {"name": "small", "is_memory_intensive": False}
+    large_a = {"name": "large_a", "is_memory_intensive": True}
+    large_b = {"name": "large_b", "is_memory_intensive": True}
+
+    admitted = runner._admit_datasets(
+        ready=[large_a, small, large_b], running=[], max_workers=4
+    )
+    assert admitted == [large_a, small]
+
+    admitted = runner._admit_datasets(
+        ready=[large_b, small], running=[large_a], max_workers=2
+    )
+    assert admitted == [small]
+
+
+def test_admit_datasets_with_budget():
+    datasets = [
+        {"name": name, "is_memory_intensive": False}
+        for name in ["a", "b", "c", "d"]
+    ]
+    expected_peak_rss = {"a": 2, "b": 6, "c": 3, "d": 12}
+
+    # Largest first, skipping what doesn't fit in what's left of the budget
+    admitted = runner._admit_datasets(
+        ready=datasets[:3],
+        running=[],
+        max_workers=4,
+        memory_budget=10,
+        expected_peak_rss=expected_peak_rss,
+    )
+    assert [d["name"] for d in admitted] == ["b", "c"]
+
+    # Something bigger than the whole budget only runs on its own
+    admitted = runner._admit_datasets(
+        ready=[datasets[3]],
+        running=[datasets[0]],
+        max_workers=4,
+        memory_budget=10,
+        expected_peak_rss=expected_peak_rss,
+    )
+    assert not admitted
+    admitted = runner._admit_datasets(
+        ready=[datasets[3], datasets[0]],
+        running=[],
+        max_workers=4,
+        memory_budget=10,
+        expected_peak_rss=expected_peak_rss,
+    )
+    assert [d["name"] for d in admitted] == ["d"]
+
+
+def test_etl_runner_records_peak_memory(monkeypatch, etl_metrics_file):
+    monkeypatch.setattr(
+        runner,
+        "_run_one_dataset",
+        lambda dataset, use_cache: {"peak_rss": 1024, "profile": []},
+    )
+    runner.etl_runner(dataset_to_run="tribal", memory_budget=1024**3)
+
+    assert (
+        metrics.DatasetMetricsStore(etl_metrics_file).get_peak_rss("tribal")
+        == 1024
+    )
+
+
+def test_stage_fingerprints_change_with_inputs(tmp_path):
+    input_dir = tmp_path / "inputs"
+    input_dir.mkdir()
+    (input_dir / "a.csv").write_text("a,b\n1,2\n")
+    fingerprints = fingerprint.StageFingerprints()
+
+    original = fingerprints.compute([input_dir], ["local"])
+    assert fingerprints.compute([input_dir], ["local"]) == original
+    assert fingerprints.compute([input_dir], ["aws"]) != original
+
+    (input_dir / "a.csv").write_text("a,b\n1,3\n")
+    changed = fingerprints.compute([input_dir], ["local"])
+    assert changed != original
+
+    output = tmp_path / "output.csv"
+    fingerprints.record("stage", changed, [output])
+    assert not fingerprints.is_up_to_date("stage", changed)
+    output.write_text("done")
+    assert fingerprints.is_up_to_date("stage", changed)
+    assert not fingerprints.is_up_to_date("stage", original)
+
+
+@pytest.fixture
+def tribal_output(monkeypatch, tmp_path):
+    # Fake a tribal ETL that only creates its output directory
+    output = tmp_path / "tribal"
+    run_order = []
+
+    def run_one_dataset(dataset, use_cache):
+        run_order.append(dataset["name"])
+        output.mkdir(exist_ok=True)
+
+    monkeypatch.setattr(runner, "_run_one_dataset", run_one_dataset)
+    monkeypatch.setattr(TribalETL, "get_output_paths", lambda self: [output])
+    return output, run_order
+
+
+def test_etl_runner_incremental_skips_unchanged_datasets(tribal_output):
+    _, run_order = tribal_output
+
+    runner.etl_runner(dataset_to_run="tribal", incremental=True)
+    runner.etl_runner(dataset_to_run="tribal", incremental=True)
+    assert run_order == ["tribal"]
+
+    runner.etl_runner(dataset_to_run="tribal")
+    assert run_order == ["tribal", "tribal"]
+
+
+def test_etl_runner_incremental_reruns_datasets_without_output(
+    tribal_output,
+):
+    output, run_order = tribal_output
+
+    runner.etl_runner(dataset_to_run="tribal", incremental=True)
+    output.rmdir()
+    runner.etl_runner(dataset_to_run="tribal", incremental=True)
+    assert run_order == ["tribal", "tribal"]
+    assert output.exists()
+
+
+def test_generate_tiles_runs_score_and_tribal_jobs_together(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        runner, "run_tile_jobs", lambda jobs: calls.append(jobs)
+    )
+
+    runner._generate_tiles()
+
+    assert len(calls) == 1
+    assert [job.name for job in calls[0]] == [
+        "default/high",
+        "default/low",
+        "tribal",
+    ]
+
+
+def test_stages_runner_incremental(tmp_path):
+    score_input = tmp_path / "dataset.csv"
+    score_input.write_text("1")
+    score_output = tmp_path / "score.csv"
+    run_order = []
+
+    def run_stage(name, output):
+        run_order.append(name)
+        output.write_text(name)
+
+    stages = [
+        {
+            "name": "score",
+            "description": "Generating score",
+            "function": lambda profiler: run_stage("score", score_output),
+            "inputs": [score_input],
+            "outputs": [score_output],
+            "parameters": [],
+        },
+        {
+            "name": "tiles",
+            "description": "Generating map tiles",
+            "function": lambda profiler: run_stage(
+                "tiles", tmp_path / "tiles"
+            ),
+            "inputs": [score_output],
+            "outputs": [tmp_path / "tiles"],
+            "parameters": [],
+        },
+    ]
+
+    runner.stages_runner(stages, incremental=True)
+    runner.stages_runner(stages, incremental=True)
+    assert run_order == ["score", "tiles"]
+
+    (tmp_path / "tiles").unlink()
+    runner.stages_runner(stages, incremental=True)
+    assert run_order == ["score", "tiles", "tiles"]
+
+    score_input.write_text("2")
+    runner.stages_runner(stages, incremental=True)
+    assert run_order == ["score", "tiles", "tiles", "score"]
+
+
+def test_stages_runner_resumes_from_first_incomplete_stage(tmp_path):
+    run_order = []
+    failing = {"geo"}
+
+    def run_stage(name):
+        run_order.append(name)
+        if name in failing:
+            raise RuntimeError(f"{name} failed")
+        (tmp_path / f"{name}.csv").write_text(name)
+
+    stages = [
+        {
+            "name": name,
+            "description": name,
+            "function": lambda profiler, name=name: run_stage(name),
+            "inputs": [],
+            "outputs": [tmp_path / f"{name}.csv"],
+            "parameters": [],
+        }
+        for name in ["score", "post", "geo", "tiles"]
+    ]
+
+    with pytest.raises(RuntimeError):
+        runner.stages_runner(stages, journal=journal.RunJournal())
+    assert run_order == ["score", "post", "geo"]
+
+    failing.clear()
+    run_order.clear()
+    runner.stages_runner(stages, journal=journal.RunJournal(resume=True))
+    assert run_order == ["geo", "tiles"]
+
+    # A completed stage whose output changed is run again, with what follows
+    run_order.clear()
+    (tmp_path / "post.csv").write_text("changed")
+    runner.stages_runner(stages, journal=journal.RunJournal(resume=True))
+    assert run_order == ["post", "geo", "tiles"]
+
+
+def test_run_profiler(tmp_path):
+    profiler = metrics.RunProfiler()
+
+    class FakeETL:
+        output_df = None
+
+    etl_instance = FakeETL()
+    with profiler.phase("dataset", "extract", etl_instance):
+        pass
+    with profiler.phase("dataset", "transform", etl_instance):
+        etl_instance.output_df = pd.DataFrame({"a": [1, 2, 3], "b": 1})
+
+    extract, transform = profiler.records
+    assert extract["phase"] == "extract"
+    assert extract["rows"] is None
+    assert transform["rows"] == 3
+    assert transform["columns"] == 2
+    assert transform["wall_time"] >= 0
+
+    report_path = profiler.save(tmp_path / "report.json")
+    assert len(pd.read_json(report_path)) == 2
+    report_path = profiler.save(tmp_path / "report.parquet")
+    assert len(pd.read_parquet(report_path)) == 2
+    assert "transform" in profiler.format_summary()
+
+
+def test_etl_runner_collects_profiles(monkeypatch):
+    monkeypatch.setattr(
+        runner, "_get_dataset", lambda dataset: MagicMock(output_df=None)
+    )
+    profiler = metrics.RunProfiler()
+    runner.etl_runner(dataset_to_run="tribal", profiler=profiler)
+
+    assert [record["phase"] for record in profiler.records] == [
+        "extract",
+        "transform",
+        "load",
+        "validate",
+        "cleanup",
+    ]
+
+
+def test_load_datasets_config_is_parsed_once(monkeypatch):
+    datasets_config_file_path = (
+        base.ExtractTransformLoad.DATASET_CONFIG_PATH / "datasets.yml"
+    )
+    base._parse_datasets_config.cache_clear()
+    parse_calls = []
+    load_yaml_dict_from_file = base.load_yaml_dict_from_file
+    monkeypatch.setattr(
+        base,
+        "load_yaml_dict_from_file",
+        lambda *args: parse_calls.append(args)
+        or load_yaml_dict_from_file(*args),
+    )
+
+    first = base.load_datasets_config(datasets_config_file_path)
+    second = base.load_datasets_config(datasets_config_file_path)
+
+    assert first is second
+    assert len(parse_calls) == 1
+    assert "national_risk_index" in first
+
+
+def test_get_executor():
+    with runner._get_executor("process", max_workers=1) as executor:
+        assert isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+    with pytest.raises(ValueError):
+        runner._get_executor("doesnt_exist", max_workers=1)
+
+
+MEMORY_HUNGRY_DATASET_SIZE = 128 * 1024**2
+_memory_hungry_heap = []
+
+
+def _run_memory_hungry_etl(dataset, use_cache):
+    # Like a pandas heap, memory left by an earlier ETL in the same process is
+    # reused rather than allocated again
+    if not _memory_hungry_heap:
+        _memory_hungry_heap.append(b"x" * MEMORY_HUNGRY_DATASET_SIZE)
+    time.sleep(1)
+    return {"peak_rss": 0, "profile": []}
+
+
+def _run_memory_hungry_dataset(dataset):
+    runner._run_one_dataset = _run_memory_hungry_etl
+    return runner._run_one_dataset_in_process(dataset)
+
+
+def test_run_one_dataset_in_process_records_peak_memory_of_worker():
+    with runner._get_executor("process", max_workers=1) as executor:
+        results = [
+            executor.submit(_run_memory_hungry_dataset, {"name": name}).result()
+            for name in ["first", "second"]
+        ]
+    assert results[1]["peak_rss"] >= MEMORY_HUNGRY_DATASET_SIZE
+
+
+def test_run_one_dataset_in_process_reraises_failures(monkeypatch):
+    def failing_run(dataset, use_cache):
+        raise KeyError("missing column")
+
+    monkeypatch.setattr(runner, "_run_one_dataset", failing_run)
+    with pytest.raises(RuntimeError, match="missing column") as error:
+        runner._run_one_dataset_in_process({"name": "cdc_places"})
+    assert "cdc_places" in str(error.value)
+
+
+def test_etl_runner_fails_fast(monkeypatch):
+    run_order = []
+
+    def run_one_dataset(dataset, use_cache):
+        run_order.append(dataset["name"])
+        if dataset["name"] == "cdc_places":
+            raise KeyError("missing column")
+
+    monkeypatch.setattr(runner, "_run_one_dataset", run_one_dataset)
+    with pytest.raises(KeyError, match="missing column"):
+        runner.etl_runner(no_concurrency=True)
+
+    # cdc_places is the first dataset, nothing else is started after it fails
+    assert run_order == ["cdc_places"]
+
+
+def test_etl_runner_keeps_going(monkeypatch):
+    run_order = []
+
+    def run_one_dataset(dataset, use_cache):
+        run_order.append(dataset["name"])
+        if dataset["name"] in ["cdc_places", "tribal"]:
+            raise KeyError("missing column")
+
+    monkeypatch.setattr(runner, "_run_one_dataset", run_one_dataset)
+    with pytest.raises(RuntimeError) as error:
+        runner.etl_runner(no_concurrency=True, keep_going=True)
+
+    assert "['cdc_places', 'tribal']" in str(error.value)
+    # tribal_overlap depends on tribal, so it is skipped
+    assert "['tribal_overlap']" in str(error.value)
+    assert "tribal_overlap" not in run_order
+    assert len(run_order) == len(constants.DATASET_LIST) - 1
+
+
+def test_etl_runner_times_out_datasets_on_processes(monkeypatch):
+    datasets = [
+        {
+            "name": "cdc_places",
+            "module_dir": "cdc_places",
+            "class_name": "CDCPlacesETL",
+            "is_memory_intensive": False,
+            "timeout": 0.1,
+        },
+        {
+            "name": "national_risk_index",
+            "module_dir": "national_risk_index",
+            "class_name": "NationalRiskIndexETL",
+            "is_memory_intensive": False,
+        },
+    ]
+    monkeypatch.setattr(constants, "DATASET_LIST", datasets)
+    timeouts = {}
+
+    def run_one_dataset_in_process(dataset, use_cache, timeout):
+        timeouts[dataset["name"]] = timeout
+        if timeout is not None:
+            raise runner.DatasetTimeoutError("timed out")
+
+    monkeypatch.setattr(
+        runner, "_run_one_dataset_in_process", run_one_dataset_in_process
+    )
+    # Run the "worker processes" on threads, so the stand-in above is used
+    get_executor = runner._get_executor
+    monkeypatch.setattr(
+        runner,
+        "_get_executor",
+        lambda executor_type, max_workers: get_executor("thread", max_workers),
+    )
+    with pytest.raises(RuntimeError, match=r"\['cdc_places'\]"):
+        runner.etl_runner(executor_type="process", keep_going=True)
+    assert timeouts == {"cdc_places": 0.1, "national_risk_index": None}
+
+
+def test_run_one_dataset_in_process_times_out(monkeypatch):
+    def slow_run(dataset, use_cache):
+        time.sleep(5)
+
+    monkeypatch.setattr(runner, "_run_one_dataset", slow_run)
+    with pytest.raises(runner.DatasetTimeoutError):
+        runner._run_one_dataset_in_process({"name": "cdc_places"}, timeout=0.1)
+
+
+class RawSourceETL(base.ExtractTransformLoad):
+    NAME = "raw_source"
+    INPUT_GEOID_TRACT_FIELD_NAME = "TRACT"
+
+    def get_data_sources(self):
+        return []
+
+    def transform(self):
+        pass
+
+
+@pytest.fixture
+def raw_source_etl(tmp_path):
+    etl = RawSourceETL()
+    etl.SOURCES_PATH = tmp_path / "sources"
+    return etl
+
+
+def test_read_raw_csv_reads_declared_columns(tmp_path, raw_source_etl):
+    path = tmp_path / "raw.csv"
+    path.write_text("TRACT,A,B,C_EALA\n01001020100,1,x,0.5\n")
+
+    df = raw_source_etl.read_raw_csv(
+        path,
+        columns={"TRACT": None, "A": "float64"},
+        optional_columns={"C_EALA": "float64", "D_EALA": "float64"},
+    )
+
+    assert list(df.columns) == ["TRACT", "A", "C_EALA"]
+    # The tract ID keeps its leading zero
+    assert df["TRACT"].tolist() == ["01001020100"]
+    assert df["A"].dtype == "float64"
+
+
+def test_read_raw_csv_rejects_changed_source(tmp_path, raw_source_etl):
+    path = tmp_path / "raw.csv"
+    path.write_text("TRACT,A,B\n01001020100,1,x\n")
+
+    with pytest.raises(ValueError, match="missing columns \\['C'\\]"):
+        raw_source_etl.read_raw_csv(
+            path, columns={"TRACT": None, "A": None, "C": None}
+        )
+    with pytest.raises(ValueError):
+        raw_source_etl.read_raw_csv(
+            path, columns={"TRACT": None, "B": "float64"}
+        )
+
+
+def test_read_raw_csv_parses_each_source_version_once(
+    tmp_path, raw_source_etl, monkeypatch
+):
+    parse_calls = []
+    read_csv = parsed_sources.read_csv
+    monkeypatch.setattr(
+        parsed_sources,
+        "read_csv",
+        lambda *args, **kwargs: parse_calls.append(args)
+        or read_csv(*args, **kwargs),
+    )
+    path = tmp_path / "raw.csv"
+    path.write_text("TRACT,A\n01001020100,1\n")
+
+    for _ in range(2):
+        df = raw_source_etl.read_raw_csv(path, columns={"TRACT": None})
+    assert len(parse_calls) == 1
+    assert df["TRACT"].tolist() == ["01001020100"]
+
+    path.write_text("TRACT,A\n01001020200,1\n")
+    df = raw_source_etl.read_raw_csv(path, columns={"TRACT": None})
+    assert len(parse_calls) == 2
+    assert df["TRACT"].tolist() == ["01001020200"]
+    # Only the latest version of the source is kept
+    parsed_source_cache = raw_source_etl.get_parsed_source_cache()
+    assert len(list(parsed_source_cache.path.iterdir())) == 1
+
+
+def test_transform_raw_csv_in_chunks(tmp_path, raw_source_etl):
+    path = tmp_path / "raw.csv"
+    rows = [
+        f"{tract:011d},{measure},{value}"
+        for tract in range(1001020100, 1001020200)
+        for measure, value in [("A", 1.5), ("B", 2.0)]
+    ]
+    path.write_text("TRACT,Measure,Value\n" + "\n".join(rows) + "\n")
+
+    chunks = list(
+        raw_source_etl.read_raw_csv_chunks(
+            path,
+            columns={"TRACT": None, "Measure": "string", "Value": "float64"},
+            chunk_size=1024,
+        )
+    )
+    assert len(chunks) > 1
+    assert chunks[0]["TRACT"].iloc[0] == "01001020100"
+
+    # The measures of a tract may be read in different chunks
+    df = raw_source_etl.transform_chunks(
+        chunks,
+        transform_chunk=lambda chunk: chunk.pivot(
+            index="TRACT", columns="Measure", values="Value"
+        ),
+        reduce=lambda df: df.groupby(level=0).first(),
+    )
+    assert len(df) == 100
+    assert df.notna().all().all()
+    assert df.index[0] == "01001020100"
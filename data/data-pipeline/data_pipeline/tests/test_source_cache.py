@@ -0,0 +1,108 @@
+import hashlib
+import io
+from unittest import mock
+
+import pytest
+import requests
+from data_pipeline.etl import downloader
+from data_pipeline.etl.datasource import FileDataSource
+from data_pipeline.etl.source_cache import SourceManifest
+from data_pipeline.etl.source_cache import SourceStore
+
+URL = "https://example.com/data.csv"
+CONTENT = b"GEOID10_TRACT,value\n01001020100,1\n"
+
+
+def _get_response(content: bytes, status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(content)
+    response.headers["ETag"] = '"v1"'
+    return response
+
+
+@pytest.fixture
+def session_mock():
+    with mock.patch.object(downloader, "get_session") as get_session_mock:
+        yield get_session_mock.return_value
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SourceStore(tmp_path / "sources" / ".store")
+
+
+def _fetch(tmp_path, store, dataset="ExampleETL", use_cache=False):
+    sources_path = tmp_path / "sources" / dataset
+    manifest = SourceManifest(sources_path)
+    data_source = FileDataSource(
+        source=URL, destination=sources_path / "data.csv"
+    )
+    data_source.fetch_cached(store, manifest, use_cache)
+    manifest.save()
+    return data_source
+
+
+def test_fetch_records_source_in_manifest(tmp_path, store, session_mock):
+    session_mock.get.return_value = _get_response(CONTENT)
+
+    data_source = _fetch(tmp_path, store)
+
+    assert data_source.destination.read_bytes() == CONTENT
+    entry = SourceManifest(tmp_path / "sources" / "ExampleETL").get(
+        data_source
+    )
+    assert entry["url"] == URL
+    assert entry["size"] == len(CONTENT)
+    assert entry["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+    assert entry["etag"] == '"v1"'
+    assert entry["files"] == {"data.csv": len(CONTENT)}
+
+
+def test_unchanged_source_is_not_downloaded_again(
+    tmp_path, store, session_mock
+):
+    session_mock.get.return_value = _get_response(CONTENT)
+    _fetch(tmp_path, store)
+
+    session_mock.get.return_value = _get_response(b"", status_code=304)
+    data_source = _fetch(tmp_path, store)
+
+    assert session_mock.get.call_args.kwargs["headers"] == {
+        "If-None-Match": '"v1"'
+    }
+    assert data_source.destination.read_bytes() == CONTENT
+
+
+def test_cache_skips_intact_sources(tmp_path, store, session_mock):
+    session_mock.get.return_value = _get_response(CONTENT)
+    _fetch(tmp_path, store)
+
+    _fetch(tmp_path, store, use_cache=True)
+
+    assert session_mock.get.call_count == 1
+
+
+def test_cache_refetches_damaged_sources(tmp_path, store, session_mock):
+    session_mock.get.return_value = _get_response(CONTENT)
+    data_source = _fetch(tmp_path, store)
+    # A half-written file doesn't match the size in the manifest
+    data_source.destination.unlink()
+    data_source.destination.write_bytes(CONTENT[:10])
+
+    _fetch(tmp_path, store, use_cache=True)
+
+    assert data_source.destination.read_bytes() == CONTENT
+    # The file is restored from the store, without downloading it again
+    assert session_mock.get.call_count == 1
+
+
+def test_datasets_share_stored_files(tmp_path, store, session_mock):
+    session_mock.get.return_value = _get_response(CONTENT)
+    first = _fetch(tmp_path, store, dataset="FirstETL")
+    second = _fetch(tmp_path, store, dataset="SecondETL", use_cache=True)
+
+    assert session_mock.get.call_count == 1
+    object_path = store.get_object_path(hashlib.sha256(CONTENT).hexdigest())
+    assert first.destination.samefile(object_path)
+    assert second.destination.samefile(object_path)
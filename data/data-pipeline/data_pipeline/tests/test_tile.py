@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+import pytest
+from data_pipeline.tile import generate
+from data_pipeline.tile.generate import TileJob
+
+
+def test_score_tile_jobs_tile_each_geojson_once(tmp_path):
+    jobs = generate.get_score_tile_jobs(tmp_path, ["default", "custom_burd"])
+
+    assert [job.name for job in jobs] == [
+        "default/high",
+        "default/low",
+        "custom_burd/high",
+    ]
+    for job in jobs:
+        tippecanoe, tile_join = job.get_commands()
+        assert tippecanoe[0] == "tippecanoe"
+        assert tippecanoe[-1] == str(job.geojson_file)
+        # The MVT directory is unpacked from the mbtiles file
+        assert tile_join[0] == "tile-join"
+        assert tile_join[-1] == str(job.mbtiles_file)
+        assert f"--output-to-directory={job.output_path}" in tile_join
+
+
+def _get_job(tmp_path, name, exit_code):
+    job = TileJob(
+        name=name,
+        geojson_file=tmp_path / f"{name}.json",
+        output_path=tmp_path / name,
+        mbtiles_file_name=f"{name}.mbtiles",
+        min_zoom=0,
+        max_zoom=1,
+    )
+    job.get_commands = lambda: [
+        [
+            sys.executable,
+            "-c",
+            f"import os, sys; print(os.environ['TIPPECANOE_MAX_THREADS']); sys.exit({exit_code})",
+        ]
+    ]
+    return job
+
+
+def test_run_tile_jobs_logs_output(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(generate.logger, "propagate", True)
+    jobs = [_get_job(tmp_path, "high", 0), _get_job(tmp_path, "low", 0)]
+
+    with caplog.at_level("INFO"):
+        generate.run_tile_jobs(jobs, cpu_budget=4)
+
+    # Each of the 2 jobs gets half of the CPU budget
+    assert "high: 2" in caplog.text
+    assert "low: 2" in caplog.text
+    assert (tmp_path / "high").is_dir()
+
+
+def test_run_tile_jobs_fails_on_error(tmp_path):
+    jobs = [_get_job(tmp_path, "high", 0), _get_job(tmp_path, "low", 3)]
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        generate.run_tile_jobs(jobs, cpu_budget=2)
+    assert e.value.returncode == 3
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_pipeline.etl.tract_keys import from_tract_keys
+from data_pipeline.etl.tract_keys import normalize_tract_ids
+from data_pipeline.etl.tract_keys import to_tract_keys
+
+
+@pytest.mark.parametrize(
+    "ids",
+    [
+        pd.Series(["1001020100", "72001956300", None]),
+        pd.Series(["01001020100", "72001956300", None], dtype="string"),
+        # Read as numbers, the IDs lose their leading zeros
+        pd.Series([1001020100.0, 72001956300.0, np.nan]),
+    ],
+)
+def test_normalize_tract_ids(ids):
+    assert normalize_tract_ids(ids).tolist() == [
+        "01001020100",
+        "72001956300",
+        pd.NA,
+    ]
+
+
+def test_tract_keys_round_trip():
+    ids = pd.Series(["01001020100", "72001956300"], index=[3, 7])
+
+    keys = to_tract_keys(ids)
+
+    assert keys.dtype == "int64"
+    assert keys.to_dict() == {3: 1001020100, 7: 72001956300}
+    assert from_tract_keys(keys).tolist() == ids.tolist()
+
+
+@pytest.mark.parametrize(
+    "ids", [pd.Series(["01001020100", None]), pd.Series(["0100102010A"])]
+)
+def test_to_tract_keys_rejects_invalid_ids(ids):
+    with pytest.raises(ValueError):
+        to_tract_keys(ids)
@@ -1,113 +1,312 @@
+import concurrent.futures
 import os
+import subprocess
+import time
+import typing
+from dataclasses import dataclass
+from dataclasses import field
 from pathlib import Path
-from subprocess import call
 
 from data_pipeline.utils import get_module_logger
 from data_pipeline.utils import remove_all_from_dir
 
 logger = get_module_logger(__name__)
 
+# Tippecanoe prints its progress many times a second, so progress lines are
+# only logged this often (in seconds) for each job
+PROGRESS_LOG_INTERVAL = 10
 
-def generate_tiles(data_path: Path, generate_tribal_layer: bool) -> None:
+USA_HIGH_MIN_ZOOM = 5
+USA_HIGH_MAX_ZOOM = 11
+USA_LOW_MIN_ZOOM = 0
+USA_LOW_MAX_ZOOM = 7
+USA_TRIBAL_MIN_ZOOM = 0
+USA_TRIBAL_MAX_ZOOM = 11
+
+# The tiles of each score layer generated by `geo-score`. The paths are
+# relative to data/score; layers without a low zoom GeoJSON have no low tiles.
+SCORE_TILE_LAYERS = {
+    "default": {
+        "tiles_path": Path("tiles") / "default" / "legacy",
+        "geojson_path": Path("geojson") / "default",
+        "high_geojson_file_name": "usa-high.json",
+        "low_geojson_file_name": "usa-low.json",
+        "high_min_zoom": USA_HIGH_MIN_ZOOM,
+    },
+    "gistar_burd": {
+        "tiles_path": Path("tiles") / "gistar" / "burd",
+        "geojson_path": Path("geojson") / "gistar" / "burd",
+        "high_geojson_file_name": "usa-high-gistar-burd.json",
+        "low_geojson_file_name": "usa-low-gistar-burd.json",
+        "high_min_zoom": USA_HIGH_MIN_ZOOM,
+    },
+    "gistar_ind": {
+        "tiles_path": Path("tiles") / "gistar" / "ind",
+        "geojson_path": Path("geojson") / "gistar" / "ind",
+        "high_geojson_file_name": "usa-high-gistar-ind.json",
+        "low_geojson_file_name": "usa-low-gistar-ind.json",
+        "high_min_zoom": USA_HIGH_MIN_ZOOM,
+    },
+    "add_burd": {
+        "tiles_path": Path("tiles") / "add" / "burd",
+        "geojson_path": Path("geojson") / "add" / "burd",
+        "high_geojson_file_name": "usa-high-add-burd.json",
+        "low_geojson_file_name": "usa-low-add-burd.json",
+        "high_min_zoom": USA_HIGH_MIN_ZOOM,
+    },
+    "add_ind": {
+        "tiles_path": Path("tiles") / "add" / "ind",
+        "geojson_path": Path("geojson") / "add" / "ind",
+        "high_geojson_file_name": "usa-high-add-ind.json",
+        "low_geojson_file_name": "usa-low-add-ind.json",
+        "high_min_zoom": USA_HIGH_MIN_ZOOM,
+    },
+    "custom_burd": {
+        "tiles_path": Path("tiles") / "custom" / "burd",
+        "geojson_path": Path("geojson") / "custom" / "burd",
+        "high_geojson_file_name": "usa-high-custom-burd.json",
+        "low_geojson_file_name": None,
+        "high_min_zoom": 0,
+    },
+    "custom_ind": {
+        "tiles_path": Path("tiles") / "custom" / "ind",
+        "geojson_path": Path("geojson") / "custom" / "ind",
+        "high_geojson_file_name": "usa-high-custom-ind.json",
+        "low_geojson_file_name": None,
+        "high_min_zoom": 0,
+    },
+}
+
+
+@dataclass
+class TileJob:
+    """Tiles one GeoJSON file into an mbtiles file and a directory of
+    uncompressed MVT files next to it
+
+    Attributes:
+        name (str): the name of the job in the logs, e.g. "default/high"
+        geojson_file (Path): the GeoJSON file to tile
+        output_path (Path): the directory of the mbtiles file and MVT files
+        mbtiles_file_name (str): the name of the mbtiles file
+        min_zoom (int): the minimum zoom level
+        max_zoom (int): the maximum zoom level
+        tippecanoe_args (list): any other tippecanoe argument
+    """
+
+    name: str
+    geojson_file: Path
+    output_path: Path
+    mbtiles_file_name: str
+    min_zoom: int
+    max_zoom: int
+    tippecanoe_args: typing.List[str] = field(default_factory=list)
+
+    @property
+    def mbtiles_file(self) -> Path:
+        return self.output_path / self.mbtiles_file_name
+
+    def get_commands(self) -> typing.List[typing.List[str]]:
+        """Returns the commands of the job, to be run in order.
+
+        The GeoJSON is only tiled once. The MVT directory is then unpacked
+        from the mbtiles file by tile-join, which is much faster than tiling
+        the GeoJSON a second time.
+        """
+        return [
+            [
+                "tippecanoe",
+                f"--minimum-zoom={self.min_zoom}",
+                f"--maximum-zoom={self.max_zoom}",
+                "--layer=blocks",
+                *self.tippecanoe_args,
+                "--force",
+                f"--output={self.mbtiles_file}",
+                str(self.geojson_file),
+            ],
+            [
+                "tile-join",
+                "--no-tile-compression",
+                "--no-tile-size-limit",
+                "--force",
+                f"--output-to-directory={self.output_path}",
+                str(self.mbtiles_file),
+            ],
+        ]
+
+
+def get_score_tile_jobs(
+    data_path: Path, layer_names: typing.List[str]
+) -> typing.List[TileJob]:
+    """Returns the jobs generating the tiles of score layers
+
+    Args:
+        data_path (Path): Path to data folder
+        layer_names (list): The layers of `SCORE_TILE_LAYERS` to tile
+
+    Returns:
+        list: the high and low zoom jobs of each layer
+    """
+    jobs = []
+    for layer_name in layer_names:
+        layer = SCORE_TILE_LAYERS[layer_name]
+        score_tiles_path = data_path / "score" / layer["tiles_path"]
+        score_geojson_dir = data_path / "score" / layer["geojson_path"]
+        jobs.append(
+            TileJob(
+                name=f"{layer_name}/high",
+                geojson_file=score_geojson_dir
+                / layer["high_geojson_file_name"],
+                output_path=score_tiles_path / "high",
+                mbtiles_file_name="usa_high.mbtiles",
+                min_zoom=layer["high_min_zoom"],
+                max_zoom=USA_HIGH_MAX_ZOOM,
+                tippecanoe_args=["--no-feature-limit", "--no-tile-size-limit"],
+            )
+        )
+        if layer["low_geojson_file_name"]:
+            jobs.append(
+                TileJob(
+                    name=f"{layer_name}/low",
+                    geojson_file=score_geojson_dir
+                    / layer["low_geojson_file_name"],
+                    output_path=score_tiles_path / "low",
+                    mbtiles_file_name="usa_low.mbtiles",
+                    min_zoom=USA_LOW_MIN_ZOOM,
+                    max_zoom=USA_LOW_MAX_ZOOM,
+                    tippecanoe_args=["--drop-densest-as-needed"],
+                )
+            )
+    return jobs
+
+
+def get_tribal_tile_jobs(data_path: Path) -> typing.List[TileJob]:
+    """Returns the job generating the tiles of the tribal layer"""
+    return [
+        TileJob(
+            name="tribal",
+            geojson_file=data_path / "tribal" / "geographic_data" / "usa.json",
+            output_path=data_path / "tribal" / "tiles",
+            mbtiles_file_name="usa.mbtiles",
+            min_zoom=USA_TRIBAL_MIN_ZOOM,
+            max_zoom=USA_TRIBAL_MAX_ZOOM,
+            tippecanoe_args=["--base-zoom=3", "--drop-densest-as-needed"],
+        )
+    ]
+
+
+def _run_command(
+    command: typing.List[str], job_name: str, env: typing.Dict[str, str]
+) -> None:
+    """Runs a command, logging its output as it comes.
+
+    Raises:
+        subprocess.CalledProcessError: if the command exits with an error
+    """
+    logger.debug(f"{job_name}: running {' '.join(command)}")
+    last_progress_time = 0.0
+    # Text mode reads tippecanoe's carriage return terminated progress
+    # updates as separate lines
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=env,
+    ) as process:
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            if "%" in line:
+                now = time.monotonic()
+                if now - last_progress_time < PROGRESS_LOG_INTERVAL:
+                    continue
+                last_progress_time = now
+            logger.info(f"{job_name}: {line}")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+
+def _run_tile_job(job: TileJob, threads: int) -> None:
+    env = {**os.environ, "TIPPECANOE_MAX_THREADS": str(threads)}
+    start_time = time.time()
+    for command in job.get_commands():
+        _run_command(command, job.name, env)
+    logger.info(
+        f"{job.name}: tiles generated in {time.time() - start_time:.0f}s"
+    )
+
+
+def run_tile_jobs(
+    jobs: typing.List[TileJob], cpu_budget: typing.Optional[int] = None
+) -> None:
+    """Runs tile jobs concurrently, sharing a number of CPUs between them
+
+    The output directory of each job is emptied first. Every job runs, and the
+    first error is raised once they have all finished.
+
+    Args:
+        jobs (list): the jobs to run
+        cpu_budget (int): the number of CPUs to use (optional, defaults to
+            all CPUs)
+
+    Returns:
+        None
+    """
+    if not jobs:
+        return
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    max_workers = min(len(jobs), cpu_budget)
+    # Each tippecanoe process gets an equal share of the budget
+    threads = max(1, cpu_budget // max_workers)
+
+    for job in jobs:
+        # remove existing tiles
+        if job.output_path.exists():
+            remove_all_from_dir(job.output_path)
+        job.output_path.mkdir(parents=True, exist_ok=True)
+
+    logger.info(
+        f"Running {len(jobs)} tile jobs, {max_workers} at a time with {threads} threads each"
+    )
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as executor:
+        futures = {
+            executor.submit(_run_tile_job, job, threads): job for job in jobs
+        }
+        for fut in concurrent.futures.as_completed(futures):
+            try:
+                fut.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.error(f"Tile job {futures[fut].name} failed: {e}")
+                errors.append(e)
+    if errors:
+        raise errors[0]
+
+
+def generate_tiles(
+    data_path: Path,
+    generate_tribal_layer: bool,
+    layer_names: typing.Optional[typing.List[str]] = None,
+    cpu_budget: typing.Optional[int] = None,
+) -> None:
     """Generates map tiles from geojson files
 
     Args:
         data_path (Path):  Path to data folder
         generate_tribal_layer (bool): If true, generate the tribal layer of the map
+        layer_names (list): The score layers to generate, from
+            `SCORE_TILE_LAYERS` (optional, defaults to the default layer only)
+        cpu_budget (int): The number of CPUs tippecanoe can use (optional,
+            defaults to all CPUs)
 
     Returns:
         None
     """
-
-    def _generate_score_tiles() -> None:
-        """Generates score map tiles"""
-        score_tiles_path = data_path / "score" / "tiles" / "default" / "legacy"
-        high_tile_path = score_tiles_path / "high"
-        low_tile_path = score_tiles_path / "low"
-        score_geojson_dir = data_path / "score" / "geojson" / "default"
-
-        USA_HIGH_MIN_ZOOM = 5
-        USA_HIGH_MAX_ZOOM = 11
-        USA_LOW_MIN_ZOOM = 0
-        USA_LOW_MAX_ZOOM = 7
-
-        # remove existing mbtiles file
-        remove_all_from_dir(score_tiles_path)
-
-        # create dirs
-        os.mkdir(high_tile_path)
-        os.mkdir(low_tile_path)
-
-        # generate high mbtiles file
-        logger.debug("Generating USA High mbtiles file")
-        cmd = "tippecanoe "
-        cmd += f"--minimum-zoom={USA_HIGH_MIN_ZOOM} --maximum-zoom={USA_HIGH_MAX_ZOOM} --layer=blocks "
-        cmd += "--no-feature-limit --no-tile-size-limit "
-        cmd += f"--output={high_tile_path}/usa_high.mbtiles "
-        cmd += str(score_geojson_dir / "usa-high.json")
-        call(cmd, shell=True)
-
-        # generate high mvts
-        logger.debug("Generating USA High mvt folders and files")
-        cmd = "tippecanoe "
-        cmd += f"--minimum-zoom={USA_HIGH_MIN_ZOOM} --maximum-zoom={USA_HIGH_MAX_ZOOM} --no-tile-compression "
-        cmd += "--no-feature-limit  --no-tile-size-limit "
-        cmd += f"--output-to-directory={high_tile_path} --layer=blocks "
-        cmd += str(score_geojson_dir / "usa-high.json")
-        call(cmd, shell=True)
-
-        # generate low mbtiles file
-        logger.debug("Generating USA Low mbtiles file")
-        cmd = "tippecanoe "
-        cmd += f"--minimum-zoom={USA_LOW_MIN_ZOOM} --maximum-zoom={USA_LOW_MAX_ZOOM} --layer=blocks "
-        cmd += f"--output={low_tile_path}/usa_low.mbtiles "
-        cmd += str(score_geojson_dir / "usa-low.json")
-        call(cmd, shell=True)
-
-        # generate low mvts
-        logger.debug("Generating USA Low mvt folders and files")
-        cmd = "tippecanoe "
-        cmd += f"--minimum-zoom={USA_LOW_MIN_ZOOM} --maximum-zoom={USA_LOW_MAX_ZOOM} --no-tile-compression "
-        cmd += "--drop-densest-as-needed "
-        cmd += f"--output-to-directory={low_tile_path} --layer=blocks "
-        cmd += str(score_geojson_dir / "usa-low.json")
-        call(cmd, shell=True)
-
-    def _generate_tribal_tiles() -> None:
-        """Generates tribal layer tiles"""
-
-        USA_TRIBAL_MIN_ZOOM = 0
-        USA_TRIBAL_MAX_ZOOM = 11
-
-        tribal_tiles_path = data_path / "tribal" / "tiles"
-        tribal_geojson_dir = data_path / "tribal" / "geographic_data"
-
-        # remove existing mbtiles file
-        remove_all_from_dir(tribal_tiles_path)
-
-        # generate mbtiles file
-        logger.debug("Generating Tribal mbtiles file")
-        cmd = "tippecanoe "
-        cmd += "--layer=blocks "
-        cmd += "--base-zoom=3 "
-        cmd += f"--minimum-zoom={USA_TRIBAL_MIN_ZOOM} --maximum-zoom={USA_TRIBAL_MAX_ZOOM} "
-        cmd += f"--output={tribal_tiles_path}/usa.mbtiles "
-        cmd += str(tribal_geojson_dir / "usa.json")
-        call(cmd, shell=True)
-
-        # generate mvts
-        logger.debug("Generating Tribal mvt folders and files")
-        cmd = "tippecanoe "
-        cmd += "--layer=blocks "
-        cmd += "--base-zoom=3 "
-        cmd += "--no-tile-compression "
-        cmd += "--drop-densest-as-needed "
-        cmd += f"--minimum-zoom={USA_TRIBAL_MIN_ZOOM} --maximum-zoom={USA_TRIBAL_MAX_ZOOM} "
-        cmd += f"--output-to-directory={tribal_tiles_path} "
-        cmd += str(tribal_geojson_dir / "usa.json")
-        call(cmd, shell=True)
-
     if generate_tribal_layer:
-        _generate_tribal_tiles()
+        jobs = get_tribal_tile_jobs(data_path)
     else:
-        _generate_score_tiles()
\ No newline at end of file
+        jobs = get_score_tile_jobs(data_path, layer_names or ["default"])
+    run_tile_jobs(jobs, cpu_budget)
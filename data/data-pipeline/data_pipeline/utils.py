@@ -43,12 +43,15 @@ def get_module_logger(module_name: str) -> logging.Logger:
 
     """
     logger = logging.getLogger(module_name)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        "%(asctime)s [%(name)40.40s] %(levelname)-8s %(message)s"
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # Only attach a handler once, so that calling this again for the same
+    # module (e.g. from an ETL worker process) doesn't duplicate log lines.
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            "%(asctime)s [%(name)40.40s] %(levelname)-8s %(message)s"
+        )
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
     logger.setLevel(LOG_LEVEL)
     logger.propagate = False  # don't send log messages to the parent logger (to avoid duplicate log messages)
     return logger